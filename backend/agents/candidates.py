@@ -0,0 +1,119 @@
+import re
+import json
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from backend.agents.llm_cache import evict_rejected_sql
+from backend.mcp.tools import handle_explain_query
+from backend.mcp.validator import validate_sql
+from backend.observability.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ERROR_PREFIXES = ("Error", "Security Violation", "Database Error")
+
+
+def _normalize(sql: str) -> str:
+    return re.sub(r"\s+", " ", sql.strip().rstrip(";")).lower()
+
+
+async def generate_candidates(generate: Callable[[int], Awaitable[str]], count: int, budget_seconds: float) -> List[str]:
+    """
+    Runs `count` generations concurrently and returns the SQL of those that
+    finished within the budget, in candidate order (index 0 first).
+    Always waits for at least one; stragglers past the budget are cancelled.
+    """
+    tasks = [asyncio.create_task(generate(index)) for index in range(count)]
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=budget_seconds)
+        # Nothing usable inside the budget: take the first one that does finish
+        while pending and not any(task.exception() is None for task in done):
+            finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            done |= finished
+    finally:
+        # Stragglers, or all of them when the run itself is cancelled
+        unfinished = [task for task in tasks if not task.done()]
+        for task in unfinished:
+            task.cancel()
+        await asyncio.gather(*unfinished, return_exceptions=True)
+    metrics.incr("sql_candidates", outcome="generated", value=len(done))
+    metrics.incr("sql_candidates", outcome="late", value=len(pending))
+
+    candidates = []
+    for task in tasks:
+        if task in done and task.exception() is None:
+            candidates.append(task.result())
+        elif task in done:
+            logger.warning(f"SQL candidate generation failed: {task.exception()}")
+    if not candidates:
+        raise next(task.exception() for task in tasks if task in done)
+    return candidates
+
+
+async def check_candidate(sql: str) -> Dict[str, Any]:
+    """Static validation plus a planner pass (EXPLAIN), without executing the query."""
+    try:
+        validate_sql(sql)
+    except Exception as e:
+        return {"sql": sql, "valid": False, "cost": None, "error": str(e)}
+    text = (await handle_explain_query(sql))[0].text
+    if text.startswith(ERROR_PREFIXES):
+        return {"sql": sql, "valid": False, "cost": None, "error": text}
+    try:
+        cost = json.loads(text).get("total_cost")
+    except (ValueError, AttributeError):
+        cost = None
+    return {"sql": sql, "valid": True, "cost": cost, "error": None}
+
+
+async def select_candidate(candidates: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Checks all distinct candidates in parallel and picks the valid one with the
+    lowest planner cost, ties (and unknown costs, ranked last) going to candidate
+    order (index 0 is the greedy sample). Returns (chosen check, other valid SQL
+    cheapest first). When nothing passes, the first candidate's check is
+    returned so its error reaches the repair/critic path.
+    """
+    distinct: Dict[str, str] = {}
+    for sql in candidates:
+        distinct.setdefault(_normalize(sql), sql)
+    metrics.incr("sql_candidates", outcome="duplicate", value=len(candidates) - len(distinct))
+
+    checks = await asyncio.gather(*(check_candidate(sql) for sql in distinct.values()))
+    valid = [check for check in checks if check["valid"]]
+    metrics.incr("sql_candidates", outcome="valid", value=len(valid))
+    metrics.incr("sql_candidates", outcome="invalid", value=len(checks) - len(valid))
+    for check in checks:
+        if not check["valid"]:
+            evict_rejected_sql(check["sql"])
+    if not valid:
+        return checks[0], []
+    # Stable sort, so equal costs keep candidate order
+    ranked = sorted(valid, key=lambda check: (check["cost"] is None, check["cost"] or 0))
+    chosen = ranked[0]
+    if checks.index(chosen) > 0:
+        metrics.incr("sql_candidates", outcome="cheaper" if checks[0]["valid"] else "rescued")
+    logger.info(f"Picked SQL candidate {checks.index(chosen) + 1}/{len(checks)} (cost: {chosen['cost']})")
+    return chosen, [check["sql"] for check in ranked[1:]]
+
+
+def _sorted_rows(result: Dict[str, Any]) -> List[Tuple[str, ...]]:
+    return sorted(tuple(map(str, row)) for row in zip(*result["data"]))
+
+
+def results_agree(first: Dict[str, Any], second: Dict[str, Any]) -> bool:
+    """Same rows in any order (columnar results); column aliases may differ between candidates."""
+    if first["row_count"] != second["row_count"] or len(first["columns"]) != len(second["columns"]):
+        return False
+    return _sorted_rows(first) == _sorted_rows(second)
+
+
+def candidate_stats() -> Dict[str, float]:
+    series = metrics.counter_series("sql_candidates")
+    stats = {labels.split("=", 1)[1]: count for labels, count in series.items()}
+    for labels, count in metrics.counter_series("sql_candidate_agreement").items():
+        stats[f"agreement_{labels.split('=', 1)[1]}"] = count
+    return stats
+
+
+metrics.register_collector("sql_candidates", candidate_stats)
@@ -0,0 +1,128 @@
+import re
+import logging
+from typing import Any, Dict, List, Optional
+from backend.agents.results import NUMERIC, TEMPORAL, CATEGORICAL, NUMBER
+
+logger = logging.getLogger(__name__)
+
+PIE_MAX_CATEGORIES = 6
+BAR_MAX_CATEGORIES = 50
+MAX_SERIES = 5
+# Above this many points scatter switches to WebGL
+SCATTERGL_MIN_POINTS = 1000
+
+EXPLICIT_TYPES = ("line", "bar", "pie", "scatter")
+# Whole words only: "online", "pieces" and "barcode" are not chart requests
+REQUESTED_TYPE = re.compile(r'\b(' + "|".join(EXPLICIT_TYPES) + r')\b')
+
+
+def _requested_type(question: str) -> Optional[str]:
+    match = REQUESTED_TYPE.search(question.lower())
+    return match.group(1) if match else None
+
+
+def _sort_key(value: Any) -> tuple:
+    """Orders x values by their typed value (numbers numerically), None last."""
+    if value is None:
+        return (2, 0)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value)
+    if isinstance(value, str) and NUMBER.match(value):
+        return (0, float(value))
+    return (1, str(value))
+
+
+def _layout(question: str, x_title: Optional[str] = None, y_title: Optional[str] = None) -> Dict[str, Any]:
+    title = question.strip()
+    layout: Dict[str, Any] = {"title": title if len(title) <= 80 else title[:77] + "..."}
+    if x_title:
+        layout["xaxis"] = {"title": x_title}
+    if y_title:
+        layout["yaxis"] = {"title": y_title}
+    return layout
+
+
+def _line(question: str, x: Dict[str, Any], ys: List[Dict[str, Any]]) -> Dict[str, Any]:
+    order = sorted(range(len(x["values"])), key=lambda i: _sort_key(x["values"][i]))
+    data = [
+        {
+            "type": "scatter",
+            "mode": "lines+markers",
+            "name": y["name"],
+            "x": [x["values"][i] for i in order],
+            "y": [y["values"][i] for i in order],
+        }
+        for y in ys
+    ]
+    return {"data": data, "layout": _layout(question, x["name"], ys[0]["name"] if len(ys) == 1 else None)}
+
+
+def _category_totals(labels: Dict[str, Any], values: Dict[str, Any]) -> List[tuple]:
+    """(label, value) pairs, summed per label and sorted largest first."""
+    totals: Dict[str, float] = {}
+    for label, value in zip(labels["values"], values["values"]):
+        key = "(null)" if label is None else str(label)
+        totals[key] = totals.get(key, 0) + (value or 0)
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def _bar(question: str, labels: Dict[str, Any], ys: List[Dict[str, Any]]) -> Dict[str, Any]:
+    if len(ys) == 1:
+        pairs = _category_totals(labels, ys[0])[:BAR_MAX_CATEGORIES]
+        data = [{"type": "bar", "name": ys[0]["name"], "x": [p[0] for p in pairs], "y": [p[1] for p in pairs]}]
+        return {"data": data, "layout": _layout(question, labels["name"], ys[0]["name"])}
+    keep = len(labels["values"][:BAR_MAX_CATEGORIES])
+    data = [
+        {"type": "bar", "name": y["name"], "x": [str(v) for v in labels["values"][:keep]], "y": y["values"][:keep]}
+        for y in ys
+    ]
+    layout = _layout(question, labels["name"])
+    layout["barmode"] = "group"
+    return {"data": data, "layout": layout}
+
+
+def _pie(question: str, labels: Dict[str, Any], y: Dict[str, Any]) -> Dict[str, Any]:
+    pairs = _category_totals(labels, y)
+    data = [{"type": "pie", "labels": [p[0] for p in pairs], "values": [p[1] for p in pairs], "name": y["name"]}]
+    return {"data": data, "layout": _layout(question)}
+
+
+def _scatter(question: str, x: Dict[str, Any], y: Dict[str, Any]) -> Dict[str, Any]:
+    trace_type = "scattergl" if len(x["values"]) >= SCATTERGL_MIN_POINTS else "scatter"
+    data = [{"type": trace_type, "mode": "markers", "name": y["name"], "x": x["values"], "y": y["values"]}]
+    return {"data": data, "layout": _layout(question, x["name"], y["name"])}
+
+
+def build_chart_spec(question: str, columns: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Rule-based Plotly figure from typed result columns:
+    - temporal + numeric       -> line
+    - categorical + numeric    -> bar (pie when there are few categories)
+    - two numerics             -> scatter
+    An explicitly requested type wins when the data fits it.
+    Returns None for shapes the rules don't cover (caller falls back to the LLM).
+    """
+    if not columns or not columns[0]["values"]:
+        return None
+    numerics = [c for c in columns if c["type"] == NUMERIC][:MAX_SERIES]
+    temporals = [c for c in columns if c["type"] == TEMPORAL]
+    categoricals = [c for c in columns if c["type"] == CATEGORICAL]
+    requested = _requested_type(question)
+
+    if temporals and numerics and requested in (None, "line"):
+        return _line(question, temporals[0], numerics)
+
+    labels = (categoricals or temporals or [None])[0]
+    if labels is not None and numerics:
+        categories = len(set(labels["values"]))
+        few = categories <= PIE_MAX_CATEGORIES
+        non_negative = all((v or 0) >= 0 for v in numerics[0]["values"])
+        if requested == "pie" or (requested is None and few and len(numerics) == 1 and non_negative and categories > 1):
+            return _pie(question, labels, numerics[0])
+        if requested in (None, "bar"):
+            return _bar(question, labels, numerics)
+
+    if len(numerics) >= 2 and not categoricals and requested in (None, "scatter"):
+        return _scatter(question, numerics[0], numerics[1])
+
+    return None
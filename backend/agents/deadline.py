@@ -0,0 +1,57 @@
+"""
+Request Deadlines
+
+Every question carries an absolute deadline in state (epoch seconds, so it
+survives checkpointing), AGENT_TIMEOUT_SECONDS from the start of the request
+unless the request sets a shorter `timeout_seconds`. Optional stages compare the time
+left with what they usually need (AGENT_STAGE_MIN_SECONDS) and degrade
+instead of overrunning:
+- architect       -> coder works from the full schema
+- critic          -> error response after the local repair attempt
+- visualizer      -> rule-based charts only
+- final_responder -> template summary over the raw results
+Skipped stages are recorded in `skipped_stages` and reported to the client.
+"""
+
+import math
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Dict, List, Optional
+from backend.config import settings
+from backend.observability.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def request_deadline(timeout_seconds: Optional[float] = None) -> float:
+    """Deadline for a request; `timeout_seconds` (validated by QueryOptions) can only shorten it."""
+    budget = settings.AGENT_TIMEOUT_SECONDS
+    if timeout_seconds is not None:
+        budget = min(float(timeout_seconds), budget)
+    return time.time() + budget
+
+
+def remaining(state: Dict[str, Any]) -> float:
+    """Seconds left for this request (infinite when it has no deadline)."""
+    deadline = state.get("deadline")
+    return deadline - time.time() if deadline else math.inf
+
+
+def has_budget(state: Dict[str, Any], stage: str) -> bool:
+    return remaining(state) >= settings.AGENT_STAGE_MIN_SECONDS.get(stage, 0)
+
+
+def skip(stage: str, state: Dict[str, Any]) -> Dict[str, List[str]]:
+    """State update recording a stage skipped for lack of time."""
+    logger.warning(f"Skipping {stage}: {max(remaining(state), 0):.1f}s left in the request budget")
+    metrics.incr("deadline_skips", stage=stage)
+    return {"skipped_stages": [stage]}
+
+
+async def within_deadline(state: Dict[str, Any], awaitable: Awaitable) -> Any:
+    """Awaits with the remaining budget as timeout (asyncio.TimeoutError once it runs out)."""
+    budget = remaining(state)
+    if budget == math.inf:
+        return await awaitable
+    return await asyncio.wait_for(awaitable, timeout=max(budget, 0))
@@ -1,38 +1,7 @@
 
-from langgraph.graph import StateGraph, END
 from backend.agents.state import AgentState
-from backend.agents.nodes.router import router_node
-from backend.agents.nodes.architect import architect_node
-from backend.agents.nodes.coder import coder_node
-from backend.agents.nodes.executor import executor_node
-from backend.agents.nodes.critic import critic_node
-from backend.agents.nodes.error_handler import error_handler_node
-from backend.agents.nodes.schema_responder import schema_responder_node
-from backend.agents.nodes.chat_responder import chat_responder_node
-from backend.agents.nodes.clarifier import clarifier_node
-from backend.agents.nodes.viz_router import viz_router_node
-from backend.agents.nodes.visualizer import visualizer_node
-from backend.agents.nodes.final_responder import final_responder_node
-
-# Define Graph
-workflow = StateGraph(AgentState)
-
-# Add Nodes
-workflow.add_node("router", router_node)
-workflow.add_node("architect", architect_node)
-workflow.add_node("coder", coder_node)
-workflow.add_node("executor", executor_node)
-workflow.add_node("critic", critic_node)
-workflow.add_node("error_handler", error_handler_node)
-workflow.add_node("schema_responder", schema_responder_node)
-workflow.add_node("chat_responder", chat_responder_node)
-workflow.add_node("clarifier", clarifier_node)
-workflow.add_node("viz_router", viz_router_node)
-workflow.add_node("visualizer", visualizer_node)
-workflow.add_node("final_responder", final_responder_node)
-
-# Entry Point
-workflow.set_entry_point("router")
+from backend.observability.node_stats import instrument_node
+from backend.agents.deadline import remaining
 
 # --- Routing Logic ---
 
@@ -45,7 +14,10 @@ def route_router(state: AgentState):
         return "clarifier"
         
     if intent == "DATA_QUERY":
-        return "architect"
+        # Planned speculatively alongside the router
+        if state.get("speculative_plan"):
+            return "coder"
+        return "schema_loader"
     elif intent == "SCHEMA_QUESTION":
         return "schema_responder"
     elif intent == "GENERAL_CHAT":
@@ -53,73 +25,166 @@ def route_router(state: AgentState):
     else:
         return "clarifier" # Fallback
 
+def route_schema_loader(state: AgentState):
+    # Small schemas fit the coder prompt as-is, skip table selection
+    if state.get("planning_mode") == "single_call":
+        return "coder"
+    return "architect"
+
 def route_executor(state: AgentState):
     sql_error = state.get("sql_error")
     retry_count = state.get("retry_count", 0)
     
     if sql_error:
-        if retry_count < 3:
-            return "critic"
+        # No more retries once the request deadline has passed
+        if retry_count < 3 and remaining(state) > 0:
+            # Cheap local fixes first, the critic LLM only if they don't apply
+            return "sql_repair"
         else:
             return "error_handler"
     else:
         # Success -> Go to Viz Router instead of END
         return "viz_router"
 
+def route_sql_repair(state: AgentState):
+    if state.get("sql_error"):
+        # Out of time for an LLM fix (recorded by sql_repair)
+        if "critic" in (state.get("skipped_stages") or []):
+            return "error_handler"
+        return "critic"
+    return "viz_router"
+
 def route_viz_router(state: AgentState):
+    # Chart and summary don't depend on each other: fan out, join in output_join
     if state.get("needs_visualization"):
-        return "visualizer"
+        return ["visualizer", "final_responder"]
     else:
-        return END
-
-# --- Add Edges ---
-
-workflow.add_conditional_edges(
-    "router",
-    route_router,
-    {
-        "architect": "architect",
-        "schema_responder": "schema_responder",
-        "chat_responder": "chat_responder",
-        "clarifier": "clarifier"
-    }
-)
-
-# Main Query Flow
-workflow.add_edge("architect", "coder")
-workflow.add_edge("coder", "executor")
-
-# Execution & Retry Loop
-workflow.add_conditional_edges(
-    "executor",
-    route_executor,
-    {
-        "critic": "critic",
-        "error_handler": "error_handler",
-        "viz_router": "viz_router"
-    }
-)
-
-workflow.add_edge("critic", "executor")
-
-# Output Layer
-workflow.add_conditional_edges(
-    "viz_router",
-    route_viz_router,
-    {
-        "visualizer": "visualizer",
-        END: "final_responder"
-    }
-)
-
-workflow.add_edge("visualizer", "final_responder")
-workflow.add_edge("final_responder", END)
-
-# Terminal Nodes
-workflow.add_edge("error_handler", END)
-workflow.add_edge("schema_responder", END)
-workflow.add_edge("chat_responder", END)
-workflow.add_edge("clarifier", END)
-
-# Compile
-graph = workflow.compile()
+        return "final_responder"
+
+def build_workflow():
+    """
+    Builds the (uncompiled) agent workflow. Node modules, and the LLM
+    provider SDKs they pull in, are imported here rather than at module load.
+    """
+    from langgraph.graph import StateGraph, END
+    from backend.agents.nodes.router import router_node
+    from backend.agents.nodes.schema_loader import schema_loader_node
+    from backend.agents.nodes.architect import architect_node
+    from backend.agents.nodes.coder import coder_node
+    from backend.agents.nodes.executor import executor_node
+    from backend.agents.nodes.sql_repair import sql_repair_node
+    from backend.agents.nodes.critic import critic_node
+    from backend.agents.nodes.error_handler import error_handler_node
+    from backend.agents.nodes.schema_responder import schema_responder_node
+    from backend.agents.nodes.chat_responder import chat_responder_node
+    from backend.agents.nodes.clarifier import clarifier_node
+    from backend.agents.nodes.viz_router import viz_router_node
+    from backend.agents.nodes.visualizer import visualizer_node
+    from backend.agents.nodes.final_responder import final_responder_node
+    from backend.agents.nodes.output_join import output_join_node
+    
+    # Define Graph
+    workflow = StateGraph(AgentState)
+    
+    # Add Nodes
+    workflow.add_node("router", instrument_node("router", router_node))
+    workflow.add_node("schema_loader", instrument_node("schema_loader", schema_loader_node))
+    workflow.add_node("architect", instrument_node("architect", architect_node))
+    workflow.add_node("coder", instrument_node("coder", coder_node))
+    workflow.add_node("executor", instrument_node("executor", executor_node))
+    workflow.add_node("sql_repair", instrument_node("sql_repair", sql_repair_node))
+    workflow.add_node("critic", instrument_node("critic", critic_node))
+    workflow.add_node("error_handler", instrument_node("error_handler", error_handler_node))
+    workflow.add_node("schema_responder", instrument_node("schema_responder", schema_responder_node))
+    workflow.add_node("chat_responder", instrument_node("chat_responder", chat_responder_node))
+    workflow.add_node("clarifier", instrument_node("clarifier", clarifier_node))
+    workflow.add_node("viz_router", instrument_node("viz_router", viz_router_node))
+    workflow.add_node("visualizer", instrument_node("visualizer", visualizer_node))
+    workflow.add_node("final_responder", instrument_node("final_responder", final_responder_node))
+    workflow.add_node("output_join", instrument_node("output_join", output_join_node))
+    
+    # Entry Point
+    workflow.set_entry_point("router")
+    
+    # --- Add Edges ---
+    
+    workflow.add_conditional_edges(
+        "router",
+        route_router,
+        {
+            "schema_loader": "schema_loader",
+            "coder": "coder",
+            "schema_responder": "schema_responder",
+            "chat_responder": "chat_responder",
+            "clarifier": "clarifier"
+        }
+    )
+    
+    # Main Query Flow
+    workflow.add_conditional_edges(
+        "schema_loader",
+        route_schema_loader,
+        {
+            "coder": "coder",
+            "architect": "architect"
+        }
+    )
+    workflow.add_edge("architect", "coder")
+    workflow.add_edge("coder", "executor")
+    
+    # Execution & Retry Loop
+    workflow.add_conditional_edges(
+        "executor",
+        route_executor,
+        {
+            "sql_repair": "sql_repair",
+            "error_handler": "error_handler",
+            "viz_router": "viz_router"
+        }
+    )
+    
+    workflow.add_conditional_edges(
+        "sql_repair",
+        route_sql_repair,
+        {
+            "critic": "critic",
+            "error_handler": "error_handler",
+            "viz_router": "viz_router"
+        }
+    )
+    
+    workflow.add_edge("critic", "executor")
+    
+    # Output Layer (parallel fan-out, joined before the final response)
+    workflow.add_conditional_edges(
+        "viz_router",
+        route_viz_router,
+        ["visualizer", "final_responder"]
+    )
+    
+    workflow.add_edge("visualizer", "output_join")
+    workflow.add_edge("final_responder", "output_join")
+    workflow.add_edge("output_join", END)
+    
+    # Terminal Nodes
+    workflow.add_edge("error_handler", END)
+    workflow.add_edge("schema_responder", END)
+    workflow.add_edge("chat_responder", END)
+    workflow.add_edge("clarifier", END)
+    
+    return workflow
+
+_graph = None
+
+def get_graph():
+    """The compiled, stateless graph (compiled on first use)."""
+    global _graph
+    if _graph is None:
+        _graph = build_workflow().compile()
+    return _graph
+
+def __getattr__(name):
+    # `from backend.agents.graph import graph` keeps working for scripts
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,206 @@
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from backend.config import settings
+from backend.agents.scheduler import ScheduledChatModel
+from backend.observability.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Below this many completed requests the p95 is too noisy to hedge on
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY_SECONDS = 0.5
+
+
+class CircuitBreaker:
+    """
+    Per-backend breaker. Consecutive errors (timeouts included) open it for
+    a cooldown, after which a single trial request is let through
+    (half-open); its result closes or re-opens the breaker. Losing a hedge
+    race is not an error.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        return state == "closed" or state == "half_open" and not self.trial_in_flight
+
+    def start_attempt(self) -> bool:
+        """Called when a request is sent; True if it took the half-open trial."""
+        if self.state != "half_open" or self.trial_in_flight:
+            return False
+        self.trial_in_flight = True
+        return True
+
+    def release_trial(self):
+        """The trial was cancelled before it could report: let the next request try."""
+        self.trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            # Re-open on a failed trial, or trip after too many failures
+            self.opened_at = time.monotonic()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(backend: str) -> CircuitBreaker:
+    breaker = _breakers.get(backend)
+    if breaker is None:
+        breaker = CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_COOLDOWN_SECONDS)
+        _breakers[backend] = breaker
+    return breaker
+
+
+metrics.register_collector(
+    "llm_breakers",
+    lambda: {name: {"state": b.state, "failures": b.failures} for name, b in _breakers.items()}
+)
+
+
+class HedgedChatModel(BaseChatModel):
+    """
+    Sends a request to the first healthy backend in priority order. If it
+    hasn't answered within its observed p95 (queueing included), a hedged
+    copy goes to the next backend; the first response wins and the other is
+    cancelled. Errors fall through to the next backend immediately.
+    """
+
+    backends: List[ScheduledChatModel]
+    node: Optional[str] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "hedged"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"backends": [b.backend for b in self.backends], **self.backends[0]._identifying_params}
+
+    def _candidates(self) -> List[ScheduledChatModel]:
+        healthy = [b for b in self.backends if get_breaker(b.backend).allow()]
+        # Everything tripped: try the primary anyway rather than failing outright
+        return healthy or self.backends[:1]
+
+    def _hedge_delay(self, backend: ScheduledChatModel) -> Optional[float]:
+        if not settings.LLM_HEDGE_ENABLED:
+            return None
+        labels = {"backend": backend.backend, "node": self.node or "unknown"}
+        if metrics.sample_count("llm_request_seconds", **labels) < HEDGE_MIN_SAMPLES:
+            return settings.LLM_HEDGE_DELAY_SECONDS
+        return max(HEDGE_MIN_DELAY_SECONDS, metrics.percentile("llm_request_seconds", 0.95, **labels))
+
+    async def _race(self, start_attempt) -> Tuple[Any, ScheduledChatModel]:
+        """
+        Runs `start_attempt(backend)` (a coroutine factory) with hedging and
+        fallback. Returns the first successful result and the backend that won.
+        """
+        candidates = self._candidates()
+        pending: Dict[asyncio.Task, Tuple[ScheduledChatModel, float, bool]] = {}
+        last_error: Optional[BaseException] = None
+
+        def launch():
+            backend = candidates.pop(0)
+            trial = get_breaker(backend.backend).start_attempt()
+            pending[asyncio.create_task(start_attempt(backend))] = (backend, time.perf_counter(), trial)
+
+        def drop_unavailable():
+            # Breakers may have changed while waiting (e.g. another request took a trial)
+            while candidates and not get_breaker(candidates[0].backend).allow():
+                candidates.pop(0)
+
+        launch()
+        delay = self._hedge_delay(next(iter(pending.values()))[0])
+        try:
+            while pending:
+                drop_unavailable()
+                timeout = delay if candidates and len(pending) == 1 and delay is not None else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Primary is slower than its p95: hedge once on the next backend
+                    metrics.incr("llm_hedges", node=self.node or "unknown", backend=candidates[0].backend)
+                    launch()
+                    delay = None
+                    continue
+                for task in done:
+                    backend, started, _ = pending.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        get_breaker(backend.backend).record_failure()
+                        logger.warning(f"LLM backend {backend.backend} failed ({self.node}): {last_error}")
+                        drop_unavailable()
+                        if candidates and not pending:
+                            metrics.incr("llm_fallbacks", node=self.node or "unknown", backend=candidates[0].backend)
+                            launch()
+                        continue
+                    get_breaker(backend.backend).record_success()
+                    metrics.observe("llm_request_seconds", time.perf_counter() - started, backend=backend.backend, node=self.node or "unknown")
+                    if pending:
+                        metrics.incr("llm_hedge_wins", node=self.node or "unknown", backend=backend.backend)
+                    return task.result(), backend
+            raise last_error
+        finally:
+            # Losers are cancelled without a verdict: slower is not unhealthy
+            for task, (backend, _, trial) in pending.items():
+                task.cancel()
+                if trial:
+                    get_breaker(backend.backend).release_trial()
+            # Let the losers release their scheduler slots before returning
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        # Sync calls are only used by legacy scripts, primary backend only
+        return self.backends[0]._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        result, _ = await self._race(lambda backend: backend._agenerate(messages, stop=stop, **kwargs))
+        return result
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        # The race is decided by the first chunk; the winner then streams alone
+        streams: Dict[str, AsyncIterator[ChatGenerationChunk]] = {}
+
+        async def first_chunk(backend: ScheduledChatModel) -> Optional[ChatGenerationChunk]:
+            stream = backend._astream(messages, stop=stop, **kwargs)
+            streams[backend.backend] = stream
+            try:
+                return await stream.__anext__()
+            except StopAsyncIteration:
+                return None
+
+        try:
+            chunk, winner = await self._race(first_chunk)
+            if chunk is None:
+                return
+            yield chunk
+            async for chunk in streams[winner.backend]:
+                yield chunk
+        finally:
+            for stream in streams.values():
+                await stream.aclose()
@@ -1,41 +1,212 @@
-
 import os
 import logging
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
+import threading
+from typing import Any, Dict, Optional, Tuple
+import httpx
 from backend.config import settings
+from backend.agents.llm_cache import get_node_cache
+from backend.agents.scheduler import ScheduledChatModel
+from backend.agents.hedging import HedgedChatModel
 
 logger = logging.getLogger(__name__)
 
-def get_llm(temperature: float = 0):
+# Process-wide registry: one long-lived client per (provider, model, temperature, node, options)
+_clients: Dict[Tuple, Any] = {}
+_clients_lock = threading.Lock()
+
+# Shared HTTP pools for OpenAI-compatible backends (keep-alive across nodes and requests)
+_http_client: Optional[httpx.Client] = None
+_http_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+        keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_SECONDS
+    )
+
+
+def _http_timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.LLM_HTTP_TIMEOUT_SECONDS, connect=10.0)
+
+
+def _get_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    global _http_client, _http_async_client
+    if _http_client is None:
+        _http_client = httpx.Client(limits=_http_limits(), timeout=_http_timeout())
+    if _http_async_client is None:
+        _http_async_client = httpx.AsyncClient(limits=_http_limits(), timeout=_http_timeout())
+    return _http_client, _http_async_client
+
+
+def _prompt_cache_hints() -> Dict[str, Any]:
+    """Server-specific KV-cache hints, passed through the request body."""
+    hints: Dict[str, Any] = {}
+    if settings.LLM_CACHE_PROMPT is not None:
+        hints["cache_prompt"] = settings.LLM_CACHE_PROMPT
+    if settings.LLM_KEEP_ALIVE:
+        hints["keep_alive"] = settings.LLM_KEEP_ALIVE
+    return hints
+
+
+# Model tier and output budget per node. "small" nodes use LLM_SMALL_MODEL_NAME
+# when it is set; LLM_NODE_CONFIG overrides any of these per node. Only prose
+# answers are capped by default: cut-off SQL or JSON (table lists, critic fixes,
+# charts) fails as a parse or SQL error and costs a retry instead of time.
+NODE_LLM_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "router": {"tier": "small"},
+    "architect": {"tier": "large"},
+    "coder": {"tier": "large"},
+    "critic": {"tier": "large"},
+    "visualizer": {"tier": "small"},
+    "final_responder": {"tier": "small", "max_tokens": 512},
+    "chat_responder": {"tier": "small", "max_tokens": 512},
+}
+
+
+def resolve_llm_config(node: Optional[str] = None, temperature: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Effective provider, base URL, model, temperature and max_tokens for a node.
+    Precedence: LLM_NODE_CONFIG[node] > NODE_LLM_DEFAULTS > global settings, except
+    that an explicit temperature from the caller always wins (it's part of the
+    call's semantics, e.g. diverse SQL candidates).
+    """
+    defaults = NODE_LLM_DEFAULTS.get(node, {})
+    overrides = settings.LLM_NODE_CONFIG.get(node, {}) if node else {}
+
+    provider = overrides.get("provider", settings.LLM_PROVIDER).lower()
+    if provider == "google" and not settings.GOOGLE_API_KEY:
+        logger.warning("GOOGLE_API_KEY not set, falling back to local LLM")
+        provider = settings.LLM_PROVIDER.lower() if settings.LLM_PROVIDER.lower() != "google" else "lmstudio"
+
+    if provider == "google":
+        model = "gemini-1.5-pro"
+    elif defaults.get("tier") == "small" and settings.LLM_SMALL_MODEL_NAME:
+        model = settings.LLM_SMALL_MODEL_NAME
+    else:
+        model = settings.LLM_MODEL_NAME
+
+    return {
+        "provider": provider,
+        "base_url": overrides.get("base_url", settings.LLM_BASE_URL),
+        "model": overrides.get("model", model),
+        "temperature": temperature if temperature is not None else overrides.get("temperature", defaults.get("temperature", 0)),
+        "max_tokens": overrides.get("max_tokens", defaults.get("max_tokens")),
+    }
+
+
+def _create_llm(config: Dict[str, Any], options: Dict[str, Any]):
+    # Provider SDKs are imported on first use: only the configured one gets loaded
+    provider, model, temperature = config["provider"], config["model"], config["temperature"]
+    if provider == "google":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        if config["max_tokens"]:
+            options = {"max_output_tokens": config["max_tokens"], **options}
+        return ChatGoogleGenerativeAI(
+            model=model,
+            google_api_key=settings.GOOGLE_API_KEY,
+            temperature=temperature,
+            convert_system_message_to_human=True,
+            **options
+        )
+
+    # Default to OpenAI compatible (Ollama, LM Studio, etc.)
+    # Ollama uses http://localhost:11434/v1 as base URL
+    if config["max_tokens"]:
+        options = {"max_tokens": config["max_tokens"], **options}
+    from langchain_openai import ChatOpenAI
+    http_client, http_async_client = _get_http_clients()
+    return ChatOpenAI(
+        base_url=config["base_url"],
+        api_key="ollama" if provider == "ollama" else "lm-studio",  # Dummy key for local servers
+        model=model,
+        temperature=temperature,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        extra_body=_prompt_cache_hints() or None,
+        # Report token usage on streamed responses too (per-node accounting)
+        **{"stream_usage": True, **options}
+    )
+
+
+def get_llm(temperature: Optional[float] = None, node: Optional[str] = None, **options):
     """
     Returns the configured LLM client.
     Supports: ollama, lmstudio, google
+
+    Each node resolves its own provider, model, temperature and max_tokens
+    (see resolve_llm_config), so cheap nodes can run on a small model.
+    Clients are created once per resolved config, node and options and
+    reused for the life of the process, sharing one pooled HTTP client.
+    Deterministic calls (temperature 0) from a named node go through the
+    response cache; all calls are admitted by the backend scheduler.
+    With LLM_FALLBACK_BACKENDS configured, calls are hedged across backends.
     """
-    provider = settings.LLM_PROVIDER.lower()
-    logger.info(f"LLM Config - Provider: {provider}, Base URL: {settings.LLM_BASE_URL}, Model: {settings.LLM_MODEL_NAME}")
-    
-    try:
-        if provider == "google":
-            if not settings.GOOGLE_API_KEY:
-                logger.warning("GOOGLE_API_KEY not set, falling back to local LLM")
+    config = resolve_llm_config(node, temperature)
+    key = (tuple(sorted(config.items())), node, tuple(sorted(options.items())))
+
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            logger.info(f"LLM Config ({node or 'default'}) - Provider: {config['provider']}, Base URL: {config['base_url']}, Model: {config['model']}, Temperature: {config['temperature']}, Max tokens: {config['max_tokens']}")
+            backend_configs = [config] + [
+                {**config, **fallback} for fallback in settings.LLM_FALLBACK_BACKENDS
+                if fallback.get("provider") != "google" or settings.GOOGLE_API_KEY
+            ]
+            try:
+                backends = [
+                    ScheduledChatModel(
+                        inner=_create_llm(backend_config, options),
+                        backend="google" if backend_config["provider"] == "google" else backend_config["base_url"],
+                        node=node
+                    )
+                    for backend_config in backend_configs
+                ]
+            except Exception as e:
+                logger.error(f"Failed to initialize LLM: {e}")
+                raise
+            cache = get_node_cache(node, config["temperature"])
+            if len(backends) == 1:
+                client = backends[0]
+                client.cache = cache
             else:
-                return ChatGoogleGenerativeAI(
-                    model="gemini-1.5-pro", # Or make this configurable
-                    google_api_key=settings.GOOGLE_API_KEY,
-                    temperature=temperature,
-                    convert_system_message_to_human=True
-                )
-        
-        # Default to OpenAI compatible (Ollama, LM Studio, etc.)
-        # Ollama uses http://localhost:11434/v1 as base URL
-        return ChatOpenAI(
-            base_url=settings.LLM_BASE_URL,
-            api_key="ollama" if provider == "ollama" else "lm-studio",  # Dummy key for local servers
-            model=settings.LLM_MODEL_NAME,
-            temperature=temperature
-        )
-        
-    except Exception as e:
-        logger.error(f"Failed to initialize LLM: {e}")
-        raise
+                client = HedgedChatModel(backends=backends, node=node, cache=cache)
+            _clients[key] = client
+    return client
+
+
+async def warm_llm_clients():
+    """
+    Opens a keep-alive connection to the LLM backend so the first question
+    doesn't pay TCP/TLS setup. Failures are logged, never raised.
+    """
+    base_urls = {
+        config["base_url"] for config in (resolve_llm_config(node) for node in [None, *NODE_LLM_DEFAULTS])
+        if config["provider"] != "google"
+    }
+    _, http_async_client = _get_http_clients()
+    for base_url in base_urls:
+        try:
+            await http_async_client.get(f"{base_url.rstrip('/')}/models", timeout=5.0)
+            logger.info(f"LLM HTTP connection pool warmed ({base_url})")
+        except Exception as e:
+            logger.warning(f"LLM warm-up failed for {base_url}: {e}")
+
+
+async def close_llm_clients():
+    """Drops all registered clients and closes the shared HTTP pools."""
+    global _http_client, _http_async_client
+    with _clients_lock:
+        _clients.clear()
+    if _http_async_client is not None:
+        await _http_async_client.aclose()
+        _http_async_client = None
+    if _http_client is not None:
+        _http_client.close()
+        _http_client = None
+    logger.info("LLM clients closed")
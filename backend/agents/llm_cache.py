@@ -0,0 +1,224 @@
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from langchain_core.caches import BaseCache
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, Generation
+from backend.config import settings
+from backend.mcp.manager import manager
+from backend.observability.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Nodes whose replies are SQL; entries that produced rejected SQL are evicted
+SQL_NODES = ("coder", "critic")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapses whitespace so formatting-only differences share an entry."""
+    return " ".join(prompt.split())
+
+
+class ResponseStore:
+    """
+    Exact-match LLM response store: in-memory LRU with TTL, optionally backed
+    by a SQLite file so entries survive restarts.
+    Keys include the schema version, so entries from an older schema are
+    never served; the memory tier is also dropped when a fingerprint changes.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self._memory: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        # Keys each node wrote or was served, most recent last, for evict_where
+        self._node_keys: Dict[str, "OrderedDict[str, None]"] = {}
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT, created REAL)"
+            )
+            self._db.execute("DELETE FROM llm_cache WHERE created < ?", (time.time() - ttl_seconds,))
+            self._db.commit()
+
+    def make_key(self, prompt: str, llm_string: str) -> str:
+        raw = f"{manager.schema_version()}\n{llm_string}\n{normalize_prompt(prompt)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute("SELECT created, value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row:
+                    entry = (row[0], json.loads(row[1]))
+                    self._put_memory(key, entry)
+            if entry is None:
+                return None
+            created, value = entry
+            if now - created > self.ttl_seconds:
+                self._memory.pop(key, None)
+                if self._db is not None:
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._db.commit()
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _put_memory(self, key: str, entry: Tuple[float, List[Dict[str, Any]]]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def set(self, key: str, value: List[Dict[str, Any]]):
+        entry = (time.time(), value)
+        with self._lock:
+            self._put_memory(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), entry[0])
+                )
+                self._db.commit()
+
+    def track(self, node: str, key: str):
+        with self._lock:
+            keys = self._node_keys.setdefault(node, OrderedDict())
+            keys[key] = None
+            keys.move_to_end(key)
+            while len(keys) > self.max_entries:
+                keys.popitem(last=False)
+
+    def evict_where(self, node: str, predicate: Callable[[str], bool]) -> int:
+        """Deletes the node's tracked entries with any generation matching `predicate`; returns the count."""
+        with self._lock:
+            keys = self._node_keys.get(node, OrderedDict())
+            evicted = []
+            for key in list(keys):
+                entry = self._memory.get(key)
+                if entry is None and self._db is not None:
+                    row = self._db.execute("SELECT created, value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                    entry = (row[0], json.loads(row[1])) if row else None
+                if entry is None:
+                    keys.pop(key)
+                elif any(predicate(item["content"]) for item in entry[1]):
+                    evicted.append(key)
+            for key in evicted:
+                keys.pop(key)
+                self._memory.pop(key, None)
+                if self._db is not None:
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            if evicted and self._db is not None:
+                self._db.commit()
+            return len(evicted)
+
+    def invalidate(self):
+        """Drops the memory tier; disk entries are unreachable under a new schema version."""
+        with self._lock:
+            self._memory.clear()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._node_keys.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+
+class NodeResponseCache(BaseCache):
+    """LangChain cache view of the shared ResponseStore that tracks hits per node."""
+
+    def __init__(self, store: ResponseStore, node: str):
+        self.store = store
+        self.node = node
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key = self.store.make_key(prompt, llm_string)
+        value = self.store.get(key)
+        if value is None:
+            metrics.incr("llm_cache_misses", node=self.node)
+            return None
+        metrics.incr("llm_cache_hits", node=self.node)
+        self.store.track(self.node, key)
+        return [ChatGeneration(message=AIMessage(content=item["content"])) for item in value]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]):
+        value = [
+            {"content": g.message.content if isinstance(g, ChatGeneration) else g.text}
+            for g in return_val
+        ]
+        key = self.store.make_key(prompt, llm_string)
+        self.store.set(key, value)
+        self.store.track(self.node, key)
+
+    def clear(self, **kwargs: Any):
+        self.store.clear()
+
+    # The store is in-memory/local SQLite, so skip the executor hop
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        return self.lookup(prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: Sequence[Generation]):
+        self.update(prompt, llm_string, return_val)
+
+    async def aclear(self, **kwargs: Any):
+        self.clear()
+
+
+def cache_stats() -> Dict[str, Dict[str, float]]:
+    """Per-node hits, misses and hit rate."""
+    stats: Dict[str, Dict[str, float]] = {}
+    for counter, field in (("llm_cache_hits", "hits"), ("llm_cache_misses", "misses")):
+        for label, value in metrics.counter_series(counter).items():
+            node = label.split("=", 1)[-1]
+            stats.setdefault(node, {"hits": 0, "misses": 0})[field] = value
+    for node_stats in stats.values():
+        total = node_stats["hits"] + node_stats["misses"]
+        node_stats["hit_rate"] = round(node_stats["hits"] / total, 3) if total else 0.0
+    return stats
+
+
+response_store = ResponseStore(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    path=settings.LLM_CACHE_PATH
+)
+manager.add_schema_listener(lambda conn_id, schema: response_store.invalidate())
+metrics.register_collector("llm_cache", cache_stats)
+
+
+def get_node_cache(node: Optional[str], temperature: float) -> Optional[NodeResponseCache]:
+    """Cache for deterministic (temperature 0) node calls, None otherwise."""
+    if not settings.LLM_CACHE_ENABLED or not node or temperature != 0:
+        return None
+    return NodeResponseCache(response_store, node)
+
+
+def evict_rejected_sql(sql: str) -> int:
+    """
+    Drops cached coder/critic replies containing `sql` once it has been rejected
+    (validation, planner or execution error), so asking again regenerates it
+    instead of replaying the failure. Critic retries don't need this: the error
+    is part of their prompt, so they never share a key with the failed attempt.
+    """
+    target = normalize_prompt(sql.strip().rstrip(";"))
+    if not target:
+        return 0
+    evicted = sum(
+        response_store.evict_where(node, lambda content: target in normalize_prompt(content))
+        for node in SQL_NODES
+    )
+    if evicted:
+        metrics.incr("llm_cache_evictions", value=evicted)
+    return evicted
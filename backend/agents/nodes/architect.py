@@ -1,13 +1,19 @@
 
-import json
 import logging
 from backend.agents.state import AgentState
-from backend.agents.llm import get_llm
+from backend.agents.structured import get_structured_llm, parse_json_output, ARCHITECT_SCHEMA
 from backend.agents.prompts.architect_prompt import architect_prompt
 from backend.mcp.tools import handle_get_schema
+from backend.mcp.catalog import canonicalize_schema
 
 logger = logging.getLogger(__name__)
 
+def render_previous_tables(state: AgentState) -> str:
+    if not state.get("previous_sql"):
+        return "None."
+    tables = ", ".join(state.get("previous_tables") or []) or "not recorded"
+    return f"Question: {state.get('previous_question', '')}\nTables: {tables}"
+
 async def architect_node(state: AgentState):
     """
     Identifies relevant tables for the query.
@@ -16,30 +22,30 @@ async def architect_node(state: AgentState):
     
     question = state["user_question"]
     
-    # 1. Get full schema
+    # 1. Get full schema (already loaded by the schema loader in the graph)
     # Using handle_get_schema directly since we are in the same process
     # In a real distributed system, this would be an MCP client call
-    schema_results = await handle_get_schema()
-    full_schema = schema_results[0].text
+    full_schema = state.get("schema_context")
+    if not full_schema:
+        schema_results = await handle_get_schema()
+        # Canonical text keeps the prompt prefix identical across nodes and requests
+        full_schema = canonicalize_schema(schema_results[0].text)
     
     # 2. Call LLM
-    llm = get_llm(temperature=0)
+    llm = get_structured_llm("architect", ARCHITECT_SCHEMA)
     chain = architect_prompt | llm
     
     try:
         response = await chain.ainvoke({
             "schema": full_schema,
+            "previous": render_previous_tables(state),
             "question": question
         })
         content = response.content
         
-         # Strip markdown
-        if "```json" in content:
-            content = content.replace("```json", "").replace("```", "")
-        elif "```" in content:
-             content = content.replace("```", "")
-             
-        table_names = json.loads(content.strip())
+        parsed = parse_json_output("architect", content)
+        # {"tables": [...]}, or a bare list from unconstrained backends
+        table_names = parsed.get("tables") if isinstance(parsed, dict) else parsed
         
         # Verify valid list
         if not isinstance(table_names, list):
@@ -48,18 +54,12 @@ async def architect_node(state: AgentState):
              
         logger.info(f"Identified tables: {table_names}")
         
-        # 3. Get focused schema (optional optimization)
-        # For now, we'll pass the full schema context or filter it?
-        # Let's filter it to save tokens for the Coder
-        if table_names:
-            focused_schema_res = await handle_get_schema(table_names)
-            schema_context = focused_schema_res[0].text
-        else:
-            schema_context = full_schema
-            
+        # 3. Coder and critic get the same schema text as this node so the
+        # backend can reuse the cached prefix; the selected tables travel
+        # separately in relevant_tables
         return {
             "relevant_tables": table_names,
-            "schema_context": schema_context
+            "schema_context": full_schema
         }
         
     except Exception as e:
@@ -20,7 +20,7 @@ async def chat_responder_node(state: AgentState):
     logger.info("--- Chat Responder Node ---")
     
     question = state.get("user_question", "")
-    llm = get_llm(temperature=0.7)
+    llm = get_llm(temperature=0.7, node="chat_responder")
     
     messages = [
         SystemMessage(content=CHAT_SYSTEM_PROMPT),
@@ -1,12 +1,46 @@
 
+import re
 import logging
+from backend.config import settings
 from backend.agents.state import AgentState
 from backend.agents.llm import get_llm
 from backend.agents.prompts.coder_prompt import coder_prompt
 from backend.mcp.validator import validate_sql
+from backend.mcp.profiler import profiler
+from backend.mcp.join_graph import join_planner
+from backend.mcp.catalog import parse_schema
+from backend.agents.candidates import generate_candidates, select_candidate
+from backend.agents.deadline import remaining
+from backend.agents.llm_cache import evict_rejected_sql
 
 logger = logging.getLogger(__name__)
 
+def extract_sql(raw_content: str) -> str:
+    """Pulls the SQL out of an LLM reply (fenced block, or the trailing SELECT)."""
+    # Extract SQL from markdown code blocks if present
+    sql_match = re.search(r'```sql\s*(.*?)```', raw_content, re.DOTALL | re.IGNORECASE)
+    if sql_match:
+        return sql_match.group(1).strip()
+    # Try generic code block
+    code_match = re.search(r'```\s*(.*?)```', raw_content, re.DOTALL)
+    if code_match:
+        sql_query = code_match.group(1).strip()
+        # Remove language hint if present (like "sql\n")
+        if sql_query.lower().startswith("sql"):
+            sql_query = sql_query[3:].strip()
+        return sql_query
+    # No code blocks, use raw content but check for common patterns
+    # Sometimes LLM adds "SELECT" after explanation text
+    select_match = re.search(r'(SELECT\s+.*)', raw_content, re.DOTALL | re.IGNORECASE)
+    if select_match:
+        return select_match.group(1).strip()
+    return raw_content.strip()
+
+def render_previous(state: AgentState) -> str:
+    if not state.get("previous_sql"):
+        return "None."
+    return f"Question: {state.get('previous_question', '')}\nSQL: {state['previous_sql']}"
+
 async def coder_node(state: AgentState):
     """
     Generates SQL query.
@@ -15,40 +49,37 @@ async def coder_node(state: AgentState):
     
     question = state["user_question"]
     schema = state["schema_context"]
+    relevant_tables = state.get("relevant_tables", [])
+    # Single-call mode: no architect pass, so hint over the whole (small) schema
+    hint_tables = relevant_tables or sorted(parse_schema(schema))
+    profiles = profiler.render(hint_tables) or "Not available yet."
+    join_path = join_planner.render(hint_tables) or "No joins needed."
+    
+    inputs = {
+        "schema": schema,
+        "tables": ", ".join(relevant_tables) or "not narrowed down, use the schema",
+        "join_path": join_path,
+        "profiles": profiles,
+        "previous": render_previous(state),
+        "question": question
+    }
     
-    llm = get_llm(temperature=0)
-    chain = coder_prompt | llm
+    async def generate(index: int) -> str:
+        # Candidate 0 is the greedy sample, the rest add diversity
+        temperature = 0 if index == 0 else settings.AGENT_SQL_CANDIDATE_TEMPERATURE
+        chain = coder_prompt | get_llm(temperature=temperature, node="coder")
+        response = await chain.ainvoke(inputs)
+        return extract_sql(response.content.strip())
     
     try:
-        response = await chain.ainvoke({
-            "schema": schema,
-            "question": question
-        })
-        raw_content = response.content.strip()
-        
-        # Extract SQL from markdown code blocks if present
-        import re
-        sql_match = re.search(r'```sql\s*(.*?)```', raw_content, re.DOTALL | re.IGNORECASE)
-        if sql_match:
-            sql_query = sql_match.group(1).strip()
+        alternates = []
+        if settings.AGENT_SQL_CANDIDATES > 1:
+            budget = min(settings.AGENT_SQL_CANDIDATE_BUDGET_SECONDS, remaining(state))
+            candidates = await generate_candidates(generate, settings.AGENT_SQL_CANDIDATES, budget)
+            chosen, alternates = await select_candidate(candidates)
+            sql_query = chosen["sql"]
         else:
-            # Try generic code block
-            code_match = re.search(r'```\s*(.*?)```', raw_content, re.DOTALL)
-            if code_match:
-                sql_query = code_match.group(1).strip()
-                # Remove language hint if present (like "sql\n")
-                if sql_query.lower().startswith("sql"):
-                    sql_query = sql_query[3:].strip()
-            else:
-                # No code blocks, use raw content but check for common patterns
-                # Sometimes LLM adds "SELECT" after explanation text
-                select_match = re.search(r'(SELECT\s+.*)', raw_content, re.DOTALL | re.IGNORECASE)
-                if select_match:
-                    sql_query = select_match.group(1).strip()
-                else:
-                    sql_query = raw_content
-        
-        sql_query = sql_query.strip()
+            sql_query = await generate(0)
         
         # Validate (Agent level validation)
         # We also validate at MCP level, but catching early is good
@@ -56,12 +87,14 @@ async def coder_node(state: AgentState):
              validate_sql(sql_query)
         except Exception as e:
             logger.error(f"Generated unsafe/invalid SQL: {e}")
+            evict_rejected_sql(sql_query)
             return {"sql_error": str(e), "sql_query": sql_query}
             
         logger.info(f"Generated SQL: {sql_query}")
         
         return {
             "sql_query": sql_query,
+            "sql_candidates": alternates,
             "sql_error": None
         }
         
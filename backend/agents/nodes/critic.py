@@ -2,6 +2,8 @@
 import logging
 from backend.agents.state import AgentState
 from backend.agents.llm import get_llm
+from backend.agents.deadline import within_deadline
+from backend.agents.llm_cache import evict_rejected_sql
 from backend.agents.prompts.critic_prompt import critic_prompt
 from backend.mcp.validator import validate_sql
 
@@ -19,18 +21,18 @@ async def critic_node(state: AgentState):
     schema = state.get("schema_context", "")
     retry_count = state.get("retry_count", 0)
     
-    llm = get_llm(temperature=0)
+    llm = get_llm(temperature=0, node="critic")
     chain = critic_prompt | llm
     
     try:
         logger.info(f"Attempting fix for error: {error}")
         
-        response = await chain.ainvoke({
+        response = await within_deadline(state, chain.ainvoke({
             "question": question,
             "sql_query": sql_query,
             "error": error,
             "schema": schema
-        })
+        }))
         
         new_sql = response.content.strip()
         
@@ -48,6 +50,7 @@ async def critic_node(state: AgentState):
              validate_sql(new_sql)
         except Exception as e:
             logger.error(f"Critic generated unsafe/invalid SQL: {e}")
+            evict_rejected_sql(new_sql)
             return {
                 "sql_error": f"Critic failed to generate valid SQL: {e}",
                 "retry_count": retry_count + 1
@@ -16,7 +16,8 @@ def error_handler_node(state: AgentState):
     # In a real system, we might use an LLM here to generate a polite apology based on the error
     # For now, a template message is sufficient and faster
     
-    message = f"""I apologize, but I was unable to process your request after multiple attempts.
+    attempts = "within the time available" if "critic" in (state.get("skipped_stages") or []) else "after multiple attempts"
+    message = f"""I apologize, but I was unable to process your request {attempts}.
 
 **Original Question:** {question}
 **Error Encountered:** {error}
@@ -1,7 +1,13 @@
 
+import asyncio
 import logging
+from backend.config import settings
 from backend.agents.state import AgentState
-from backend.mcp.tools import handle_run_query
+from backend.agents.candidates import results_agree
+from backend.agents.llm_cache import evict_rejected_sql
+from backend.agents.results import columnar_result
+from backend.mcp.tools import run_query_rows
+from backend.observability.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -16,27 +22,43 @@ async def executor_node(state: AgentState):
         logger.error("No SQL query found in state")
         return {"sql_error": "No SQL generated"}
         
+    alternates = state.get("sql_candidates") or []
+    if settings.AGENT_SQL_CANDIDATE_AGREEMENT and alternates and not state.get("retry_count"):
+        # Runner-up runs alongside the chosen query, so the check adds no wall time
+        result, (alternate_rows, alternate_error) = await asyncio.gather(execute_sql(sql_query), run_query_rows(alternates[0]))
+        if not result.get("sql_error"):
+            alternate = columnar_result(alternate_rows or [], settings.AGENT_MAX_RESULT_ROWS)
+            agree = not alternate_error and results_agree(result["query_result"], alternate)
+            metrics.incr("sql_candidate_agreement", outcome="agree" if agree else "disagree")
+            if not agree:
+                logger.warning(f"SQL candidates disagree, keeping the chosen one. Runner-up: {alternates[0]}")
+    else:
+        result = await execute_sql(sql_query)
+        
+    if result.get("sql_error"):
+        evict_rejected_sql(sql_query)
+    return result
+
+async def execute_sql(sql_query: str):
+    """
+    Runs a query and returns the state update (results or sql_error).
+    Shared with the SQL repair node, which re-executes fixed queries.
+    """
     try:
         # Execute query via MCP tool
-        results = await handle_run_query(sql_query)
-        
-        # Parse TextContent result
-        # handle_run_query returns list[TextContent]
-        result_text = results[0].text
+        rows, error = await run_query_rows(sql_query)
         
-        # Check for error in text (simple heuristic based on our tool implementation)
-        if "Error:" in result_text or "Security Violation:" in result_text or "Database Error:" in result_text:
-             logger.error(f"Query execution failed: {result_text}")
+        if error:
+             logger.error(f"Query execution failed: {error}")
              return {
-                 "sql_error": result_text,
-                 "final_response": f"I encountered an error executing the query: {result_text}"
+                 "sql_error": error,
+                 "final_response": f"I encountered an error executing the query: {error}"
              }
              
-        logger.info("Query executed successfully")
-        return {
-            "query_result": [{"result": result_text}], # Storing raw text for now as the tool formats it as markdown
-            "final_response": f"Here are the results:\n\n{result_text}"
-        }
+        # Typed columns; markdown is only rendered where someone reads it
+        query_result = columnar_result(rows, settings.AGENT_MAX_RESULT_ROWS)
+        logger.info(f"Query executed successfully ({query_result['row_count']} rows)")
+        return {"query_result": query_result}
         
     except Exception as e:
         logger.error(f"Executor failed: {e}")
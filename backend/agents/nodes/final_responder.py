@@ -1,11 +1,24 @@
 
+import asyncio
 import logging
 from backend.agents.state import AgentState
 from backend.agents.llm import get_llm
+from backend.config import settings
+from backend.agents.summarizer import summarize_result
+from backend.agents.results import render_markdown
+from backend.agents.deadline import has_budget, skip, within_deadline
 from backend.agents.prompts.responder_prompt import responder_prompt
 
 logger = logging.getLogger(__name__)
 
+# Rows shown by the template answer used when there is no time for the LLM
+TEMPLATE_ROWS = 20
+
+def template_response(query_result: dict) -> str:
+    if not query_result.get("row_count"):
+        return "The query ran successfully but returned no rows."
+    return f"Here are the results ({query_result['row_count']:,} rows):\n\n{render_markdown(query_result, max_rows=TEMPLATE_ROWS)}"
+
 async def final_responder_node(state: AgentState):
     """
     Generates a natural language response based on the query result.
@@ -14,31 +27,32 @@ async def final_responder_node(state: AgentState):
     
     user_question = state.get("user_question")
     sql_query = state.get("sql_query")
-    query_result = state.get("query_result", [])
-    visualization_code = state.get("visualization_code")  # Pass through from visualizer
+    query_result = state.get("query_result") or {}
+    
+    if not has_budget(state, "final_responder"):
+        return {"final_response": template_response(query_result), **skip("final_responder", state)}
     
-    # If result is too large, truncate it for the prompt
-    result_str = str(query_result)
-    if len(result_str) > 2000:
-        result_str = result_str[:2000] + "... (truncated)"
+    # Digest of the whole result, same prompt size however many rows came back
+    result_str = summarize_result(query_result, settings.AGENT_RESULT_SUMMARY_CHARS)
         
-    llm = get_llm(temperature=0.5)
+    llm = get_llm(temperature=0.5, node="final_responder")
     chain = responder_prompt | llm
     
     try:
-        response = await chain.ainvoke({
+        response = await within_deadline(state, chain.ainvoke({
             "user_question": user_question,
             "sql_query": sql_query,
             "query_result": result_str
-        })
+        }))
         
+        # visualization_code is written by the visualizer, which runs in parallel
         return {
-            "final_response": response.content,
-            "visualization_code": visualization_code  # Pass through to WebSocket handler
+            "final_response": response.content
         }
+    except asyncio.TimeoutError:
+        return {"final_response": template_response(query_result), **skip("final_responder", state)}
     except Exception as e:
         logger.error(f"Final responder failed: {e}")
         return {
-            "final_response": f"I found the data (Row count: {len(query_result)}), but couldn't generate a summary. Please check the visualization.",
-            "visualization_code": visualization_code
+            "final_response": f"I found the data (Row count: {query_result.get('row_count', 0)}), but couldn't generate a summary. Please check the visualization."
         }
@@ -0,0 +1,16 @@
+
+import logging
+from backend.agents.state import AgentState
+
+logger = logging.getLogger(__name__)
+
+def output_join_node(state: AgentState):
+    """
+    Fan-in point of the output layer.
+    Runs once visualizer and final_responder (run in parallel) are both done.
+    """
+    logger.info("--- Output Join Node ---")
+    
+    if not state.get("final_response") and state.get("visualization_code"):
+        return {"final_response": "Here is the visualization for your data."}
+    return {}
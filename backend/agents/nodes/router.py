@@ -1,16 +1,23 @@
 
-import json
+import asyncio
 import logging
+from typing import Optional
 from langchain_core.messages import HumanMessage
 from backend.agents.state import AgentState
-from backend.agents.llm import get_llm
+from backend.agents.structured import get_structured_llm, parse_json_output, ROUTER_SCHEMA
 from backend.agents.prompts.router_prompt import router_prompt
+from backend.agents.router_rules import classify_fast
+from backend.agents.speculation import start_speculative_plan, resolve_speculative_plan
 
 logger = logging.getLogger(__name__)
 
-def router_node(state: AgentState):
+ROUTER_TIMEOUT_SECONDS = 10
+
+async def router_node(state: AgentState):
     """
     Classifies the user's intent.
+    Confident rule matches skip the LLM entirely. In speculative mode the
+    data-query planning runs concurrently with the LLM classification.
     """
     logger.info("--- Router Node ---")
     
@@ -25,22 +32,38 @@ def router_node(state: AgentState):
          elif isinstance(last_msg, dict):
              user_input = last_msg.get('content', '')
 
-    llm = get_llm(temperature=0)
+    fast_result = classify_fast(user_input)
+    if fast_result:
+        intent, confidence = fast_result
+        logger.info(f"Classified intent via fast path: {intent} ({confidence})")
+        return {
+            "intent": intent,
+            "intent_confidence": confidence
+        }
+
+    speculation = start_speculative_plan(state)
+    try:
+        result = await classify_with_llm(user_input, state.get("previous_question"))
+        result.update(await resolve_speculative_plan(speculation, result["intent"], result["intent_confidence"]))
+        return result
+    finally:
+        if speculation and not speculation.done():
+            speculation.cancel()
+
+async def classify_with_llm(user_input: str, previous_question: Optional[str] = None):
+    """LLM classification, GENERAL_CHAT on failure. Session follow-ups are classified in context."""
+    llm = get_structured_llm("router", ROUTER_SCHEMA)
     chain = router_prompt | llm
+    if previous_question:
+        user_input = f"Previous question: {previous_question}\nCurrent question: {user_input}"
     
     try:
         # Add timeout to prevent hanging
-        response = chain.invoke({"input": user_input}, config={"callbacks": [], "timeout": 10})
+        response = await asyncio.wait_for(chain.ainvoke({"input": user_input}), timeout=ROUTER_TIMEOUT_SECONDS)
         content = response.content
         logger.info(f"Raw Router Response: {content}")
         
-        # Strip markdown code blocks if present
-        if "```json" in content:
-            content = content.replace("```json", "").replace("```", "")
-        elif "```" in content:
-             content = content.replace("```", "")
-             
-        parsed = json.loads(content.strip())
+        parsed = parse_json_output("router", content)
         
         intent = parsed.get("intent", "AMBIGUOUS")
         confidence = parsed.get("confidence", 0.0)
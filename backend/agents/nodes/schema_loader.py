@@ -0,0 +1,37 @@
+
+import logging
+from backend.config import settings
+from backend.agents.state import AgentState
+from backend.mcp.tools import handle_get_schema
+from backend.mcp.catalog import canonicalize_schema
+from backend.agents.deadline import has_budget, skip
+
+logger = logging.getLogger(__name__)
+
+# Rough chars-per-token for schema text; no tokenizer for local models
+CHARS_PER_TOKEN = 4
+
+async def schema_loader_node(state: AgentState):
+    """
+    Loads the canonical schema and picks the planning mode.
+    Small schemas go straight to the coder (single_call); large ones
+    go through the architect first (two_step).
+    """
+    logger.info("--- Schema Loader Node ---")
+    
+    schema_results = await handle_get_schema()
+    # Canonical text keeps the prompt prefix identical across nodes and requests
+    schema = canonicalize_schema(schema_results[0].text)
+    
+    estimated_tokens = len(schema) // CHARS_PER_TOKEN
+    threshold = settings.AGENT_SINGLE_CALL_SCHEMA_TOKENS
+    planning_mode = "single_call" if 0 < estimated_tokens <= threshold else "two_step"
+    logger.info(f"Schema ~{estimated_tokens} tokens (threshold {threshold}): {planning_mode}")
+    
+    update = {"schema_context": schema, "relevant_tables": []}
+    if planning_mode == "two_step" and not has_budget(state, "architect"):
+        # No time for table selection: the coder works from the full schema
+        planning_mode = "single_call"
+        update.update(skip("architect", state))
+    
+    return {**update, "planning_mode": planning_mode}
@@ -0,0 +1,62 @@
+
+import logging
+from backend.agents.state import AgentState
+from backend.agents.sql_repair import propose_repair
+from backend.agents.deadline import has_budget, skip
+from backend.agents.nodes.executor import execute_sql
+from backend.mcp.catalog import parse_schema
+from backend.mcp.manager import manager, QUERY_CONNECTION_ID
+from backend.mcp.profiler import profiler
+from backend.mcp.validator import validate_sql
+from backend.observability.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Local fixes to try per failure before handing over to the critic
+MAX_LOCAL_REPAIRS = 2
+
+async def sql_repair_node(state: AgentState):
+    """
+    Fixes mechanical SQL errors without an LLM call.
+    Misspelled identifiers, enum literal case, dialect functions and
+    missing GROUP BY columns are patched and re-executed; anything else
+    is left for the critic, if the request still has time for it.
+    """
+    logger.info("--- SQL Repair Node ---")
+    
+    sql_query = state.get("sql_query") or ""
+    error = state.get("sql_error") or ""
+    catalog = parse_schema(state.get("schema_context") or "")
+    enum_values = {
+        table: {column: stats["values"] for column, stats in profiler.get_table_profile(table).items() if "values" in stats}
+        for table in catalog
+    }
+    dialect = manager.get_connection_type(QUERY_CONNECTION_ID) or "postgres"
+    
+    for _ in range(MAX_LOCAL_REPAIRS):
+        proposal = propose_repair(sql_query, error, catalog, enum_values, dialect)
+        if not proposal:
+            break
+        kind, repaired_sql = proposal
+        logger.info(f"Local {kind} repair: {repaired_sql}")
+        
+        try:
+            validate_sql(repaired_sql)
+        except Exception as e:
+            logger.warning(f"Repaired SQL rejected by validator: {e}")
+            metrics.incr("sql_repair", kind=kind, outcome="failed")
+            break
+            
+        result = await execute_sql(repaired_sql)
+        if not result.get("sql_error"):
+            metrics.incr("sql_repair", kind=kind, outcome="fixed")
+            return {**result, "sql_query": repaired_sql, "sql_error": None}
+            
+        # Fixed one problem and hit the next one: keep going from here
+        metrics.incr("sql_repair", kind=kind, outcome="failed")
+        sql_query, error = repaired_sql, result["sql_error"]
+        
+    if not has_budget(state, "critic"):
+        return {"sql_query": sql_query, "sql_error": error, **skip("critic", state)}
+    metrics.incr("sql_repair", kind="none", outcome="escalated")
+    return {"sql_query": sql_query, "sql_error": error}
@@ -1,44 +1,55 @@
 
+import json
 import logging
 from backend.agents.state import AgentState
-from backend.agents.llm import get_llm
+from backend.agents.structured import get_structured_llm, parse_json_output, VISUALIZER_SCHEMA
+from backend.agents.results import result_columns, render_markdown
+from backend.agents.charts import build_chart_spec
+from backend.agents.deadline import has_budget, skip, within_deadline
+from backend.observability.metrics import metrics
 from backend.agents.prompts.visualizer_prompt import visualizer_prompt
 
 logger = logging.getLogger(__name__)
 
+# The LLM fallback needs the shape of the data, not every row
+LLM_CONTEXT_ROWS = 200
+
 async def visualizer_node(state: AgentState):
     """
     Generates Plotly JSON for visualization.
+    Common result shapes are charted by rules; the LLM only handles the rest.
     """
     logger.info("--- Visualizer Node ---")
     
     question = state.get("user_question")
-    query_results = state.get("query_result", [])
+    query_result = state.get("query_result")
     
-    if not query_results:
+    if not query_result or not query_result["row_count"]:
         return {"visualization_code": None}
         
-    data_context = query_results[0].get("result", "")
+    figure = build_chart_spec(question, result_columns(query_result))
+    if figure:
+        chart_type = figure["data"][0]["type"]
+        logger.info(f"Built {chart_type} chart from rules")
+        metrics.incr("chart_builder", outcome="rule", chart=chart_type)
+        return {"visualization_code": json.dumps(figure)}
+    if not has_budget(state, "visualizer"):
+        return {"visualization_code": None, **skip("visualizer", state)}
+    metrics.incr("chart_builder", outcome="llm_fallback")
     
-    llm = get_llm(temperature=0)
+    llm = get_structured_llm("visualizer", VISUALIZER_SCHEMA)
     chain = visualizer_prompt | llm
     
     try:
-        response = await chain.ainvoke({
+        response = await within_deadline(state, chain.ainvoke({
             "question": question,
-            "data_context": data_context
-        })
-        
-        json_code = response.content.strip()
+            "data_context": render_markdown(query_result, max_rows=LLM_CONTEXT_ROWS)
+        }))
         
-        # Clean markdown
-        if json_code.startswith("```json"):
-            json_code = json_code[7:]
-        if json_code.startswith("```"):
-            json_code = json_code[3:]
-        if json_code.endswith("```"):
-            json_code = json_code[:-3]
-        json_code = json_code.strip()
+        figure = parse_json_output("visualizer", response.content)
+        if not isinstance(figure, dict) or "data" not in figure:
+            raise ValueError("Visualizer output is not a Plotly figure")
+        json_code = json.dumps(figure)
         
         logger.info("Generated Visualization Config")
         
@@ -11,26 +11,15 @@ def viz_router_node(state: AgentState):
     logger.info("--- Viz Router Node ---")
     
     question = state.get("user_question", "").lower()
-    query_results = state.get("query_result", [])
+    query_result = state.get("query_result") or {}
     
     # Simple Heuristics for now
     viz_keywords = ["chart", "plot", "graph", "visualize", "visualization", "trend", "distribution", "bar", "line", "pie"]
     
     explicit_request = any(k in question for k in viz_keywords)
     
-    has_data = False
-    is_table = False
-    
-    if query_results:
-        result_text = query_results[0].get("result", "")
-        # Check if it looks like a markdown table
-        if "|" in result_text and "---" in result_text:
-            is_table = True
-            # Check row count (rough)
-            lines = result_text.strip().split('\n')
-            # Header + Separator + Data
-            if len(lines) > 3: 
-                has_data = True
+    # More than one row: something to plot
+    has_data = query_result.get("row_count", 0) > 1
 
     needs_viz = False
     
@@ -41,6 +30,8 @@ def viz_router_node(state: AgentState):
         
     logger.info(f"Needs Visualization: {needs_viz}")
     
+    # No deadline check here: rule-based charts cost nothing, the visualizer
+    # only skips its LLM fallback when the budget is short
     return {
         "needs_visualization": needs_viz,
         "visualization_type": "plotly" if needs_viz else None
@@ -1,22 +1,27 @@
 
 from langchain_core.prompts import ChatPromptTemplate
+from backend.agents.prompts.shared_prompt import SQL_AGENT_PREFIX
 
-ARCHITECT_SYSTEM_PROMPT = """You are a specialized Database Architect.
+ARCHITECT_SYSTEM_PROMPT = SQL_AGENT_PREFIX + """YOUR ROLE: Database Architect.
 Your goal is to analyze the user's question and the database schema to identify EXACTLY which tables are needed to answer the question.
 
-DATABASE SCHEMA:
-{schema}
-
 INSTRUCTIONS:
 1. Identify relevant tables.
 2. Consider joins that might be necessary (e.g., joining orders and customers).
 3. Be precise - do not select tables that are not needed.
 
-Output a JSON list of table names ONLY:
-["table_1", "table_2"]
+Output JSON ONLY, listing the table names:
+{{"tables": ["table_1", "table_2"]}}
+"""
+
+ARCHITECT_USER_PROMPT = """PREVIOUS QUESTION IN THIS CONVERSATION (reuse its tables only when the question is a follow-up):
+{previous}
+
+QUESTION:
+{question}
 """
 
 architect_prompt = ChatPromptTemplate.from_messages([
     ("system", ARCHITECT_SYSTEM_PROMPT),
-    ("user", "{question}")
+    ("user", ARCHITECT_USER_PROMPT)
 ])
@@ -1,12 +1,10 @@
 
 from langchain_core.prompts import ChatPromptTemplate
+from backend.agents.prompts.shared_prompt import SQL_AGENT_PREFIX
 
-CODER_SYSTEM_PROMPT = """You are an expert PostgreSQL developer. 
+CODER_SYSTEM_PROMPT = SQL_AGENT_PREFIX + """YOUR ROLE: expert PostgreSQL developer.
 Your goal is to generate a valid, efficient SQL query to answer the user's question based on the provided schema.
 
-SCHEMA CONTEXT:
-{schema}
-
 RULES:
 1. Generate ONLY the raw SQL query. Do not include markdown formatting (like ```sql).
 2. Use only SELECT statements. No INSERT, UPDATE, DELETE, etc.
@@ -14,11 +12,25 @@ RULES:
 4. If a specific limit isn't asked for, LIMIT the results to 100 to avoid overwhelming the user.
 5. Handle NULL values gracefully using COALESCE if needed.
 6. Use efficient aggregation if the user asks for summaries.
+7. Match filter literals (case, spelling, date format) to the column profiles.
+"""
+
+CODER_USER_PROMPT = """RELEVANT TABLES: {tables}
+
+JOIN PATH (join conditions between these tables, use exactly these when joining):
+{join_path}
+
+COLUMN PROFILES (sampled values and ranges, use exact literals from here):
+{profiles}
+
+PREVIOUS QUERY IN THIS CONVERSATION (build on it when the question is a follow-up):
+{previous}
 
 QUESTION:
 {question}
 """
 
 coder_prompt = ChatPromptTemplate.from_messages([
-    ("system", CODER_SYSTEM_PROMPT)
+    ("system", CODER_SYSTEM_PROMPT),
+    ("user", CODER_USER_PROMPT)
 ])
@@ -1,7 +1,8 @@
 
 from langchain_core.prompts import ChatPromptTemplate
+from backend.agents.prompts.shared_prompt import SQL_AGENT_PREFIX
 
-CRITIC_SYSTEM_PROMPT = """You are a SQL Debugging Expert.
+CRITIC_SYSTEM_PROMPT = SQL_AGENT_PREFIX + """YOUR ROLE: SQL Debugging Expert.
 Your goal is to fix the SQL query that failed to execute.
 
 Analyze the error message and the original query to determine what went wrong.
@@ -11,7 +12,12 @@ Common errors:
 - Syntax errors (missing commas, quotes)
 - Type mismatches
 
-ORIGINAL QUESTION:
+INSTRUCTIONS:
+1. Provide a brief verification of why it failed (reasoning).
+2. Generate the CORRECTED SQL query. Only output the raw SQL, no markdown.
+"""
+
+CRITIC_USER_PROMPT = """ORIGINAL QUESTION:
 {question}
 
 FAILED SQL:
@@ -19,15 +25,9 @@ FAILED SQL:
 
 ERROR MESSAGE:
 {error}
-
-SCHEMA CONTEXT:
-{schema}
-
-INSTRUCTIONS:
-1. Provide a brief verification of why it failed (reasoning).
-2. Generate the CORRECTED SQL query. Only output the raw SQL, no markdown.
 """
 
 critic_prompt = ChatPromptTemplate.from_messages([
-    ("system", CRITIC_SYSTEM_PROMPT)
+    ("system", CRITIC_SYSTEM_PROMPT),
+    ("user", CRITIC_USER_PROMPT)
 ])
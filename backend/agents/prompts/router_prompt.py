@@ -22,6 +22,8 @@ Your goal is to categorize the user's input into one of the following categories
 
 4. AMBIGUOUS: The input is unclear, too vague, or meaningless.
 
+FOLLOW-UPS: The input may start with the previous question of the conversation. Classify the current question in that context (e.g. "now break that down by month" after a data question is DATA_QUERY).
+
 IMPORTANT: If the user asks about "types of X", "categories of X", "kinds of X", or "what X are there" where X is data content (like products, customers, orders), classify as DATA_QUERY, not SCHEMA_QUESTION.
 
 Output your classification in the following JSON format ONLY:
@@ -0,0 +1,13 @@
+
+# Stable prompt prefix shared by the SQL agents (architect, coder, critic).
+# llama.cpp-based servers (LM Studio, Ollama) reuse the KV cache for a
+# matching prefix, so everything before the node's own instructions must be
+# byte-identical across nodes and requests: fixed text, then the
+# canonicalized schema. Per-request content goes in the user message.
+SQL_AGENT_PREFIX = """You are part of Antigravirt, a team of database agents that answer analytics questions with SQL.
+All agents work from the same database schema below.
+
+DATABASE SCHEMA:
+{schema}
+
+"""
@@ -0,0 +1,93 @@
+import re
+from typing import Any, Dict, List, Optional
+from backend.mcp.tools import format_markdown_table
+
+# Column types (dtypes) of a query result
+NUMERIC = "numeric"
+TEMPORAL = "temporal"
+CATEGORICAL = "categorical"
+
+NULL_VALUES = ("", "None", "null", "NULL")
+NUMBER = re.compile(r'^-?\d+(\.\d+)?([eE][-+]?\d+)?$')
+# 2024-03, 2024-03-15, 2024-03-15 10:00[:00[.fff]][+tz]
+DATE = re.compile(r'^\d{4}-\d{2}(-\d{2})?([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?([+-]\d{2}:?\d{2}|Z)?)?$')
+IDENTIFIER_NAME = re.compile(r'(^id$|_id$)', re.IGNORECASE)
+TEMPORAL_NAME = re.compile(r'^(year|quarter|month|week|day|date|hour)$', re.IGNORECASE)
+
+
+def _to_number(value: str) -> float:
+    number = float(value)
+    return int(number) if number.is_integer() and "." not in value else number
+
+
+def infer_column_type(name: str, values: List[str]) -> str:
+    present = [v for v in values if v not in NULL_VALUES]
+    if not present:
+        return CATEGORICAL
+    if all(DATE.match(v) for v in present) and not all(v.isdigit() for v in present):
+        return TEMPORAL
+    if all(NUMBER.match(v) for v in present):
+        if TEMPORAL_NAME.match(name):
+            return TEMPORAL
+        # Keys are labels, not quantities
+        return CATEGORICAL if IDENTIFIER_NAME.search(name) else NUMERIC
+    return CATEGORICAL
+
+
+def _column_values(values: List[Any], dtype: str) -> List[Any]:
+    """Nulls as None; numeric columns as numbers even when the driver returned text."""
+    if dtype != NUMERIC:
+        return values
+    return [None if v is None else (_to_number(str(v)) if isinstance(v, str) else v) for v in values]
+
+
+def columnar_result(rows: List[Dict[str, Any]], max_rows: int) -> Dict[str, Any]:
+    """
+    Query rows (as returned by the database) in the typed columnar form kept
+    in state: column names, dtypes, one value list per column, the full row
+    count, and whether rows beyond `max_rows` were dropped.
+    """
+    columns = list(rows[0].keys()) if rows else []
+    kept = rows[:max_rows]
+    dtypes, data = [], []
+    for name in columns:
+        values = [row.get(name) for row in kept]
+        dtype = infer_column_type(name, ["" if v is None else str(v) for v in values])
+        dtypes.append(dtype)
+        data.append(_column_values(values, dtype))
+    return {
+        "columns": columns,
+        "dtypes": dtypes,
+        "data": data,
+        "row_count": len(rows),
+        "truncated": len(rows) > len(kept),
+    }
+
+
+def result_columns(result: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """[{name, type, values}] per column, the shape the chart builder works on."""
+    if not result:
+        return []
+    return [
+        {"name": name, "type": dtype, "values": values}
+        for name, dtype, values in zip(result["columns"], result["dtypes"], result["data"])
+    ]
+
+
+def result_records(result: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Row dicts, for API responses."""
+    if not result:
+        return []
+    return [dict(zip(result["columns"], row)) for row in zip(*result["data"])]
+
+
+def render_markdown(result: Optional[Dict[str, Any]], max_rows: Optional[int] = None) -> str:
+    """Human-readable table, rendered only where a prompt or reply needs one."""
+    if not result or not result["row_count"]:
+        return "No results found."
+    rows = list(zip(*result["data"]))
+    shown = rows[:max_rows] if max_rows is not None else rows
+    table = format_markdown_table(result["columns"], shown)
+    if result["row_count"] > len(shown):
+        table += f"\n... ({result['row_count'] - len(shown)} more rows)"
+    return table
@@ -0,0 +1,78 @@
+import re
+from typing import Dict, List, Optional, Tuple
+from backend.observability.metrics import metrics
+
+# Deterministic pre-classifier for the router. Each rule is
+# (intent, confidence, pattern); patterns run against the lowercased,
+# whitespace-normalized question. Only unambiguous phrasings belong here,
+# everything else falls through to the LLM. Chat patterns match the whole
+# message, so "help me find revenue" is not small talk.
+RULES: List[Tuple[str, float, re.Pattern]] = [
+    # Greetings / meta questions (short messages only, see MAX_CHAT_WORDS)
+    ("GENERAL_CHAT", 0.95, re.compile(r"^(hi|hello|hey|hiya|yo|greetings|good (morning|afternoon|evening))\b[\s!.,]*(there|team|antigravirt)?[\s!.]*$")),
+    ("GENERAL_CHAT", 0.95, re.compile(r"^(thanks|thank you|thx|cheers)( (a lot|so much|very much))?[\s!.,]*(antigravirt)?[\s!.]*$")),
+    ("GENERAL_CHAT", 0.9, re.compile(r"^(who are you|what are you|what can you do|help|how do i use (this|you))\W*$")),
+
+    # Database structure
+    ("SCHEMA_QUESTION", 0.95, re.compile(r"\b(show|display|print|describe)( me)?( the)? (database |db )?schema\b")),
+    ("SCHEMA_QUESTION", 0.9, re.compile(r"^(what|which) tables\b|^(list|show)( me)?( all)?( the)? tables\b")),
+    ("SCHEMA_QUESTION", 0.9, re.compile(r"^(what|which) columns\b|^describe( the)? \w+ table\b")),
+    ("SCHEMA_QUESTION", 0.9, re.compile(r"\bwhat (data )?type is( the)? \w+ column\b")),
+
+    # Data questions
+    ("DATA_QUERY", 0.9, re.compile(r"^how (many|much)\b")),
+    ("DATA_QUERY", 0.9, re.compile(r"^(what is|what's|what are|show( me)?|give me|list)( the)? (total|average|avg|sum|count|number|top \d+|bottom \d+|max|maximum|min|minimum)\b")),
+    ("DATA_QUERY", 0.9, re.compile(r"\b(revenue|sales|orders|customers|signups) (by|per|over) (month|week|day|year|quarter|category|customer|product|region|status)\b")),
+]
+
+MAX_CHAT_WORDS = 8
+
+# A match that also mentions these is ambiguous ("how many tables are there"
+# is about the schema, not the data): it's left to the LLM
+DATA_WORDS = re.compile(r"\b(revenue|sales|orders?|customers?|products?|total|sum|average|avg|count|number of)\b")
+SCHEMA_WORDS = re.compile(r"\b(tables?|columns?|schema|fields?|data ?types?)\b")
+CONFLICTING_WORDS: Dict[str, re.Pattern] = {"GENERAL_CHAT": DATA_WORDS, "DATA_QUERY": SCHEMA_WORDS}
+
+
+def classify_fast(question: str) -> Optional[Tuple[str, float]]:
+    """
+    Returns (intent, confidence) when the rules are confident, None otherwise.
+    Conflicting matches across intents, and matches mentioning words of
+    another intent, are left to the LLM.
+    """
+    text = " ".join(question.lower().split())
+    if not text:
+        return None
+
+    matches: Dict[str, float] = {}
+    ambiguous = False
+    for intent, confidence, pattern in RULES:
+        if intent == "GENERAL_CHAT" and len(text.split()) > MAX_CHAT_WORDS:
+            continue
+        if pattern.search(text):
+            if intent in CONFLICTING_WORDS and CONFLICTING_WORDS[intent].search(text):
+                ambiguous = True
+                continue
+            matches[intent] = max(confidence, matches.get(intent, 0.0))
+
+    if ambiguous or len(matches) != 1:
+        metrics.incr("router_fast_path", outcome="conflict" if ambiguous or matches else "miss")
+        return None
+    metrics.incr("router_fast_path", outcome="hit")
+    return next(iter(matches.items()))
+
+
+def fast_path_stats() -> Dict[str, float]:
+    """Fast-path hits vs. questions that needed the LLM."""
+    series = metrics.counter_series("router_fast_path")
+    hits = series.get("outcome=hit", 0)
+    total = sum(series.values())
+    return {
+        "hits": hits,
+        "misses": series.get("outcome=miss", 0),
+        "conflicts": series.get("outcome=conflict", 0),
+        "hit_rate": round(hits / total, 3) if total else 0.0
+    }
+
+
+metrics.register_collector("router_fast_path", fast_path_stats)
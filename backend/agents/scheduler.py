@@ -0,0 +1,303 @@
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple, Union
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from backend.config import settings
+from backend.observability.metrics import metrics
+from backend.observability.node_stats import record_llm
+
+logger = logging.getLogger(__name__)
+
+# Highest priority first
+PRIORITIES = ("interactive", "evaluation")
+
+# (priority, session_id) of the work currently calling the LLM
+_llm_request: ContextVar[Tuple[str, Optional[str]]] = ContextVar(
+    "llm_request", default=("interactive", None)
+)
+
+
+class LLMQueueTimeout(Exception):
+    """Raised when a request waits longer than its priority's queue deadline."""
+    pass
+
+
+@contextmanager
+def llm_request_context(priority: str = "interactive", session_id: Optional[str] = None) -> Iterator[None]:
+    """
+    Tags every LLM call made inside the block (including graph nodes and
+    tasks spawned from it) with a priority class and session for scheduling.
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority: {priority}")
+    token = _llm_request.set((priority, session_id))
+    try:
+        yield
+    finally:
+        _llm_request.reset(token)
+
+
+def current_llm_request() -> Tuple[str, Optional[str]]:
+    return _llm_request.get()
+
+
+# A queued request: a future for async callers, an event for blocking (sync) ones
+Waiter = Union[asyncio.Future, threading.Event]
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class BackendScheduler:
+    """
+    Admission control for one LLM backend, within this process.
+
+    - at most `max_in_flight` generations run at once
+    - waiting requests are served strictly by priority class
+    - within a class, sessions are served round-robin so one chatty session
+      can't starve the others
+    - per-class in-flight caps (e.g. evaluation) keep slots free for users
+
+    Nothing is shared between processes: the eval scripts run in their own
+    process with their own scheduler, where the evaluation cap bounds how
+    hard a run hits the backend, but the server's queue doesn't see them.
+    Sync callers must not run on the event loop thread: they block while queued.
+    """
+
+    def __init__(self, name: str, max_in_flight: int, class_limits: Optional[Dict[str, int]] = None):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.class_limits = class_limits or {}
+        self._in_flight: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        # {priority: {session_id: deque[waiter]}}
+        self._queues: Dict[str, "OrderedDict[Optional[str], Deque[Waiter]]"] = {
+            p: OrderedDict() for p in PRIORITIES
+        }
+        # Sync generations come from worker threads
+        self._lock = threading.RLock()
+
+    @property
+    def in_flight(self) -> int:
+        return sum(self._in_flight.values())
+
+    def queued(self) -> int:
+        return sum(len(q) for queue in self._queues.values() for q in queue.values())
+
+    def _has_capacity(self, priority: str) -> bool:
+        if self.in_flight >= self.max_in_flight:
+            return False
+        limit = self.class_limits.get(priority)
+        return limit is None or self._in_flight[priority] < limit
+
+    def _has_waiters_ahead(self, priority: str) -> bool:
+        for p in PRIORITIES[:PRIORITIES.index(priority) + 1]:
+            if self._queues[p]:
+                return True
+        return False
+
+    def _dispatch(self):
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue and self._has_capacity(priority):
+                session_id, waiters = next(iter(queue.items()))
+                waiter = waiters.popleft()
+                if waiters:
+                    queue.move_to_end(session_id)
+                else:
+                    del queue[session_id]
+                if isinstance(waiter, threading.Event):
+                    # Sync waiters leave the queue under the lock when they give up
+                    self._in_flight[priority] += 1
+                    waiter.set()
+                elif not waiter.done():  # else cancelled or timed out while queued
+                    self._in_flight[priority] += 1
+                    loop = waiter.get_loop()
+                    if _running_loop() is loop:
+                        waiter.set_result(None)
+                    else:
+                        loop.call_soon_threadsafe(self._grant, waiter, priority)
+
+    def _grant(self, future: asyncio.Future, priority: str):
+        """Resolves a waiter on its own loop (slot released from another thread)."""
+        if future.done():
+            self.release(priority)
+        else:
+            future.set_result(None)
+
+    def _remove(self, priority: str, session_id: Optional[str], waiter: Waiter):
+        waiters = self._queues[priority].get(session_id)
+        if waiters and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del self._queues[priority][session_id]
+
+    def _try_acquire(self, priority: str) -> bool:
+        if self._has_capacity(priority) and not self._has_waiters_ahead(priority):
+            self._in_flight[priority] += 1
+            return True
+        return False
+
+    def _queue_timeout(self, priority: str, timeout: float) -> LLMQueueTimeout:
+        metrics.incr("llm_queue_timeouts", backend=self.name, priority=priority)
+        return LLMQueueTimeout(f"LLM backend '{self.name}' busy: waited over {timeout}s in the {priority} queue")
+
+    async def acquire(self, priority: str, session_id: Optional[str], timeout: float):
+        with self._lock:
+            if self._try_acquire(priority):
+                return
+            future = asyncio.get_running_loop().create_future()
+            self._queues[priority].setdefault(session_id, deque()).append(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                if future.done() and not future.cancelled():
+                    # Slot was granted just as we gave up, hand it back
+                    self.release(priority)
+                else:
+                    self._remove(priority, session_id, future)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._queue_timeout(priority, timeout) from e
+            raise
+
+    def acquire_sync(self, priority: str, session_id: Optional[str], timeout: float):
+        """Blocking acquire for sync generations, sharing the same slots and queues."""
+        with self._lock:
+            if self._try_acquire(priority):
+                return
+            event = threading.Event()
+            self._queues[priority].setdefault(session_id, deque()).append(event)
+        if event.wait(timeout):
+            return
+        with self._lock:
+            if event.is_set():
+                return  # granted just as we gave up
+            self._remove(priority, session_id, event)
+        raise self._queue_timeout(priority, timeout)
+
+    def release(self, priority: str):
+        with self._lock:
+            self._in_flight[priority] = max(0, self._in_flight[priority] - 1)
+            self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, node: Optional[str] = None) -> AsyncIterator[None]:
+        """Holds a generation slot for the duration of the block and records timings."""
+        priority, session_id = current_llm_request()
+        enqueued = time.perf_counter()
+        await self.acquire(priority, session_id, _queue_timeout_for(priority))
+        started = time.perf_counter()
+        metrics.observe("llm_queue_wait_seconds", started - enqueued, backend=self.name, priority=priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+            metrics.observe("llm_generation_seconds", time.perf_counter() - started, backend=self.name, node=node or "unknown")
+
+    @contextmanager
+    def slot_sync(self, node: Optional[str] = None) -> Iterator[None]:
+        """Blocking counterpart of slot() for sync generations."""
+        priority, session_id = current_llm_request()
+        enqueued = time.perf_counter()
+        self.acquire_sync(priority, session_id, _queue_timeout_for(priority))
+        started = time.perf_counter()
+        metrics.observe("llm_queue_wait_seconds", started - enqueued, backend=self.name, priority=priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+            metrics.observe("llm_generation_seconds", time.perf_counter() - started, backend=self.name, node=node or "unknown")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"in_flight": dict(self._in_flight), "queued": self.queued(), "max_in_flight": self.max_in_flight}
+
+
+def _queue_timeout_for(priority: str) -> float:
+    return settings.LLM_QUEUE_TIMEOUTS.get(priority, settings.LLM_QUEUE_TIMEOUTS["interactive"])
+
+
+_schedulers: Dict[str, BackendScheduler] = {}
+
+
+def get_scheduler(backend: str) -> BackendScheduler:
+    """Scheduler per backend (keyed by base URL or provider), shared within this process."""
+    scheduler = _schedulers.get(backend)
+    if scheduler is None:
+        scheduler = BackendScheduler(
+            backend,
+            max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+            class_limits={"evaluation": settings.LLM_EVAL_MAX_IN_FLIGHT}
+        )
+        _schedulers[backend] = scheduler
+    return scheduler
+
+
+metrics.register_collector("llm_scheduler", lambda: {name: s.stats() for name, s in _schedulers.items()})
+
+
+class ScheduledChatModel(BaseChatModel):
+    """
+    Wraps a chat model so every generation (streaming or not) first takes a
+    slot from its backend's scheduler. Caching happens on this wrapper, so
+    cache hits never queue.
+    """
+
+    inner: BaseChatModel
+    backend: str
+    node: Optional[str] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return f"scheduled-{self.inner._llm_type}"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return self.inner._identifying_params
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        with get_scheduler(self.backend).slot_sync(self.node):
+            started = time.perf_counter()
+            result = self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            _record_usage(_result_usage(result), time.perf_counter() - started)
+            return result
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        async with get_scheduler(self.backend).slot(self.node):
+            started = time.perf_counter()
+            result = await self.inner._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            _record_usage(_result_usage(result), time.perf_counter() - started)
+            return result
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        async with get_scheduler(self.backend).slot(self.node):
+            started = time.perf_counter()
+            usage: Dict[str, int] = {}
+            try:
+                async for chunk in self.inner._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    for field, value in (getattr(chunk.message, "usage_metadata", None) or {}).items():
+                        if isinstance(value, int):
+                            usage[field] = usage.get(field, 0) + value
+                    yield chunk
+            finally:
+                _record_usage(usage, time.perf_counter() - started)
+
+
+def _result_usage(result: ChatResult) -> Optional[Dict[str, Any]]:
+    return result.generations[0].message.usage_metadata if result.generations else None
+
+
+def _record_usage(usage: Optional[Dict[str, Any]], latency: float):
+    """Attributes a finished generation's tokens and latency to the running node."""
+    usage = usage or {}
+    record_llm(usage.get("input_tokens", 0), usage.get("output_tokens", 0), latency)
@@ -0,0 +1,222 @@
+"""
+Conversation Sessions
+
+Each session is a LangGraph thread (thread_id = session id) in a checkpointer,
+in memory or in SQLite. A new turn starts from the previous turn's final state:
+the schema, and the last question, its SQL and tables as context for follow-ups
+like "now break that down by month". The tables are only a hint for the
+architect, every question goes through table selection again. Per-turn fields
+(errors, retries, results, charts, stats) start fresh.
+
+Only the latest turn is kept per thread, messages are capped at
+SESSION_MAX_MESSAGES, and sessions idle for SESSION_TTL_SECONDS (or beyond
+the newest SESSION_MAX_SESSIONS) are deleted. A turn that fails or is
+cancelled is rolled back, so the next one continues from the last completed
+turn.
+"""
+
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from langchain_core.messages import AIMessage, HumanMessage
+from backend.config import settings
+from backend.agents.graph import build_workflow, get_graph
+
+logger = logging.getLogger(__name__)
+
+# Carried over to the next turn as-is; everything else starts fresh
+CARRIED_FIELDS = ("schema_context", "planning_mode")
+
+# Input fields that belong to the turn itself, not the conversation
+TURN_ONLY_FIELDS = ("user_question", "deadline")
+
+EVICT_INTERVAL_SECONDS = 60
+
+
+def turn_input(question: str, previous: Optional[Dict[str, Any]] = None, max_messages: int = 20) -> Dict[str, Any]:
+    """Graph input for a new turn, seeded from the previous turn's final state."""
+    previous = previous or {}
+    history = list(previous.get("messages") or [])
+    if previous.get("final_response"):
+        history.append(AIMessage(content=previous["final_response"]))
+    history = history[-(max_messages - 1):] if max_messages > 1 else []
+
+    state: Dict[str, Any] = {"user_question": question, "messages": history + [HumanMessage(content=question)]}
+    state.update({field: previous[field] for field in CARRIED_FIELDS if previous.get(field)})
+
+    if previous.get("intent") == "DATA_QUERY" and previous.get("sql_query") and not previous.get("sql_error"):
+        state["previous_question"] = previous["user_question"]
+        state["previous_sql"] = previous["sql_query"]
+        state["previous_tables"] = list(previous.get("relevant_tables") or [])
+    elif previous.get("previous_sql"):
+        # Small talk in between doesn't lose the last data question
+        state["previous_question"] = previous.get("previous_question", "")
+        state["previous_sql"] = previous["previous_sql"]
+        state["previous_tables"] = list(previous.get("previous_tables") or [])
+    return state
+
+
+async def build_checkpointer(backend: str, db_path: str):
+    """InMemorySaver, or AsyncSqliteSaver (needs langgraph-checkpoint-sqlite) for sessions that survive restarts."""
+    if backend == "sqlite":
+        try:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError as e:
+            raise RuntimeError("SESSION_BACKEND=sqlite requires the langgraph-checkpoint-sqlite package") from e
+        checkpointer = AsyncSqliteSaver(await aiosqlite.connect(db_path))
+        # Tables are otherwise created on the first write, after begin_run's delete
+        await checkpointer.setup()
+        return checkpointer
+    if backend != "memory":
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+    from langgraph.checkpoint.memory import InMemorySaver
+    return InMemorySaver()
+
+
+class SessionStore:
+    """Checkpointer-backed session state with TTL and size-bounded eviction."""
+
+    def __init__(self, backend: str, db_path: str, ttl_seconds: float, max_sessions: int, max_messages: int,
+                 evict_interval: float = EVICT_INTERVAL_SECONDS):
+        self.backend = backend
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.evict_interval = evict_interval
+        self.checkpointer = None
+        self._graph = None
+        self._last_eviction = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_graph(self):
+        """The workflow compiled with the checkpointer (built on first use, inside the event loop)."""
+        async with self._lock:
+            if self._graph is None:
+                self.checkpointer = await build_checkpointer(self.backend, self.db_path)
+                self._graph = build_workflow().compile(checkpointer=self.checkpointer)
+            return self._graph
+
+    @staticmethod
+    def config(session_id: str) -> Dict[str, Any]:
+        return {"configurable": {"thread_id": session_id}}
+
+    async def load_turn(self, session_id: str, question: str) -> Dict[str, Any]:
+        """Graph input for the next turn of a session (read-only)."""
+        session_graph = await self.get_graph()
+        await self.evict_expired()
+        snapshot = await session_graph.aget_state(self.config(session_id))
+        if snapshot.values:
+            logger.info(f"Continuing session {session_id}")
+        return turn_input(question, snapshot.values, self.max_messages)
+
+    async def begin_run(self, session_id: str) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Clears the previous turn's checkpoints (its carried state is already in
+        the turn input) and returns the graph and config to run with.
+        """
+        session_graph = await self.get_graph()
+        await self.checkpointer.adelete_thread(session_id)
+        return session_graph, self.config(session_id)
+
+    async def restore(self, session_id: str, turn: Dict[str, Any]):
+        """
+        Rolls a session back after a failed or cancelled run. The turn's input without
+        its question carries everything the next turn needs from the last
+        completed one (history, schema, previous question, SQL and tables).
+        """
+        session_graph = await self.get_graph()
+        await self.checkpointer.adelete_thread(session_id)
+        values = {field: value for field, value in turn.items() if field not in TURN_ONLY_FIELDS}
+        values["messages"] = (turn.get("messages") or [])[:-1]
+        if any(values.values()):
+            # As a finished turn, so nothing is left pending on the thread
+            await session_graph.aupdate_state(self.config(session_id), values, as_node="output_join")
+
+    async def record(self, session_id: str, turn: Dict[str, Any], outcome: Dict[str, Any]):
+        """
+        Stores a turn answered without a graph run (answer cache hit) as the
+        session's latest turn, the same final state a completed run leaves.
+        """
+        session_graph, config = await self.begin_run(session_id)
+        values = {field: value for field, value in turn.items() if field != "deadline"}
+        await session_graph.aupdate_state(config, {**values, **outcome}, as_node="output_join")
+
+    async def discard(self, session_id: str):
+        if self.checkpointer is not None:
+            await self.checkpointer.adelete_thread(session_id)
+
+    async def evict_expired(self, force: bool = False):
+        """Deletes sessions idle past the TTL, then the oldest beyond max_sessions."""
+        now = time.time()
+        if not force and now - self._last_eviction < self.evict_interval:
+            return
+        self._last_eviction = now
+        await self.get_graph()
+
+        last_active: Dict[str, float] = {}
+        async for checkpoint in self.checkpointer.alist(None):
+            thread_id = checkpoint.config["configurable"]["thread_id"]
+            ts = datetime.fromisoformat(checkpoint.checkpoint["ts"]).timestamp()
+            last_active[thread_id] = max(last_active.get(thread_id, 0), ts)
+
+        newest_first = sorted(last_active, key=last_active.get, reverse=True)
+        expired = {t for t in newest_first if now - last_active[t] > self.ttl_seconds}
+        expired.update(newest_first[self.max_sessions:])
+        for thread_id in expired:
+            await self.checkpointer.adelete_thread(thread_id)
+        if expired:
+            logger.info(f"Evicted {len(expired)} idle sessions")
+
+    async def close(self):
+        conn = getattr(self.checkpointer, "conn", None)
+        if conn is not None:
+            await conn.close()
+
+
+async def prepare_turn(session_id: Optional[str], question: str) -> Dict[str, Any]:
+    """Turn input for a session, or a fresh one for stateless requests."""
+    if session_id and settings.SESSION_ENABLED:
+        return await session_store.load_turn(session_id, question)
+    return turn_input(question)
+
+
+async def rollback_turn(session_id: Optional[str], turn: Dict[str, Any]):
+    """Undoes a failed or cancelled turn's effect on its session."""
+    if session_id and settings.SESSION_ENABLED:
+        await session_store.restore(session_id, turn)
+
+
+async def record_cached_turn(session_id: Optional[str], turn: Dict[str, Any], cached: Dict[str, Any]):
+    """Advances a session past a question answered from the answer cache."""
+    if session_id and settings.SESSION_ENABLED:
+        await session_store.record(session_id, turn, {
+            "intent": cached["intent"],
+            "intent_confidence": cached["confidence"],
+            "sql_query": cached["sql_query"],
+            "query_result": cached["query_result"],
+            "relevant_tables": cached.get("relevant_tables") or [],
+            "final_response": cached["answer"],
+        })
+
+
+async def graph_for(session_id: Optional[str]) -> Tuple[Any, Dict[str, Any]]:
+    """(graph, run kwargs) for a turn; stateless requests use the plain graph."""
+    if session_id and settings.SESSION_ENABLED:
+        session_graph, config = await session_store.begin_run(session_id)
+        # Only the final state of a turn needs checkpointing
+        return session_graph, {"config": config, "durability": "exit"}
+    return get_graph(), {}
+
+
+# Global access
+session_store = SessionStore(
+    backend=settings.SESSION_BACKEND,
+    db_path=settings.SESSION_DB_PATH,
+    ttl_seconds=settings.SESSION_TTL_SECONDS,
+    max_sessions=settings.SESSION_MAX_SESSIONS,
+    max_messages=settings.SESSION_MAX_MESSAGES,
+)
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+from backend.config import settings
+from backend.agents.state import AgentState
+from backend.agents.nodes.schema_loader import schema_loader_node
+from backend.agents.nodes.architect import architect_node
+from backend.observability.metrics import metrics
+from backend.observability.node_stats import instrument_node, merge_node_stats
+
+logger = logging.getLogger(__name__)
+
+# Same confidence bar route_router applies before sending a question to the data flow
+MIN_DATA_CONFIDENCE = 0.7
+
+_schema_loader = instrument_node("schema_loader", schema_loader_node)
+_architect = instrument_node("architect", architect_node)
+
+
+async def plan_data_query(state: AgentState) -> Dict[str, Any]:
+    """Schema load (+ architect for large schemas), as the graph would run them."""
+    plan = await _schema_loader(state)
+    if plan["planning_mode"] == "two_step":
+        tables = await _architect({**state, **plan})
+        plan = {**plan, **tables, "node_stats": merge_node_stats(plan["node_stats"], tables["node_stats"])}
+    return plan
+
+
+def start_speculative_plan(state: AgentState) -> Optional[asyncio.Task]:
+    """Starts data-query planning alongside the router LLM call (opt-in)."""
+    if not settings.AGENT_SPECULATIVE_PLANNING:
+        return None
+    return asyncio.create_task(plan_data_query(state))
+
+
+async def resolve_speculative_plan(task: Optional[asyncio.Task], intent: str, confidence: float) -> Dict[str, Any]:
+    """
+    Reuses the speculative plan for confident DATA_QUERY intents (win),
+    cancels it otherwise (loss). Returns the state update to merge.
+    """
+    if task is None:
+        return {}
+    if intent == "DATA_QUERY" and confidence >= MIN_DATA_CONFIDENCE:
+        try:
+            plan = await task
+        except Exception as e:
+            logger.warning(f"Speculative planning failed, falling back to the normal flow: {e}")
+            metrics.incr("speculation", outcome="error")
+            return {}
+        metrics.incr("speculation", outcome="win")
+        return {**plan, "speculative_plan": True}
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    metrics.incr("speculation", outcome="loss")
+    return {}
+
+
+def speculation_stats() -> Dict[str, float]:
+    series = metrics.counter_series("speculation")
+    wins = series.get("outcome=win", 0)
+    losses = series.get("outcome=loss", 0)
+    total = wins + losses + series.get("outcome=error", 0)
+    return {
+        "wins": wins,
+        "losses": losses,
+        "errors": series.get("outcome=error", 0),
+        "win_rate": round(wins / total, 3) if total else 0.0
+    }
+
+
+metrics.register_collector("speculation", speculation_stats)
@@ -0,0 +1,157 @@
+import re
+import difflib
+from typing import Callable, Dict, List, Optional, Tuple
+from backend.observability.metrics import metrics
+
+# Catalog as produced by backend.mcp.catalog.parse_schema: {table: [(column, type), ...]}
+Catalog = Dict[str, List[Tuple[str, str]]]
+# {table: {column: [profiled values]}} for low-cardinality columns
+EnumValues = Dict[str, Dict[str, List]]
+
+FUZZY_CUTOFF = 0.75
+
+# Postgres and SQLite phrasings of the errors we can fix locally
+MISSING_COLUMN = re.compile(r'column "?(?:\w+\.)?(\w+)"? does not exist|no such column: (?:\w+\.)?(\w+)', re.IGNORECASE)
+MISSING_TABLE = re.compile(r'relation "?(\w+)"? does not exist|no such table: (\w+)', re.IGNORECASE)
+BAD_ENUM = re.compile(r'invalid input value for enum \w+: "([^"]*)"', re.IGNORECASE)
+GROUP_BY = re.compile(r'column "([\w.]+)" must appear in the GROUP BY clause', re.IGNORECASE)
+MISSING_FUNCTION = re.compile(r'no such function: (\w+)|function (\w+)\(.*?\) does not exist', re.IGNORECASE)
+
+STRFTIME_TO_PG = {"%Y": "YYYY", "%m": "MM", "%d": "DD", "%H": "HH24", "%M": "MI", "%S": "SS"}
+TRUNC_TO_STRFTIME = {
+    "year": "%Y-01-01",
+    "month": "%Y-%m-01",
+    "day": "%Y-%m-%d",
+    "hour": "%Y-%m-%d %H:00:00",
+}
+EXTRACT_TO_STRFTIME = {"year": "%Y", "month": "%m", "day": "%d", "hour": "%H"}
+
+
+def _replace_identifier(sql: str, old: str, new: str) -> str:
+    """Replaces a bare or double-quoted identifier, leaving string literals alone."""
+    parts = re.split(r"('(?:[^']|'')*')", sql)
+    pattern = re.compile(rf'(?<![\w\'])"?{re.escape(old)}"?(?![\w\'])', re.IGNORECASE)
+    return "".join(part if part.startswith("'") else pattern.sub(new, part) for part in parts)
+
+
+def _closest(name: str, candidates: List[str]) -> Optional[str]:
+    lowered = {c.lower(): c for c in candidates}
+    matches = difflib.get_close_matches(name.lower(), list(lowered), n=1, cutoff=FUZZY_CUTOFF)
+    return lowered[matches[0]] if matches else None
+
+
+def fix_identifier(sql: str, error: str, catalog: Catalog, enum_values: EnumValues, dialect: str) -> Optional[str]:
+    """Misspelled table or column: fuzzy-match against the schema catalog."""
+    table = MISSING_TABLE.search(error)
+    if table:
+        name = table.group(1) or table.group(2)
+        match = _closest(name, list(catalog))
+    else:
+        column = MISSING_COLUMN.search(error)
+        if not column:
+            return None
+        name = column.group(1) or column.group(2)
+        match = _closest(name, sorted({col for cols in catalog.values() for col, _ in cols}))
+    if not match or match == name:
+        return None
+    return _replace_identifier(sql, name, match)
+
+
+def fix_enum_case(sql: str, error: str, catalog: Catalog, enum_values: EnumValues, dialect: str) -> Optional[str]:
+    """String literals that only differ in case from a known column value."""
+    if not BAD_ENUM.search(error):
+        return None
+    known = {str(v).lower(): str(v) for columns in enum_values.values() for values in columns.values() for v in values}
+
+    def fix_literal(match: re.Match) -> str:
+        literal = match.group(1)
+        return f"'{known.get(literal.lower(), literal)}'"
+
+    repaired = re.sub(r"'([^']*)'", fix_literal, sql)
+    return repaired if repaired != sql else None
+
+
+def rewrite_dialect(sql: str, error: str, catalog: Catalog, enum_values: EnumValues, dialect: str) -> Optional[str]:
+    """DATE_TRUNC/EXTRACT/ILIKE on SQLite, strftime on Postgres."""
+    function = MISSING_FUNCTION.search(error)
+    if not function:
+        return None
+    name = (function.group(1) or function.group(2)).lower()
+
+    if dialect == "sqlite" and name in ("date_trunc", "extract", "now"):
+        repaired = re.sub(
+            r"DATE_TRUNC\(\s*'(\w+)'\s*,\s*([^)]+?)\s*\)",
+            lambda m: f"strftime('{TRUNC_TO_STRFTIME.get(m.group(1).lower(), '%Y-%m-%d')}', {m.group(2)})",
+            sql, flags=re.IGNORECASE
+        )
+        repaired = re.sub(
+            r"EXTRACT\(\s*(YEAR|MONTH|DAY|HOUR)\s+FROM\s+([^)]+?)\s*\)",
+            lambda m: f"CAST(strftime('{EXTRACT_TO_STRFTIME[m.group(1).lower()]}', {m.group(2)}) AS INTEGER)",
+            repaired, flags=re.IGNORECASE
+        )
+        repaired = re.sub(r"\bNOW\(\)", "CURRENT_TIMESTAMP", repaired, flags=re.IGNORECASE)
+        repaired = re.sub(r"\bILIKE\b", "LIKE", repaired, flags=re.IGNORECASE)
+    elif dialect == "postgres" and name == "strftime":
+        def to_char(m: re.Match) -> str:
+            fmt = m.group(1)
+            for token, pg_token in STRFTIME_TO_PG.items():
+                fmt = fmt.replace(token, pg_token)
+            return f"to_char({m.group(2)}, '{fmt}')"
+        repaired = re.sub(r"strftime\(\s*'([^']*)'\s*,\s*([^)]+?)\s*\)", to_char, sql, flags=re.IGNORECASE)
+    else:
+        return None
+    return repaired if repaired != sql else None
+
+
+def fix_group_by(sql: str, error: str, catalog: Catalog, enum_values: EnumValues, dialect: str) -> Optional[str]:
+    """Adds the column Postgres says is missing from GROUP BY."""
+    missing = GROUP_BY.search(error)
+    if not missing:
+        return None
+    column = missing.group(1)
+    stripped = sql.strip().rstrip(";")
+    tail = re.search(r"\s+(HAVING|ORDER\s+BY|LIMIT)\b", stripped, re.IGNORECASE)
+    group_by = re.search(r"\bGROUP\s+BY\b", stripped, re.IGNORECASE)
+    if group_by:
+        # Append to the existing list, before HAVING / ORDER BY / LIMIT
+        after = stripped[group_by.end():]
+        end = re.search(r"\s+(HAVING|ORDER\s+BY|LIMIT)\b", after, re.IGNORECASE)
+        cut = group_by.end() + (end.start() if end else len(after))
+        return f"{stripped[:cut]}, {column}{stripped[cut:]}"
+    cut = tail.start() if tail else len(stripped)
+    return f"{stripped[:cut]} GROUP BY {column}{stripped[cut:]}"
+
+
+# Tried in order; the first one that changes the SQL wins
+REPAIRS: List[Tuple[str, Callable[..., Optional[str]]]] = [
+    ("identifier", fix_identifier),
+    ("enum_case", fix_enum_case),
+    ("dialect", rewrite_dialect),
+    ("group_by", fix_group_by),
+]
+
+
+def propose_repair(sql: str, error: str, catalog: Catalog, enum_values: EnumValues, dialect: str) -> Optional[Tuple[str, str]]:
+    """Returns (repair_kind, repaired_sql), or None if no local fix applies."""
+    for kind, repair in REPAIRS:
+        repaired = repair(sql, error, catalog, enum_values, dialect)
+        if repaired and repaired != sql:
+            return kind, repaired
+    return None
+
+
+def repair_stats() -> Dict[str, Dict[str, float]]:
+    """Per-kind local fix attempts and how many of them executed cleanly."""
+    stats: Dict[str, Dict[str, float]] = {}
+    for labels, count in metrics.counter_series("sql_repair").items():
+        fields = dict(part.split("=", 1) for part in labels.split(","))
+        kind_stats = stats.setdefault(fields["kind"], {"fixed": 0, "failed": 0})
+        kind_stats[fields["outcome"]] = kind_stats.get(fields["outcome"], 0) + count
+    for kind_stats in stats.values():
+        attempts = kind_stats["fixed"] + kind_stats["failed"]
+        if attempts:
+            kind_stats["success_rate"] = round(kind_stats["fixed"] / attempts, 3)
+    return stats
+
+
+metrics.register_collector("sql_repair", repair_stats)
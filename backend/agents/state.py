@@ -1,6 +1,7 @@
 
 import operator
-from typing import TypedDict, List, Optional, Any, Annotated
+from typing import TypedDict, List, Optional, Any, Annotated, Dict
+from backend.observability.node_stats import merge_node_stats
 
 class AgentState(TypedDict):
     """
@@ -8,15 +9,24 @@ class AgentState(TypedDict):
     """
     messages: Annotated[List[Any], operator.add]
     user_question: str
+    previous_question: str
+    previous_sql: str
+    previous_tables: List[str]
     intent: str
     intent_confidence: float
     schema_context: str
+    planning_mode: str
+    speculative_plan: bool
     relevant_tables: List[str]
     sql_query: str
+    sql_candidates: List[str]
     sql_error: Optional[str]
     retry_count: int
-    query_result: List[dict]
+    query_result: Dict[str, Any]  # columnar: columns, dtypes, data, row_count, truncated
     needs_visualization: bool
     visualization_type: Optional[str]
     visualization_code: str
     final_response: str
+    node_stats: Annotated[Dict[str, dict], merge_node_stats]
+    deadline: float  # epoch seconds
+    skipped_stages: Annotated[List[str], operator.add]
@@ -0,0 +1,109 @@
+import re
+import json
+import logging
+from typing import Any, Dict, Optional
+from langchain_core.utils.json import parse_json_markdown
+from backend.config import settings
+from backend.agents.llm import get_llm, resolve_llm_config
+from backend.observability.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# JSON schemas for nodes that answer in JSON. Passed to the backend as an
+# OpenAI-compatible `response_format` so generation is grammar-constrained.
+ROUTER_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "intent": {"type": "string", "enum": ["DATA_QUERY", "SCHEMA_QUESTION", "GENERAL_CHAT", "AMBIGUOUS"]},
+        "confidence": {"type": "number"},
+        "reasoning": {"type": "string"}
+    },
+    "required": ["intent", "confidence"]
+}
+
+ARCHITECT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "tables": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["tables"]
+}
+
+VISUALIZER_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "data": {"type": "array", "items": {"type": "object"}},
+        "layout": {"type": "object"}
+    },
+    "required": ["data", "layout"]
+}
+
+
+def get_structured_llm(node: str, schema: Dict[str, Any], temperature: float = 0):
+    """
+    LLM for `node` constrained to `schema` via `response_format` (json_schema).
+    Nodes resolved to Google (LLM_NODE_CONFIG included) and disabled setups get
+    the plain client; parse_json_output covers them.
+    """
+    llm = get_llm(temperature=temperature, node=node)
+    if not settings.LLM_STRUCTURED_OUTPUT or resolve_llm_config(node, temperature)["provider"] == "google":
+        return llm
+    return llm.bind(response_format={
+        "type": "json_schema",
+        "json_schema": {"name": f"{node}_output", "schema": schema}
+    })
+
+
+def parse_json_output(node: str, content: str) -> Any:
+    """
+    Parses a node's JSON answer. Clean JSON is the normal case; fenced,
+    prefixed or truncated output is repaired with the incremental parser.
+    Outcomes are counted per node (llm_json_parse) so failure rates show up
+    in /api/metrics. Raises ValueError when nothing usable can be recovered.
+    """
+    text = content.strip()
+    try:
+        parsed = json.loads(text)
+        metrics.incr("llm_json_parse", node=node, outcome="ok")
+        return parsed
+    except json.JSONDecodeError:
+        pass
+
+    parsed = _tolerant_parse(text)
+    if parsed is None:
+        metrics.incr("llm_json_parse", node=node, outcome="failed")
+        logger.warning(f"{node}: unparseable JSON output: {text[:200]}")
+        raise ValueError(f"{node} returned invalid JSON")
+    metrics.incr("llm_json_parse", node=node, outcome="repaired")
+    return parsed
+
+
+def _tolerant_parse(text: str) -> Optional[Any]:
+    # Fenced blocks and truncated objects/arrays
+    try:
+        parsed = parse_json_markdown(text)
+        if parsed is not None:
+            return parsed
+    except (json.JSONDecodeError, ValueError):
+        pass
+    # Prose before/after the payload: start at the first bracket
+    match = re.search(r"[\[{]", text)
+    if match and match.start() > 0:
+        return _tolerant_parse(text[match.start():])
+    return None
+
+
+def parse_stats() -> Dict[str, Dict[str, float]]:
+    """Per-node JSON parse outcomes and failure rate."""
+    stats: Dict[str, Dict[str, float]] = {}
+    for labels, count in metrics.counter_series("llm_json_parse").items():
+        fields = dict(part.split("=", 1) for part in labels.split(","))
+        node_stats = stats.setdefault(fields["node"], {"ok": 0, "repaired": 0, "failed": 0})
+        node_stats[fields["outcome"]] += count
+    for node_stats in stats.values():
+        total = node_stats["ok"] + node_stats["repaired"] + node_stats["failed"]
+        node_stats["failure_rate"] = round(node_stats["failed"] / total, 3) if total else 0.0
+    return stats
+
+
+metrics.register_collector("llm_json_parse", parse_stats)
@@ -0,0 +1,118 @@
+import logging
+from typing import Any, Dict, List, Optional
+import numpy as np
+from backend.agents.results import NUMBER, NUMERIC, TEMPORAL, render_markdown
+
+logger = logging.getLogger(__name__)
+
+# Results this small are shown in full; larger ones get a digest
+FULL_TABLE_ROWS = 10
+HEAD_ROWS = 5
+TAIL_ROWS = 5
+TOP_K = 5
+MAX_COLUMNS = 20
+
+
+def _fmt(value: float) -> str:
+    if np.isnan(value):
+        return "n/a"
+    if float(value).is_integer():
+        return f"{int(value):,}"
+    return f"{value:,.2f}" if abs(value) >= 1 else f"{value:.4g}"
+
+
+def _numeric_stats(name: str, values: List[Any]) -> str:
+    array = np.array([np.nan if v is None else v for v in values], dtype=float)
+    nulls = int(np.isnan(array).sum())
+    if nulls == len(array):
+        return f"- {name} (numeric): all null"
+    line = (
+        f"- {name} (numeric): min {_fmt(np.nanmin(array))}, max {_fmt(np.nanmax(array))}, "
+        f"mean {_fmt(np.nanmean(array))}, sum {_fmt(np.nansum(array))}"
+    )
+    return line + (f", {nulls:,} nulls" if nulls else "")
+
+
+def _temporal_key(value: Any) -> tuple:
+    """Numeric periods (month 1..12, year) by value, dates and timestamps by their ISO text."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, float(value), "")
+    if isinstance(value, str) and NUMBER.match(value):
+        return (0, float(value), "")
+    return (1, 0.0, str(value))
+
+
+def _temporal_stats(name: str, values: List[Any]) -> str:
+    present = [v for v in values if v is not None]
+    nulls = len(values) - len(present)
+    if not present:
+        return f"- {name} (temporal): all null"
+    distinct = sorted({_temporal_key(v): v for v in present}.items())
+    first, last = distinct[0][1], distinct[-1][1]
+    line = f"- {name} (temporal): from {first} to {last}, {len(distinct):,} distinct"
+    return line + (f", {nulls:,} nulls" if nulls else "")
+
+
+def _categorical_stats(name: str, values: List[Any], top_k: int) -> str:
+    labels = np.array(["(null)" if v is None else str(v) for v in values])
+    uniques, counts = np.unique(labels, return_counts=True)
+    order = np.argsort(-counts, kind="stable")[:top_k]
+    top = ", ".join(f"{uniques[i]} ({counts[i]:,})" for i in order)
+    return f"- {name} (categorical): {len(uniques):,} distinct; most frequent: {top}"
+
+
+def _column_lines(result: Dict[str, Any], top_k: int) -> List[str]:
+    lines = []
+    for name, dtype, values in list(zip(result["columns"], result["dtypes"], result["data"]))[:MAX_COLUMNS]:
+        if dtype == NUMERIC:
+            lines.append(_numeric_stats(name, values))
+        elif dtype == TEMPORAL:
+            lines.append(_temporal_stats(name, values))
+        else:
+            lines.append(_categorical_stats(name, values, top_k))
+    if len(result["columns"]) > MAX_COLUMNS:
+        lines.append(f"- ... {len(result['columns']) - MAX_COLUMNS} more columns")
+    return lines
+
+
+def _rows_slice(result: Dict[str, Any], start: int, stop: Optional[int]) -> Dict[str, Any]:
+    data = [values[start:stop] for values in result["data"]]
+    return {**result, "data": data, "row_count": len(data[0]) if data else 0}
+
+
+def _digest(result: Dict[str, Any], head: int, tail: int, top_k: int) -> str:
+    kept = len(result["data"][0]) if result["data"] else 0
+    rows_line = f"Rows: {result['row_count']:,}"
+    if result["truncated"]:
+        rows_line += f" (statistics cover the first {kept:,})"
+    parts = [rows_line, f"Columns: {len(result['columns'])}", "", "Column statistics:", *_column_lines(result, top_k)]
+    if head:
+        parts += ["", f"First {head} rows:", render_markdown(_rows_slice(result, 0, head))]
+    if tail:
+        parts += ["", f"Last {tail} rows:", render_markdown(_rows_slice(result, kept - tail, None))]
+    return "\n".join(parts)
+
+
+def summarize_result(result: Optional[Dict[str, Any]], max_chars: int) -> str:
+    """
+    Compact, fixed-size view of a columnar query result for the responder
+    prompt. Small results are shown in full; larger ones as counts,
+    per-column statistics over all kept rows (min/max/mean/sum, date range,
+    top categories) and the first/last rows. Sample rows, then categories,
+    are dropped until the text fits `max_chars`.
+    """
+    if not result or not result["row_count"]:
+        return "No results found."
+    kept = len(result["data"][0]) if result["data"] else 0
+    if kept <= FULL_TABLE_ROWS and not result["truncated"]:
+        table = render_markdown(result)
+        if len(table) <= max_chars:
+            return table
+
+    for head, tail, top_k in ((HEAD_ROWS, TAIL_ROWS, TOP_K), (3, 2, TOP_K), (0, 0, 3), (0, 0, 1)):
+        head, tail = min(head, kept), min(tail, max(kept - head, 0))
+        digest = _digest(result, head, tail, top_k)
+        if len(digest) <= max_chars:
+            return digest
+    logger.warning(f"Result summary over budget ({len(digest)} > {max_chars} chars), cutting")
+    return digest[:max_chars] + "\n... (summary truncated)"
@@ -0,0 +1,100 @@
+import re
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from backend.config import settings
+from backend.mcp.manager import manager, MCPConnectionManager, QUERY_CONNECTION_ID
+from backend.observability.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CACHEABLE_INTENTS = ("DATA_QUERY", "SCHEMA_QUESTION")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r'[\s?!.]+$', '', " ".join(question.lower().split()))
+
+
+class AnswerCache:
+    """
+    Question-level cache of complete answers (SQL, result, chart, text).
+
+    Entries are keyed by normalized question, schema version and conversation
+    context (the session's previous SQL, since follow-ups depend on it). Data
+    answers expire after the `freshness_seconds` of the connection the SQL ran
+    against; schema answers (and connections without a window) use
+    ANSWER_CACHE_FRESHNESS_SECONDS, since schema changes already change the key.
+    """
+
+    def __init__(self, connection_manager: MCPConnectionManager, max_entries: int):
+        self.manager = connection_manager
+        self.max_entries = max_entries
+        # key -> (expires_at, entry)
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def freshness_window(self, conn_id: Optional[str] = None) -> float:
+        config = self.manager.get_connection_config(conn_id) if conn_id else None
+        if config and config.get("freshness_seconds") is not None:
+            return config["freshness_seconds"]
+        return settings.ANSWER_CACHE_FRESHNESS_SECONDS
+
+    def _key(self, question: str, context: str = "") -> str:
+        raw = f"{self.manager.schema_version()}\n{context}\n{normalize_question(question)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, question: str, context: str = "") -> Optional[Dict[str, Any]]:
+        if not settings.ANSWER_CACHE_ENABLED:
+            return None
+        key = self._key(question, context)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() <= entry[0]:
+                self._entries.move_to_end(key)
+                metrics.incr("answer_cache_hits")
+                return entry[1]
+            if entry:
+                del self._entries[key]
+        metrics.incr("answer_cache_misses")
+        return None
+
+    def put(self, question: str, final_state: Dict[str, Any], visualization: Optional[Dict[str, Any]], context: str = ""):
+        """Stores a finished run if it produced a cacheable, error-free answer."""
+        if not settings.ANSWER_CACHE_ENABLED:
+            return
+        if final_state.get("intent") not in CACHEABLE_INTENTS or final_state.get("sql_error"):
+            return
+        window = self.freshness_window(QUERY_CONNECTION_ID if final_state["intent"] == "DATA_QUERY" else None)
+        if window <= 0:
+            return
+        if not final_state.get("final_response"):
+            return
+        # Degraded by the request deadline; a later run may do better
+        if final_state.get("skipped_stages"):
+            return
+        entry = {
+            "answer": final_state["final_response"],
+            "sql_query": final_state.get("sql_query"),
+            "query_result": final_state.get("query_result"),
+            "relevant_tables": final_state.get("relevant_tables") or [],
+            "visualization": visualization,
+            "intent": final_state["intent"],
+            "confidence": final_state.get("intent_confidence", 0.0)
+        }
+        with self._lock:
+            self._entries[self._key(question, context)] = (time.time() + window, entry)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Global access
+answer_cache = AnswerCache(manager, settings.ANSWER_CACHE_MAX_ENTRIES)
+manager.add_schema_listener(lambda conn_id, schema: answer_cache.clear())
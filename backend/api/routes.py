@@ -1,12 +1,19 @@
 
 from fastapi import APIRouter, HTTPException
+import asyncio
 import logging
 import json
+import uuid
 from backend.models.requests import QueryRequest
 from backend.models.responses import QueryResponse, SchemaResponse, HealthResponse
-from backend.agents.graph import graph
+from backend.agents.sessions import prepare_turn, rollback_turn, record_cached_turn, graph_for
+from backend.agents.scheduler import llm_request_context
 from backend.mcp.tools import handle_get_schema
-from langchain_core.messages import HumanMessage
+from backend.agents.results import result_records
+from backend.agents.deadline import request_deadline
+from backend.observability.metrics import metrics
+from backend.observability.node_stats import summarize_node_stats
+from backend.api.answer_cache import answer_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -20,6 +27,11 @@ async def health_check():
         }
     )
 
+@router.get("/metrics")
+async def get_metrics():
+    """In-process pipeline metrics (cache hit rates, timings, ...)."""
+    return metrics.snapshot()
+
 @router.get("/schema", response_model=SchemaResponse)
 async def get_schema():
     try:
@@ -39,11 +51,36 @@ async def get_schema():
 @router.post("/query", response_model=QueryResponse)
 async def query_agent(request: QueryRequest):
     try:
+        options = request.options
+        # Follow-ups in a session start from the previous turn's state
+        turn = await prepare_turn(request.session_id, request.question)
+        context = turn.get("previous_sql", "")
+        if not options.bypass_cache:
+            cached = answer_cache.get(request.question, context)
+            if cached:
+                # Follow-ups continue from this answer, as after a live run
+                await record_cached_turn(request.session_id, turn, cached)
+                return QueryResponse(
+                    answer=cached["answer"],
+                    sql_query=cached["sql_query"],
+                    results=result_records(cached["query_result"]) or None,
+                    visualization=cached["visualization"],
+                    intent=cached["intent"],
+                    confidence=cached["confidence"],
+                    metadata={"cache": "hit"}
+                )
+        
+        turn["deadline"] = request_deadline(options.timeout_seconds)
+        
         # Run graph synchronously (using ainvoke)
-        final_state = await graph.ainvoke({
-            "user_question": request.question,
-            "messages": [HumanMessage(content=request.question)]
-        })
+        try:
+            run_graph, run_options = await graph_for(request.session_id)
+            with llm_request_context("interactive", request.session_id or f"rest-{uuid.uuid4().hex[:8]}"):
+                final_state = await run_graph.ainvoke(turn, **run_options)
+        except (Exception, asyncio.CancelledError):
+            # The session continues from the previous turn
+            await asyncio.shield(rollback_turn(request.session_id, turn))
+            raise
         
         # Extract results
         answer = final_state.get("final_response", "I processed your request but have no text response.")
@@ -51,8 +88,8 @@ async def query_agent(request: QueryRequest):
         intent = final_state.get("intent", "UNKNOWN")
         confidence = final_state.get("intent_confidence", 0.0)
         
-        # Results (raw lists)
-        results = final_state.get("query_result", [])
+        # Results as row dicts
+        results = result_records(final_state.get("query_result")) or None
         
         # Visualization
         viz_code = final_state.get("visualization_code")
@@ -67,15 +104,25 @@ async def query_agent(request: QueryRequest):
         # provide a default one.
         if intent == "DATA_QUERY" and not answer and visualization:
             answer = "Here is the visualization for your data."
+        
+        answer_cache.put(request.question, final_state, visualization, context)
             
         return QueryResponse(
             answer=answer,
             sql_query=sql_query,
-            results=None, # Converting raw TextContent to list of dicts is complex here without parsing the markdown table. Leaving as None for now.
+            results=results,
             visualization=visualization,
             intent=intent,
             confidence=confidence,
-            metadata={"step_count": pd_steps(final_state)}
+            metadata={
+                "step_count": pd_steps(final_state),
+                "retry_count": final_state.get("retry_count", 0),
+                "planning_mode": final_state.get("planning_mode"),
+                "follow_up": bool(context),
+                "skipped_stages": final_state.get("skipped_stages") or [],
+                "node_stats": summarize_node_stats(final_state.get("node_stats")),
+                "cache": "bypass" if options.bypass_cache else "miss"
+            }
         )
         
     except Exception as e:
@@ -83,8 +130,8 @@ async def query_agent(request: QueryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 def pd_steps(state):
-    # Dummy step counter
-    return 0
+    # Number of node executions, retries included
+    return sum(stats.get("runs", 0) for stats in (state.get("node_stats") or {}).values())
 
 # --- Connection Management Endpoints ---
 
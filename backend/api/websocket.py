@@ -1,103 +1,264 @@
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import asyncio
 import logging
 import json
-from backend.agents.graph import graph
-from langchain_core.messages import HumanMessage
+import uuid
+from typing import Optional
+from pydantic import ValidationError
+from backend.models.requests import QueryOptions
+from backend.agents.sessions import prepare_turn, rollback_turn, record_cached_turn, graph_for, session_store
+from backend.agents.deadline import request_deadline
+from backend.agents.scheduler import llm_request_context
+from backend.api.answer_cache import answer_cache
+from backend.observability.metrics import metrics
+from backend.observability.node_stats import merge_node_stats, summarize_node_stats
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+TERMINAL_NODES = ["error_handler", "schema_responder", "chat_responder", "clarifier", "output_join"]
+# Nodes whose LLM tokens are forwarded to the client as answer_delta messages
+STREAMING_NODES = ("final_responder", "chat_responder", "schema_responder")
+
+def parse_visualization(visualization_code):
+    if not visualization_code:
+        return None
+    try:
+        return json.loads(visualization_code)
+    except (TypeError, ValueError):
+        return None
+
+async def stream_graph_run(websocket: WebSocket, turn: dict, run_graph, run_options=None):
+    """
+    Runs the agent graph for one turn, forwarding progress, answer tokens
+    and the final response to the client. Returns the accumulated state and
+    the parsed visualization.
+    """
+    # Accumulate node updates so the finished run can be cached
+    run_state = {}
+    final_visualization = None
+    
+    # Run Agent Graph with event-level streaming so answer tokens
+    # reach the client while the responder is still generating
+    streamed_nodes = set()
+    async for event in run_graph.astream_events(turn, version="v2", **(run_options or {})):
+        kind = event["event"]
+        node = event.get("metadata", {}).get("langgraph_node")
+        
+        if kind == "on_chat_model_stream" and node in STREAMING_NODES:
+            delta = event["data"]["chunk"].content
+            if delta:
+                streamed_nodes.add(node)
+                await websocket.send_json({
+                    "type": "answer_delta",
+                    "payload": {"agent": node, "delta": delta}
+                })
+            continue
+        
+        # Only the node runnable itself, not the prompts/models inside it
+        if kind != "on_chain_end" or event["name"] != node or node not in run_graph.nodes:
+            continue
+        
+        key = node
+        value = event["data"].get("output")
+        if not isinstance(value, dict):
+            value = {}
+        node_stats = merge_node_stats(run_state.get("node_stats"), value.get("node_stats"))
+        skipped_stages = (run_state.get("skipped_stages") or []) + (value.get("skipped_stages") or [])
+        run_state.update(value)
+        run_state["node_stats"] = node_stats
+        run_state["skipped_stages"] = skipped_stages
+        
+        logger.info(f"Step completed: {key}")
+        
+        # Emit progress update
+        await websocket.send_json({
+            "type": "agent_update", 
+            "payload": {
+                "agent": key,
+                "status": "completed",
+                "message": f"{key.capitalize()} finished processing."
+            }
+        })
+        
+        # The chart runs in parallel with the summary: show it as soon as it's ready
+        if key == "visualizer" and value.get("visualization_code"):
+            final_visualization = parse_visualization(value["visualization_code"])
+            if final_visualization:
+                await websocket.send_json({
+                    "type": "visualization",
+                    "payload": {"visualization": final_visualization}
+                })
+        
+        # Only send final_response from actual terminal nodes, not intermediary ones
+        # (output_join runs once both visualizer and final_responder are done)
+        if key in TERMINAL_NODES:
+            logger.info(f"Processing final response for node: {key}")
+            
+            final_response_text = run_state.get("final_response") or "Here is the response."
+            visualization = parse_visualization(run_state.get("visualization_code"))
+            
+            # Nodes without an LLM stream (schema, clarifier, errors) send their text as one delta
+            if not streamed_nodes:
+                await websocket.send_json({
+                    "type": "answer_delta",
+                    "payload": {"agent": key, "delta": final_response_text}
+                })
+            
+            response_payload = {
+                "answer": final_response_text,
+                "visualization": visualization
+            }
+            
+            final_visualization = visualization
+            logger.info(f"Sending final response payload: {response_payload}")
+            
+            await websocket.send_json({
+                "type": "final_response",
+                "payload": response_payload
+            })
+    
+    # Per-node breakdown of where the time went
+    await websocket.send_json({
+        "type": "stats",
+        "payload": {
+            **summarize_node_stats(run_state.get("node_stats")),
+            "retry_count": run_state.get("retry_count", 0),
+            "planning_mode": run_state.get("planning_mode"),
+            "skipped_stages": run_state.get("skipped_stages") or []
+        }
+    })
+    
+    return run_state, final_visualization
+
+async def answer_question(websocket: WebSocket, question: str, session_id: str, bypass_cache: bool, timeout_seconds=None):
+    """
+    One question, start to finish: answer cache, graph run, cache fill.
+    Runs as a task so the socket can cancel it; cancellation reaches the LLM
+    calls and MCP tool calls the graph is awaiting. A cancelled or failed run
+    rolls the session back to the previous turn.
+    """
+    turn = None
+    try:
+        turn = await prepare_turn(session_id, question)
+        context = turn.get("previous_sql", "")
+        
+        cached = None if bypass_cache else answer_cache.get(question, context)
+        if cached:
+            logger.info("Answer cache hit")
+            # Follow-ups continue from this answer, as after a live run
+            await record_cached_turn(session_id, turn, cached)
+            await websocket.send_json({
+                "type": "final_response",
+                "payload": {
+                    "answer": cached["answer"],
+                    "visualization": cached["visualization"],
+                    "cached": True
+                }
+            })
+            return
+        
+        turn["deadline"] = request_deadline(timeout_seconds)
+        run_graph, run_options = await graph_for(session_id)
+        with llm_request_context("interactive", session_id):
+            run_state, final_visualization = await stream_graph_run(websocket, turn, run_graph, run_options)
+    except asyncio.CancelledError:
+        logger.info(f"Run cancelled: {question}")
+        metrics.incr("ws_runs", outcome="cancelled")
+        if turn is not None:
+            await asyncio.shield(rollback_turn(session_id, turn))
+        raise
+    except Exception as e:
+        # The socket stays open for the next question
+        logger.error(f"Run failed: {e}")
+        metrics.incr("ws_runs", outcome="failed")
+        if turn is not None:
+            await rollback_turn(session_id, turn)
+        await send_error(websocket, str(e))
+    else:
+        metrics.incr("ws_runs", outcome="completed")
+        answer_cache.put(question, run_state, final_visualization, context)
+
+async def cancel_run(run: Optional[asyncio.Task]) -> bool:
+    """Cancels a question still running and waits for it to unwind."""
+    if run is None or run.done():
+        return False
+    run.cancel()
+    await asyncio.gather(run, return_exceptions=True)
+    return True
+
+async def send_error(websocket: WebSocket, message: str):
+    try:
+        await websocket.send_json({"type": "error", "payload": {"message": message}})
+    except Exception:
+        pass
+
 @router.websocket("/ws/chat")
 async def websocket_endpoint(websocket: WebSocket):
     logger.info("WebSocket endpoint called")
     await websocket.accept()
     logger.info("WebSocket accepted")
+    connection_id = f"ws-{uuid.uuid4().hex[:8]}"
+    # The question being answered; one at a time per socket
+    run: Optional[asyncio.Task] = None
     
     try:
         while True:
-            # Receive message (JSON with question)
+            # Receive message (JSON with question, or {"type": "cancel"})
             logger.info("Waiting for message...")
             data = await websocket.receive_text()
             logger.info(f"Raw data received: {data}")
             
+            bypass_cache = False
+            timeout_seconds = None
+            replace = True
+            payload = None
             try:
                 payload = json.loads(data)
+                if payload.get("type") == "cancel":
+                    if await cancel_run(run):
+                        await websocket.send_json({"type": "cancelled", "payload": {"reason": "cancelled"}})
+                    continue
                 question = payload.get("question")
+                bypass_cache = bool(payload.get("bypass_cache"))
+                timeout_seconds = payload.get("timeout_seconds")
+                replace = payload.get("replace", True) is not False
             except Exception as e:
                 logger.error(f"JSON parse error: {e}")
                 question = data # Fallback if raw string
             
+            try:
+                timeout_seconds = QueryOptions(timeout_seconds=timeout_seconds).timeout_seconds
+            except ValidationError:
+                await send_error(websocket, "timeout_seconds must be a positive number")
+                continue
+            
             if not question:
                 logger.warning("Empty question received")
                 continue
                 
             logger.info(f"Received question via WS: {question}")
             
-            # Run Agent Graph with Streaming
-            # We use astream to get events as nodes finish
-            async for output in graph.astream({"user_question": question, "messages": [HumanMessage(content=question)]}):
-                 for key, value in output.items():
-                     # 'key' is the node name (e.g. 'router', 'architect')
-                     # 'value' is the state update
-                     
-                     logger.info(f"Step completed: {key}")
-                     
-                     # Emit progress update
-                     await websocket.send_json({
-                         "type": "agent_update", 
-                         "payload": {
-                             "agent": key,
-                             "status": "completed",
-                             "message": f"{key.capitalize()} finished processing."
-                         }
-                     })
-                     
-                     # Perform final response check if output is from terminal nodes
-                     # IMPORTANT: Only send final_response from actual terminal nodes, not intermediary ones
-                     # visualizer -> final_responder flow means we should only respond at final_responder
-                     terminal_nodes = ["error_handler", "schema_responder", "chat_responder", "clarifier", "final_responder"]
-                     
-                     if key in terminal_nodes:
-                         logger.info(f"Processing final response for node: {key}")
-                         
-                         final_response_text = value.get("final_response")
-                         visualization = None
-                         
-                         # Check for visualization_code in this node's output
-                         if value.get("visualization_code"):
-                             try:
-                                 visualization = json.loads(value.get("visualization_code"))
-                             except:
-                                 pass
-                         
-                         # For final_responder, also check if it passed through visualization
-                         # The visualizer sets visualization_code in state, final_responder should have it
-                         if key == "final_responder" and not visualization:
-                             # Try to get from the value if visualizer set it earlier
-                             if value.get("visualization"):
-                                 visualization = value.get("visualization")
-                                  
-                         response_payload = {
-                             "answer": final_response_text or "Here is the response.",
-                             "visualization": visualization
-                         }
-                         
-                         logger.info(f"Sending final response payload: {response_payload}")
-                         
-                         await websocket.send_json({
-                             "type": "final_response",
-                             "payload": response_payload
-                         })
-                     
-                     # Also handle Router/Executor specific text outputs if they acted as terminal in some paths?
-                     # (Covered by terminal nodes above largely)
+            # A new question supersedes the one still running, unless the client opts out
+            if run is not None and not run.done():
+                if not replace:
+                    await send_error(websocket, "A question is already running; cancel it or send the new one with replace")
+                    continue
+                await cancel_run(run)
+                await websocket.send_json({"type": "cancelled", "payload": {"reason": "replaced"}})
+            
+            # Each socket is a session unless the client names one
+            session_id = (payload.get("session_id") if isinstance(payload, dict) else None) or connection_id
+            run = asyncio.create_task(answer_question(websocket, question, session_id, bypass_cache, timeout_seconds))
 
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
-        try:
-             await websocket.send_json({"type": "error", "payload": {"message": str(e)}})
-        except:
-            pass
+        await send_error(websocket, str(e))
+    finally:
+        # Nobody is left to read the answer
+        await cancel_run(run)
+        # Connection-scoped sessions end with the socket
+        await session_store.discard(connection_id)
@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Any, Optional, Dict, List
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -7,7 +7,44 @@ class Settings(BaseSettings):
     LLM_PROVIDER: str = "lmstudio"
     LLM_BASE_URL: str = "http://localhost:1234/v1"
     LLM_MODEL_NAME: str = "local-model"
+    # Optional 1-3B model for routing, charts and summaries (see NODE_LLM_DEFAULTS)
+    LLM_SMALL_MODEL_NAME: Optional[str] = None
+    # Per-node overrides: {"coder": {"model": "...", "temperature": 0, "max_tokens": 1024, "provider": "...", "base_url": "..."}}
+    LLM_NODE_CONFIG: Dict[str, Dict[str, Any]] = {}
     GOOGLE_API_KEY: Optional[str] = None
+    LLM_HTTP_MAX_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_SECONDS: float = 120.0
+    LLM_HTTP_TIMEOUT_SECONDS: float = 120.0
+    LLM_WARMUP_ON_STARTUP: bool = True
+    LLM_STRUCTURED_OUTPUT: bool = True  # response_format json_schema for JSON nodes
+
+    # Prompt prefix caching hints (llama.cpp `cache_prompt`, Ollama `keep_alive`), sent only when set
+    LLM_CACHE_PROMPT: Optional[bool] = None
+    LLM_KEEP_ALIVE: Optional[str] = None
+
+    # LLM Scheduler (per backend admission control, within one process)
+    LLM_MAX_IN_FLIGHT: int = 2
+    LLM_EVAL_MAX_IN_FLIGHT: int = 1
+    LLM_QUEUE_TIMEOUTS: Dict[str, float] = {"interactive": 30.0, "evaluation": 600.0}
+
+    # Fallback / hedged backends, in priority order after each node's primary
+    # e.g. [{"provider": "ollama", "base_url": "http://gpu2:11434/v1", "model": "qwen2.5:7b"}]
+    LLM_FALLBACK_BACKENDS: List[Dict[str, Any]] = []
+    LLM_HEDGE_ENABLED: bool = True
+    LLM_HEDGE_DELAY_SECONDS: float = 10.0  # used until the primary's p95 is known
+    LLM_BREAKER_FAILURES: int = 3
+    LLM_BREAKER_COOLDOWN_SECONDS: float = 30.0
+
+    # LLM Response Cache (temperature 0 nodes only)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 3600
+    LLM_CACHE_MAX_ENTRIES: int = 512
+    LLM_CACHE_PATH: Optional[str] = None
+
+    # Answer Cache (whole question -> answer)
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_FRESHNESS_SECONDS: int = 300
+    ANSWER_CACHE_MAX_ENTRIES: int = 256
 
     # Database Configuration
     DB_HOST: str = "localhost"
@@ -23,7 +60,38 @@ class Settings(BaseSettings):
 
     # Agent Configuration
     AGENT_MAX_RETRIES: int = 3
+    # Request deadline (a request can shorten it with options.timeout_seconds)
     AGENT_TIMEOUT_SECONDS: int = 30
+    # Optional stages are skipped when less than this much time is left
+    AGENT_STAGE_MIN_SECONDS: Dict[str, float] = {"architect": 6.0, "critic": 8.0, "visualizer": 5.0, "final_responder": 4.0}
+    # Schemas up to this many (estimated) tokens skip the architect call; 0 = always two-step
+    AGENT_SINGLE_CALL_SCHEMA_TOKENS: int = 1500
+    # Run schema load + architect concurrently with the router LLM call
+    AGENT_SPECULATIVE_PLANNING: bool = False
+    # SQL candidates generated in parallel per question; 1 = single greedy generation
+    AGENT_SQL_CANDIDATES: int = 1
+    AGENT_SQL_CANDIDATE_TEMPERATURE: float = 0.7
+    # Candidates still generating after this long are dropped (the first one is always awaited)
+    AGENT_SQL_CANDIDATE_BUDGET_SECONDS: float = 20
+    # Also run the runner-up candidate and compare results (logged + metrics only)
+    AGENT_SQL_CANDIDATE_AGREEMENT: bool = False
+    # Rows kept in state per query (row_count still reports the full size)
+    AGENT_MAX_RESULT_ROWS: int = 10000
+    # Size cap (characters) of the result digest in the final_responder prompt
+    AGENT_RESULT_SUMMARY_CHARS: int = 3000
+
+    # Conversation Sessions (follow-ups continue from the previous turn's state)
+    SESSION_ENABLED: bool = True
+    SESSION_BACKEND: str = "memory"  # memory | sqlite (needs langgraph-checkpoint-sqlite)
+    SESSION_DB_PATH: str = "sessions.db"
+    SESSION_TTL_SECONDS: int = 1800
+    SESSION_MAX_SESSIONS: int = 1000
+    SESSION_MAX_MESSAGES: int = 20
+
+    # Column Profiling Configuration
+    PROFILE_ENABLED: bool = True
+    PROFILE_SAMPLE_ROWS: int = 1000
+    PROFILE_MAX_DISTINCT_VALUES: int = 20
     
     # Computed Properties
     @property
@@ -1,22 +1,35 @@
 
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-# Initialize Phoenix observability BEFORE importing LangChain components
 from backend.observability.phoenix import init_phoenix
-init_phoenix()
-
 from backend.api.routes import router as api_router
 from backend.api.websocket import router as ws_router
+from backend.agents.llm import warm_llm_clients, close_llm_clients
+from backend.agents.sessions import session_store
+from backend.config import settings
 
 # Configure Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # At startup rather than import: tests and scripts don't pay for OpenTelemetry.
+    # The instrumentor patches LangChain's callback managers, so it covers
+    # every run started after this point.
+    init_phoenix()
+    if settings.LLM_WARMUP_ON_STARTUP:
+        await warm_llm_clients()
+    yield
+    await close_llm_clients()
+    await session_store.close()
+
 def create_application() -> FastAPI:
-    app = FastAPI(title="Antigravirt Backend", version="0.1.0")
+    app = FastAPI(title="Antigravirt Backend", version="0.1.0", lifespan=lifespan)
     
     # Global Exception Handler
     @app.exception_handler(Exception)
@@ -0,0 +1,128 @@
+import re
+import hashlib
+from typing import Dict, List, Tuple
+
+# Schema text formats produced by the MCP servers:
+#   postgres: "Table: name\n- column (type)\n..."
+#   sqlite:   "Table: name\nCREATE TABLE name (...)\n"
+TABLE_HEADER = re.compile(r'^Table:\s*(\S+)\s*$')
+# Section header of the combined multi-connection schema (tools.handle_get_schema)
+CONNECTION_HEADER = re.compile(r'^---\s*Connection:.*---$')
+PG_COLUMN = re.compile(r'^-\s*(\S+)\s*\((.*)\)\s*$')
+CONSTRAINT_PREFIXES = ("PRIMARY", "FOREIGN", "UNIQUE", "CHECK", "CONSTRAINT")
+
+
+def _split_top_level(body: str) -> List[str]:
+    """Split a CREATE TABLE body on commas that are not nested in parentheses."""
+    parts, depth, current = [], 0, []
+    for ch in body:
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        if ch == ',' and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    if current:
+        parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _parse_create_table(ddl: str) -> List[Tuple[str, str]]:
+    start, end = ddl.find('('), ddl.rfind(')')
+    if start == -1 or end <= start:
+        return []
+    columns = []
+    for part in _split_top_level(ddl[start + 1:end]):
+        if part.upper().startswith(CONSTRAINT_PREFIXES):
+            continue
+        tokens = part.split()
+        name = tokens[0].strip('"`[]')
+        col_type = tokens[1] if len(tokens) > 1 else ""
+        columns.append((name, col_type))
+    return columns
+
+
+def parse_schema(schema_text: str) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Parses schema text (single connection or combined) into
+    {table_name: [(column_name, data_type), ...]}.
+    """
+    tables: Dict[str, List[Tuple[str, str]]] = {}
+    current = None
+    ddl_lines: List[str] = []
+
+    def flush_ddl():
+        if current and ddl_lines:
+            tables[current].extend(_parse_create_table(" ".join(ddl_lines)))
+        ddl_lines.clear()
+
+    for raw_line in schema_text.splitlines():
+        line = raw_line.strip()
+        header = TABLE_HEADER.match(line)
+        if header:
+            flush_ddl()
+            current = header.group(1)
+            tables.setdefault(current, [])
+            continue
+        if current is None or not line or line.startswith("---"):
+            continue
+        column = PG_COLUMN.match(line)
+        if column and not ddl_lines:
+            tables[current].append((column.group(1), column.group(2)))
+        elif ddl_lines or line.upper().startswith("CREATE TABLE"):
+            ddl_lines.append(line)
+    flush_ddl()
+    return tables
+
+
+def schema_fingerprint(schema_text: str) -> str:
+    """Stable hash of a schema, insensitive to whitespace and table order."""
+    tables = parse_schema(schema_text)
+    canonical = "\n".join(
+        f"{name}:" + ",".join(f"{col} {col_type}" for col, col_type in sorted(cols))
+        for name, cols in sorted(tables.items())
+    )
+    if not canonical:
+        canonical = " ".join(schema_text.split())
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def _render_section(lines: List[str]) -> str:
+    """One connection section: header and notes first, then tables sorted by name."""
+    preamble: List[str] = []
+    tables: Dict[str, List[str]] = {}
+    current = None
+    for line in lines:
+        header = TABLE_HEADER.match(line)
+        if header:
+            current = header.group(1)
+            tables.setdefault(current, [line])
+        elif current is None:
+            preamble.append(line)
+        else:
+            tables[current].append(line)
+    blocks = ["\n".join(preamble)] if preamble else []
+    blocks += ["\n".join(tables[name]) for name in sorted(tables)]
+    return "\n\n".join(blocks)
+
+
+def canonicalize_schema(schema_text: str) -> str:
+    """
+    Deterministic rendering of a schema for prompts. Connection sections stay
+    separate and in their given order; within each, tables are sorted by name.
+    Whitespace is normalized, everything else (column lines, DDL with its key
+    constraints, error notes) is kept as written. Identical schemas always
+    produce identical text, so LLM servers can reuse the cached prompt prefix.
+    """
+    sections: List[List[str]] = [[]]
+    for raw_line in schema_text.splitlines():
+        line = " ".join(raw_line.split())
+        if not line:
+            continue
+        if CONNECTION_HEADER.match(line):
+            sections.append([])
+        sections[-1].append(line)
+    return "\n\n".join(_render_section(lines) for lines in sections if lines)
@@ -0,0 +1,160 @@
+import json
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from backend.mcp.catalog import parse_schema
+from backend.mcp.manager import manager, MCPConnectionManager, QUERY_CONNECTION_ID
+
+logger = logging.getLogger(__name__)
+
+# (table, column, ref_table, ref_column)
+JoinEdge = Tuple[str, str, str, str]
+
+
+def infer_foreign_keys(tables: Dict[str, List[Tuple[str, str]]]) -> List[JoinEdge]:
+    """
+    Infers foreign keys from `*_id` naming: `orders.customer_id` -> `customers.id`.
+    Used when the database exposes no FK metadata.
+    """
+    by_name = {name.lower(): name for name in tables}
+    edges = []
+    for table, columns in tables.items():
+        for column, _ in columns:
+            lowered = column.lower()
+            if not lowered.endswith("_id") or lowered == "_id":
+                continue
+            stem = lowered[:-3]
+            for candidate in (stem + "s", stem + "es", stem[:-1] + "ies" if stem.endswith("y") else None, stem):
+                target = by_name.get(candidate) if candidate else None
+                if not target or target == table:
+                    continue
+                target_columns = {col.lower(): col for col, _ in tables[target]}
+                if "id" in target_columns:
+                    edges.append((table, column, target, target_columns["id"]))
+                    break
+    return edges
+
+
+class JoinGraph:
+    """
+    Undirected table graph built from foreign keys, with all-pairs shortest
+    join paths precomputed by BFS from every table.
+    """
+
+    def __init__(self, edges: List[JoinEdge]):
+        self.edges = list(edges)
+        self._adjacency: Dict[str, List[Tuple[str, JoinEdge]]] = {}
+        for edge in self.edges:
+            table, _, ref_table, _ = edge
+            self._adjacency.setdefault(table.lower(), []).append((ref_table.lower(), edge))
+            self._adjacency.setdefault(ref_table.lower(), []).append((table.lower(), edge))
+        self._paths: Dict[Tuple[str, str], List[JoinEdge]] = {}
+        for source in self._adjacency:
+            self._bfs(source)
+
+    def _bfs(self, source: str):
+        self._paths[(source, source)] = []
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            for neighbour, edge in self._adjacency[current]:
+                if (source, neighbour) in self._paths:
+                    continue
+                self._paths[(source, neighbour)] = self._paths[(source, current)] + [edge]
+                queue.append(neighbour)
+
+    def has_table(self, table: str) -> bool:
+        return table.lower() in self._adjacency
+
+    def shortest_path(self, source: str, target: str) -> Optional[List[JoinEdge]]:
+        return self._paths.get((source.lower(), target.lower()))
+
+    def join_chain(self, tables: List[str]) -> List[JoinEdge]:
+        """
+        Edges connecting all given tables: grows a tree from the first table,
+        repeatedly attaching the closest remaining table via its shortest path.
+        """
+        remaining = [t.lower() for t in dict.fromkeys(tables) if self.has_table(t)]
+        if len(remaining) < 2:
+            return []
+        connected = {remaining.pop(0)}
+        chain: List[JoinEdge] = []
+        while remaining:
+            best = None
+            for target in remaining:
+                for source in connected:
+                    path = self._paths.get((source, target))
+                    if path is not None and (best is None or len(path) < len(best[1])):
+                        best = (target, path)
+            if best is None:
+                break  # disconnected tables, the coder has to cross-join or ask
+            target, path = best
+            remaining.remove(target)
+            for edge in path:
+                if edge not in chain:
+                    chain.append(edge)
+                connected.update({edge[0].lower(), edge[2].lower()})
+        return chain
+
+
+class JoinPlanner:
+    """
+    Keeps one JoinGraph per connection, rebuilt when the schema fingerprint
+    changes. Inferred edges are available immediately; declared foreign keys
+    replace them once fetched in the background.
+    """
+
+    def __init__(self, connection_manager: MCPConnectionManager):
+        self.manager = connection_manager
+        self._graphs: Dict[str, JoinGraph] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def on_schema_change(self, conn_id: str, schema_text: str):
+        tables = parse_schema(schema_text)
+        self._graphs[conn_id] = JoinGraph(infer_foreign_keys(tables))
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        previous = self._tasks.get(conn_id)
+        if previous and not previous.done():
+            previous.cancel()
+        self._tasks[conn_id] = loop.create_task(self._load_foreign_keys(conn_id, tables))
+
+    async def _load_foreign_keys(self, conn_id: str, tables: Dict[str, List[Tuple[str, str]]]):
+        try:
+            mcp_result = await self.manager.get_tool_result(conn_id, "get_foreign_keys", {})
+            text = mcp_result.content[0].text
+            edges = [
+                (fk["table"], fk["column"], fk["ref_table"], fk["ref_column"])
+                for fk in json.loads(text)
+            ]
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"No foreign key metadata for {conn_id}, keeping inferred joins: {e}")
+            return
+        if edges:
+            self._graphs[conn_id] = JoinGraph(edges)
+            logger.info(f"Join graph for {conn_id} built from {len(edges)} foreign keys")
+
+    def join_chain(self, tables: List[str], conn_id: str = QUERY_CONNECTION_ID) -> List[JoinEdge]:
+        """
+        Join chain for the tables within one connection's graph (the one queries
+        run against by default); joins never span databases.
+        """
+        graph = self._graphs.get(conn_id)
+        return graph.join_chain(tables) if graph else []
+
+    def render(self, tables: List[str], conn_id: str = QUERY_CONNECTION_ID) -> str:
+        """Formats the join chain as prompt text, one join condition per line."""
+        return "\n".join(
+            f"- {table}.{column} = {ref_table}.{ref_column}"
+            for table, column, ref_table, ref_column in self.join_chain(tables, conn_id)
+        )
+
+
+# Global access
+join_planner = JoinPlanner(manager)
+manager.add_schema_listener(join_planner.on_schema_change)
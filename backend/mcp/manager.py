@@ -1,17 +1,21 @@
 
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List, Callable
 import os
 import json
-import asyncio
 import logging
 import time
+import hashlib
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from backend.mcp.catalog import schema_fingerprint
+from backend.observability.node_stats import record_mcp
 
 logger = logging.getLogger(__name__)
 
 CONNECTIONS_FILE = os.path.join(os.getcwd(), "connections.json")
 SCHEMA_CACHE_TTL = 60  # seconds
+# Generated SQL is executed (and explained) against this connection
+QUERY_CONNECTION_ID = "default"
 
 class MCPConnectionManager:
     _instance = None
@@ -19,6 +23,8 @@ class MCPConnectionManager:
     def __init__(self):
         self.configs: Dict[str, Dict[str, Any]] = {}
         self._schema_cache: Dict[str, Dict[str, Any]] = {}  # {conn_id: {"schema": str, "timestamp": float}}
+        self._schema_fingerprints: Dict[str, str] = {}  # {conn_id: fingerprint}, survives cache expiry
+        self._schema_listeners: List[Callable[[str, str], None]] = []
         self._load_configs()
     
     @classmethod
@@ -66,6 +72,7 @@ class MCPConnectionManager:
         # Invalidate cache for this connection
         if conn_id in self._schema_cache:
             del self._schema_cache[conn_id]
+        self._schema_fingerprints.pop(conn_id, None)
         self._save_configs()
         logger.info(f"Added connection: {conn_id}")
 
@@ -74,6 +81,7 @@ class MCPConnectionManager:
             del self.configs[conn_id]
             if conn_id in self._schema_cache:
                 del self._schema_cache[conn_id]
+            self._schema_fingerprints.pop(conn_id, None)
             self._save_configs()
 
     def list_connections(self) -> List[Dict[str, Any]]:
@@ -91,8 +99,49 @@ class MCPConnectionManager:
         return None
     
     def set_cached_schema(self, conn_id: str, schema: str):
-        """Cache schema result."""
+        """Cache schema result and notify listeners if the schema changed."""
         self._schema_cache[conn_id] = {"schema": schema, "timestamp": time.time()}
+        
+        fingerprint = schema_fingerprint(schema)
+        if self._schema_fingerprints.get(conn_id) == fingerprint:
+            return
+        self._schema_fingerprints[conn_id] = fingerprint
+        logger.info(f"Schema fingerprint for {conn_id}: {fingerprint}")
+        for listener in self._schema_listeners:
+            try:
+                listener(conn_id, schema)
+            except Exception as e:
+                logger.warning(f"Schema listener failed for {conn_id}: {e}")
+    
+    def add_schema_listener(self, listener: Callable[[str, str], None]):
+        """
+        Register a callback(conn_id, schema_text) fired when a schema fingerprint changes.
+        Schemas already seen are replayed to it, so listeners registered late
+        (modules imported on first use) don't miss them.
+        """
+        if listener in self._schema_listeners:
+            return
+        self._schema_listeners.append(listener)
+        for conn_id in list(self._schema_fingerprints):
+            cached = self._schema_cache.get(conn_id)
+            if not cached:
+                continue
+            try:
+                listener(conn_id, cached["schema"])
+            except Exception as e:
+                logger.warning(f"Schema listener failed for {conn_id}: {e}")
+    
+    def get_schema_fingerprint(self, conn_id: str) -> Optional[str]:
+        return self._schema_fingerprints.get(conn_id)
+    
+    def schema_version(self) -> str:
+        """Combined fingerprint of all known connection schemas."""
+        combined = "|".join(f"{k}:{v}" for k, v in sorted(self._schema_fingerprints.items()))
+        return hashlib.sha256(combined.encode("utf-8")).hexdigest()[:16]
+    
+    def get_connection_type(self, conn_id: str) -> Optional[str]:
+        config = self.configs.get(conn_id)
+        return config.get("type") if config else None
 
     async def get_tool_result(self, connection_id: str, tool_name: str, tool_args: dict) -> Any:
         """Execute a tool on a specific connection."""
@@ -137,6 +186,7 @@ class MCPConnectionManager:
         )
         
         # Execute tool via stdio client
+        started = time.perf_counter()
         try:
             async with stdio_client(server_params) as (read, write):
                 async with ClientSession(read, write) as session:
@@ -146,6 +196,8 @@ class MCPConnectionManager:
         except Exception as e:
             logger.error(f"MCP Tool Execution Failed ({connection_id}/{tool_name}): {e}")
             raise e
+        finally:
+            record_mcp(time.perf_counter() - started)
 
 # Global access
 manager = MCPConnectionManager()
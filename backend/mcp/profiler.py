@@ -0,0 +1,204 @@
+import json
+import math
+import asyncio
+import logging
+from typing import Dict, List, Any, Optional
+from backend.config import settings
+from backend.mcp.catalog import parse_schema
+from backend.mcp.manager import manager, MCPConnectionManager, QUERY_CONNECTION_ID
+
+logger = logging.getLogger(__name__)
+
+PROFILED_CONNECTION_TYPES = ("postgres", "sqlite")
+MAX_PROFILE_CHARS = 3000
+MAX_RANGE_VALUE_LENGTH = 32
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+class ColumnProfiler:
+    """
+    Samples each table in the background and caches per-column statistics
+    (low-cardinality values, min/max, null ratio, approximate distinct count).
+
+    Profiles are rebuilt whenever the connection manager reports a new
+    schema fingerprint, so the coder never waits on profiling. Statistics
+    from a sample rather than the whole table are marked `sampled`.
+    """
+
+    def __init__(self, connection_manager: MCPConnectionManager):
+        self.manager = connection_manager
+        # {conn_id: {table: {column: stats}}}
+        self._profiles: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def schedule_refresh(self, conn_id: str, schema_text: str):
+        """Start (or restart) background profiling for a connection."""
+        if not settings.PROFILE_ENABLED:
+            return
+        if self.manager.get_connection_type(conn_id) not in PROFILED_CONNECTION_TYPES:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.debug(f"No running loop, skipping profiling for {conn_id}")
+            return
+
+        previous = self._tasks.get(conn_id)
+        if previous and not previous.done():
+            previous.cancel()
+        self._tasks[conn_id] = loop.create_task(self.refresh(conn_id, schema_text))
+
+    async def refresh(self, conn_id: str, schema_text: str):
+        """Profile every table of a connection and swap the cached profile in."""
+        dialect = self.manager.get_connection_type(conn_id)
+        tables = parse_schema(schema_text)
+        logger.info(f"Profiling {len(tables)} tables for {conn_id}")
+
+        profiles: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for table in tables:
+            try:
+                profiles[table] = await self._profile_table(conn_id, dialect, table)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Profiling failed for {conn_id}.{table}: {e}")
+
+        self._profiles[conn_id] = profiles
+        logger.info(f"Profiling complete for {conn_id}")
+
+    async def _query(self, conn_id: str, sql: str) -> List[Dict[str, Any]]:
+        mcp_result = await self.manager.get_tool_result(conn_id, "query", {"sql": sql})
+        text = mcp_result.content[0].text
+        if text.startswith("Error") or text.startswith("Database Error"):
+            raise RuntimeError(text)
+        return json.loads(text)
+
+    async def _estimate_rows(self, conn_id: str, dialect: str, table: str) -> Optional[int]:
+        if dialect == "postgres":
+            sql = f"SELECT reltuples::bigint AS estimate FROM pg_class WHERE relname = {_quote_literal(table)}"
+        else:
+            sql = f"SELECT MAX(rowid) AS estimate FROM {_quote_identifier(table)}"
+        try:
+            rows = await self._query(conn_id, sql)
+        except Exception as e:
+            logger.debug(f"Row estimate unavailable for {table}: {e}")
+            return None
+        estimate = rows[0].get("estimate") if rows else None
+        return int(estimate) if estimate is not None and estimate >= 0 else None
+
+    @staticmethod
+    def _reads_whole_table(estimate: Optional[int]) -> bool:
+        """Whether the sample query is a plain LIMIT read rather than a random sample."""
+        return estimate is None or estimate <= settings.PROFILE_SAMPLE_ROWS
+
+    def _sample_sql(self, dialect: str, table: str, estimate: Optional[int]) -> str:
+        limit = settings.PROFILE_SAMPLE_ROWS
+        quoted = _quote_identifier(table)
+        if self._reads_whole_table(estimate):
+            return f"SELECT * FROM {quoted} LIMIT {limit}"
+        if dialect == "postgres":
+            # Oversample a little since SYSTEM sampling works on whole pages
+            percent = min(100.0, 200.0 * limit / estimate)
+            return f"SELECT * FROM {quoted} TABLESAMPLE SYSTEM ({percent:.4f}) LIMIT {limit}"
+        return (
+            f"SELECT * FROM {quoted} WHERE rowid IN "
+            f"(SELECT rowid FROM {quoted} ORDER BY random() LIMIT {limit})"
+        )
+
+    async def _profile_table(self, conn_id: str, dialect: str, table: str) -> Dict[str, Dict[str, Any]]:
+        estimate = await self._estimate_rows(conn_id, dialect, table)
+        rows = await self._query(conn_id, self._sample_sql(dialect, table, estimate))
+        if not rows:
+            return {}
+
+        sample_size = len(rows)
+        # Only a plain read that came back short of the limit saw every row. Unknown
+        # (unanalyzed) or stale estimates mean the table may go on past the sample.
+        exhaustive = self._reads_whole_table(estimate) and sample_size < settings.PROFILE_SAMPLE_ROWS
+        total_rows = sample_size if exhaustive else max(estimate or 0, sample_size)
+
+        profile = {}
+        for column in rows[0].keys():
+            values = [row.get(column) for row in rows]
+            profile[column] = self._profile_column(values, total_rows, exhaustive)
+        return profile
+
+    def _profile_column(self, values: List[Any], total_rows: int, exhaustive: bool) -> Dict[str, Any]:
+        non_null = [v for v in values if v is not None]
+        stats: Dict[str, Any] = {"null_ratio": round(1 - len(non_null) / len(values), 3)}
+        if not exhaustive:
+            stats["sampled"] = True
+        if not non_null:
+            return stats
+
+        counts: Dict[Any, int] = {}
+        for v in non_null:
+            key = json.dumps(v, sort_keys=True) if isinstance(v, (dict, list)) else v
+            counts[key] = counts.get(key, 0) + 1
+        distinct = len(counts)
+
+        if exhaustive:
+            approx_distinct = distinct
+        else:
+            # GEE estimator: scale up values seen once, keep repeated ones as-is
+            singletons = sum(1 for c in counts.values() if c == 1)
+            scale = math.sqrt(total_rows / len(values))
+            approx_distinct = min(total_rows, int(scale * singletons + (distinct - singletons)))
+        stats["approx_distinct"] = approx_distinct
+
+        if approx_distinct <= settings.PROFILE_MAX_DISTINCT_VALUES:
+            stats["values"] = sorted(counts.keys(), key=str)
+
+        comparable = [
+            v for v in non_null
+            if isinstance(v, (int, float)) and not isinstance(v, bool)
+            or isinstance(v, str) and len(v) <= MAX_RANGE_VALUE_LENGTH
+        ]
+        if comparable and len({type(v) for v in comparable}) == 1:
+            stats["min"] = min(comparable)
+            stats["max"] = max(comparable)
+        return stats
+
+    def get_table_profile(self, table: str, conn_id: str = QUERY_CONNECTION_ID) -> Dict[str, Dict[str, Any]]:
+        """Column stats for a table of one connection (same-named tables elsewhere are separate)."""
+        for name, profile in self._profiles.get(conn_id, {}).items():
+            if name.lower() == table.lower():
+                return profile
+        return {}
+
+    def render(self, table_names: Optional[List[str]] = None, conn_id: str = QUERY_CONNECTION_ID) -> str:
+        """Formats cached profiles for the given tables (all tables if empty) as prompt text."""
+        if not table_names:
+            table_names = sorted(self._profiles.get(conn_id, {}))
+
+        lines = []
+        for table in table_names:
+            for column, stats in self.get_table_profile(table, conn_id).items():
+                parts = []
+                if "values" in stats:
+                    parts.append(f"{'sampled values' if stats.get('sampled') else 'values'} {stats['values']}")
+                elif "min" in stats:
+                    parts.append(f"range {stats['min']!r} .. {stats['max']!r}")
+                if "approx_distinct" in stats and "values" not in stats:
+                    parts.append(f"~{stats['approx_distinct']} distinct")
+                if stats.get("null_ratio"):
+                    parts.append(f"{stats['null_ratio']:.0%} null")
+                if parts:
+                    lines.append(f"- {table}.{column}: " + "; ".join(parts))
+
+        text = "\n".join(lines)
+        if len(text) > MAX_PROFILE_CHARS:
+            text = text[:MAX_PROFILE_CHARS].rsplit("\n", 1)[0]
+        return text
+
+
+# Global access
+profiler = ColumnProfiler(manager)
+manager.add_schema_listener(profiler.schedule_refresh)
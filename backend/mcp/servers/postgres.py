@@ -1,6 +1,7 @@
 
 from mcp.server.fastmcp import FastMCP
 import asyncpg
+import json
 from typing import List, Dict, Any
 
 class PostgresServer:
@@ -21,7 +22,6 @@ class PostgresServer:
                 try:
                     results = await conn.fetch(sql)
                     # Convert Record to dict and then JSON
-                    import json
                     from datetime import date, datetime
                     from decimal import Decimal
                     
@@ -39,6 +39,23 @@ class PostgresServer:
             except Exception as e:
                 return f"Database Error: {e}"
 
+        @self.mcp.tool()
+        async def explain(sql: str) -> str:
+            """Plan a SELECT without running it. Returns the planner's cost estimate as JSON."""
+            if not sql.strip().upper().startswith("SELECT"):
+                 return "Error: Only SELECT queries are allowed for safety."
+            
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                try:
+                    raw = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {sql}")
+                    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+                    return json.dumps({"total_cost": plan["Total Cost"], "plan_rows": plan["Plan Rows"]})
+                finally:
+                    await conn.close()
+            except Exception as e:
+                return f"Database Error: {e}"
+
         @self.mcp.tool()
         async def list_tables() -> List[str]:
             """List all public tables in the database."""
@@ -86,6 +103,29 @@ class PostgresServer:
             except Exception as e:
                 return f"Error fetching schema: {e}"
 
+        @self.mcp.tool()
+        async def get_foreign_keys() -> str:
+            """List foreign key relationships between public tables as JSON."""
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                try:
+                    query = """
+                        SELECT tc.table_name AS table, kcu.column_name AS column,
+                               ccu.table_name AS ref_table, ccu.column_name AS ref_column
+                        FROM information_schema.table_constraints tc
+                        JOIN information_schema.key_column_usage kcu
+                          ON tc.constraint_name = kcu.constraint_name AND tc.table_schema = kcu.table_schema
+                        JOIN information_schema.constraint_column_usage ccu
+                          ON ccu.constraint_name = tc.constraint_name AND ccu.table_schema = tc.table_schema
+                        WHERE tc.constraint_type = 'FOREIGN KEY' AND tc.table_schema = 'public'
+                    """
+                    results = await conn.fetch(query)
+                    return json.dumps([dict(r) for r in results])
+                finally:
+                    await conn.close()
+            except Exception as e:
+                return f"Error fetching foreign keys: {e}"
+
     def run(self):
         # This is for running as a standalone process
         self.mcp.run()
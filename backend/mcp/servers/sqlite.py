@@ -3,7 +3,6 @@ from mcp.server.fastmcp import FastMCP
 import aiosqlite
 import json
 import os
-from dateutil import parser
 
 class SQLiteServer:
     def __init__(self, name: str, db_path: str):
@@ -29,6 +28,22 @@ class SQLiteServer:
             except Exception as e:
                 return f"Database Error: {e}"
 
+        @self.mcp.tool()
+        async def explain(sql: str) -> str:
+            """Plan a SELECT without running it. SQLite has no cost model, so full table scans stand in for cost."""
+            if not sql.strip().upper().startswith("SELECT"):
+                 return "Error: Only SELECT queries are allowed for safety."
+            
+            try:
+                async with aiosqlite.connect(self.db_path) as db:
+                    async with db.execute(f"EXPLAIN QUERY PLAN {sql}") as cursor:
+                        # (id, parent, notused, detail)
+                        steps = [row[3] for row in await cursor.fetchall()]
+                full_scans = sum(1 for step in steps if step.startswith("SCAN") and "USING" not in step)
+                return json.dumps({"total_cost": full_scans, "plan_rows": None})
+            except Exception as e:
+                return f"Database Error: {e}"
+
         @self.mcp.tool()
         async def list_tables() -> list[str]:
             """List all tables in the database."""
@@ -59,6 +74,29 @@ class SQLiteServer:
             except Exception as e:
                 return f"Error fetching schema: {e}"
 
+        @self.mcp.tool()
+        async def get_foreign_keys() -> str:
+            """List foreign key relationships between tables as JSON."""
+            try:
+                async with aiosqlite.connect(self.db_path) as db:
+                    foreign_keys = []
+                    async with db.execute("SELECT name FROM sqlite_master WHERE type='table'") as cursor:
+                        tables = [row[0] for row in await cursor.fetchall()]
+                    for table in tables:
+                        # Table-valued pragma, so the name is bound rather than spliced in
+                        async with db.execute("SELECT * FROM pragma_foreign_key_list(?)", (table,)) as cursor:
+                            # (id, seq, table, from, to, on_update, on_delete, match)
+                            for row in await cursor.fetchall():
+                                foreign_keys.append({
+                                    "table": table,
+                                    "column": row[3],
+                                    "ref_table": row[2],
+                                    "ref_column": row[4] or "rowid"
+                                })
+                    return json.dumps(foreign_keys)
+            except Exception as e:
+                return f"Error fetching foreign keys: {e}"
+
     def run(self):
         self.mcp.run()
 
@@ -1,10 +1,12 @@
 
 import logging
 import json
+from typing import Any, Dict, List, Optional, Tuple
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 from backend.mcp.validator import validate_sql, SQLValidationError
-from backend.mcp.manager import manager
+from backend.mcp.manager import manager, QUERY_CONNECTION_ID
+from backend.observability.node_stats import record_rows
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +42,20 @@ def register_tools(server: Server):
                     },
                     "required": ["sql"]
                 }
+            ),
+            Tool(
+                name="explain_query",
+                description="Check a read-only SQL query against the planner without running it. Returns the estimated cost.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "sql": {
+                            "type": "string",
+                            "description": "The SQL select statement to plan"
+                        }
+                    },
+                    "required": ["sql"]
+                }
             ),
              Tool(
                 name="get_sample_data",
@@ -74,6 +90,8 @@ def register_tools(server: Server):
                 return await handle_get_schema(arguments.get("table_names"))
             elif name == "run_query":
                 return await handle_run_query(arguments.get("sql"))
+            elif name == "explain_query":
+                return await handle_explain_query(arguments.get("sql"))
             elif name == "get_sample_data":
                 return await handle_get_sample_data(arguments.get("table_name"), arguments.get("limit", 5))
             else:
@@ -122,52 +140,75 @@ async def handle_get_schema(table_names: list[str] = None) -> list[TextContent]:
         return [TextContent(type="text", text=f"Error retrieving schema: {str(e)}")]
 
 
-async def handle_run_query(sql: str) -> list[TextContent]:
-    """Executes a read-only SQL query via MCP."""
+async def run_query_rows(sql: str) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+    """
+    Executes a read-only SQL query via MCP.
+    Returns (rows, None), or (None, error text) with the same error prefixes as handle_run_query.
+    """
     try:
         # 1. Validate
         validate_sql(sql)
         
         # 2. Execute via Manager
-        mcp_result = await manager.get_tool_result("default", "query", {"sql": sql})
+        mcp_result = await manager.get_tool_result(QUERY_CONNECTION_ID, "query", {"sql": sql})
         
         # 3. Process Result
         raw_json_text = mcp_result.content[0].text
         
         if raw_json_text.startswith("Error") or raw_json_text.startswith("Database Error"):
-             return [TextContent(type="text", text=raw_json_text)]
+             return None, raw_json_text
              
         rows = json.loads(raw_json_text)
-        
-        if not rows:
-            return [TextContent(type="text", text="No results found.")]
-            
-        # 4. Format Output (Markdown Table)
-        if len(rows) > 0:
-            headers = list(rows[0].keys())
-            widths = [len(h) for h in headers]
-            data = []
-            for row in rows:
-                row_str = [str(row.get(h, '')) for h in headers]
-                data.append(row_str)
-                for i, val in enumerate(row_str):
-                    widths[i] = max(widths[i], len(val))
-            
-            header_line = " | ".join(h.ljust(w) for h, w in zip(headers, widths))
-            separator_line = "-|-".join("-" * w for w in widths)
-            
-            output = [header_line, separator_line]
-            for row_data in data:
-                 output.append(" | ".join(val.ljust(w) for val, w in zip(row_data, widths)))
-                 
-            return [TextContent(type="text", text="\n".join(output))]
-        else:
-             return [TextContent(type="text", text="Query executed successfully (No results returned).")]
+        record_rows(len(rows))
+        return rows, None
 
     except SQLValidationError as e:
-        return [TextContent(type="text", text=f"Security Violation: {str(e)}")]
+        return None, f"Security Violation: {str(e)}"
     except Exception as e:
         logger.error(f"Query execution error: {e}")
+        return None, f"Database Error: {str(e)}"
+
+
+def format_markdown_table(headers: List[str], rows: List[List[Any]]) -> str:
+    """Padded "a | b" table with a "-|-" separator line."""
+    data = [[str(value) for value in row] for row in rows]
+    widths = [len(h) for h in headers]
+    for row_str in data:
+        for i, val in enumerate(row_str):
+            widths[i] = max(widths[i], len(val))
+    
+    header_line = " | ".join(h.ljust(w) for h, w in zip(headers, widths))
+    separator_line = "-|-".join("-" * w for w in widths)
+    
+    output = [header_line, separator_line]
+    for row_data in data:
+         output.append(" | ".join(val.ljust(w) for val, w in zip(row_data, widths)))
+    return "\n".join(output)
+
+
+async def handle_run_query(sql: str) -> list[TextContent]:
+    """Executes a read-only SQL query via MCP, formatted as a markdown table."""
+    rows, error = await run_query_rows(sql)
+    if error:
+        return [TextContent(type="text", text=error)]
+    if not rows:
+        return [TextContent(type="text", text="No results found.")]
+    
+    headers = list(rows[0].keys())
+    table = format_markdown_table(headers, [[row.get(h, '') for h in headers] for row in rows])
+    return [TextContent(type="text", text=table)]
+
+
+async def handle_explain_query(sql: str) -> list[TextContent]:
+    """Plans a read-only SQL query via MCP without executing it."""
+    try:
+        validate_sql(sql)
+        mcp_result = await manager.get_tool_result(QUERY_CONNECTION_ID, "explain", {"sql": sql})
+        return [TextContent(type="text", text=mcp_result.content[0].text)]
+    except SQLValidationError as e:
+        return [TextContent(type="text", text=f"Security Violation: {str(e)}")]
+    except Exception as e:
+        logger.error(f"Query planning error: {e}")
         return [TextContent(type="text", text=f"Database Error: {str(e)}")]
 
 
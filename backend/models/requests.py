@@ -1,14 +1,23 @@
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Dict, Any
 
+class QueryOptions(BaseModel):
+    """
+    Per-request options, shared by /api/query and /ws/chat.
+    """
+    model_config = ConfigDict(extra="allow")
+
+    bypass_cache: bool = Field(False, description="Skip the answer cache for this question.")
+    timeout_seconds: Optional[float] = Field(None, gt=0, allow_inf_nan=False, description="Shorter deadline for this question (capped at AGENT_TIMEOUT_SECONDS).")
+
 class QueryRequest(BaseModel):
     """
     Request model for the query endpoint.
     """
     question: str = Field(..., description="The natural language question to ask.")
     session_id: Optional[str] = Field(None, description="Optional session ID for conversation tracking.")
-    options: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Optional configuration parameters.")
+    options: QueryOptions = Field(default_factory=QueryOptions, description="Optional configuration parameters (e.g. bypass_cache, timeout_seconds).")
 
 class SchemaRequest(BaseModel):
     """
@@ -24,4 +33,5 @@ class ConnectionRequest(BaseModel):
     type: str = Field(..., description="Type of connection: 'postgres', 'sqlite', 'filesystem'.")
     name: str = Field(..., description="Human-readable name.")
     params: Dict[str, Any] = Field(..., description="Connection parameters (host, port, etc).")
+    freshness_seconds: Optional[int] = Field(None, description="How long cached answers over this connection stay valid (0 disables caching).")
 
@@ -0,0 +1,110 @@
+"""
+In-process Metrics Registry
+
+Lightweight counters and timing summaries for the agent pipeline (cache hit
+rates, fast-path hits, queue waits, ...). Exposed via GET /api/metrics.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Tuple
+
+TIMING_WINDOW = 1000  # samples kept per timing series for percentiles
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _label_str(key: LabelKey) -> str:
+    return ",".join(f"{k}={v}" for k, v in key) or "all"
+
+
+def _percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._timings: Dict[str, Dict[LabelKey, Deque[float]]] = {}
+        self._timing_totals: Dict[str, Dict[LabelKey, Tuple[int, float]]] = {}
+        self._collectors: Dict[str, Callable[[], Any]] = {}
+
+    def incr(self, name: str, value: float = 1, **labels):
+        """Increment a counter, e.g. incr("llm_cache_hits", node="router")."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Record a duration sample for a timing series."""
+        key = _label_key(labels)
+        with self._lock:
+            self._timings.setdefault(name, {}).setdefault(key, deque(maxlen=TIMING_WINDOW)).append(seconds)
+            count, total = self._timing_totals.setdefault(name, {}).get(key, (0, 0.0))
+            self._timing_totals[name][key] = (count + 1, total + seconds)
+
+    def get_counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def counter_series(self, name: str) -> Dict[str, float]:
+        """All label combinations of a counter, keyed like in snapshots."""
+        with self._lock:
+            return {_label_str(key): value for key, value in self._counters.get(name, {}).items()}
+
+    def percentile(self, name: str, fraction: float, **labels) -> float:
+        with self._lock:
+            samples = sorted(self._timings.get(name, {}).get(_label_key(labels), ()))
+        return _percentile(samples, fraction)
+
+    def sample_count(self, name: str, **labels) -> int:
+        """Samples currently in the percentile window of a timing series."""
+        with self._lock:
+            return len(self._timings.get(name, {}).get(_label_key(labels), ()))
+
+    def register_collector(self, name: str, collector: Callable[[], Any]):
+        """Adds a callable whose output is included under `name` in snapshots."""
+        self._collectors[name] = collector
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                name: {_label_str(key): value for key, value in series.items()}
+                for name, series in self._counters.items()
+            }
+            timings = {}
+            for name, series in self._timings.items():
+                timings[name] = {}
+                for key, samples in series.items():
+                    ordered = sorted(samples)
+                    count, total = self._timing_totals[name][key]
+                    timings[name][_label_str(key)] = {
+                        "count": count,
+                        "avg": round(total / count, 4) if count else 0.0,
+                        "p50": round(_percentile(ordered, 0.5), 4),
+                        "p95": round(_percentile(ordered, 0.95), 4),
+                        "max": round(ordered[-1], 4) if ordered else 0.0
+                    }
+        snapshot: Dict[str, Any] = {"counters": counters, "timings": timings}
+        for name, collector in self._collectors.items():
+            snapshot[name] = collector()
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+            self._timing_totals.clear()
+
+
+# Global access
+metrics = Metrics()
@@ -0,0 +1,108 @@
+"""
+Per-node Request Accounting
+
+Each graph node runs inside `instrument_node`, which collects wall time, LLM
+token usage and latency, MCP call count/time and rows fetched for that node.
+Lower layers (LLM wrapper, MCP manager, query tool) report into the active
+node through a context variable, so nodes themselves stay unchanged.
+"""
+
+import time
+import inspect
+import functools
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+STAT_FIELDS = (
+    "runs", "wall_time", "llm_calls", "prompt_tokens", "completion_tokens",
+    "llm_latency", "mcp_calls", "mcp_time", "rows_fetched"
+)
+
+_current_stats: ContextVar[Optional[Dict[str, float]]] = ContextVar("node_stats", default=None)
+
+
+def _empty_stats() -> Dict[str, float]:
+    return {field: 0 for field in STAT_FIELDS}
+
+
+def record_llm(prompt_tokens: int, completion_tokens: int, latency: float):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats["llm_calls"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        stats["llm_latency"] += latency
+
+
+def record_mcp(seconds: float):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats["mcp_calls"] += 1
+        stats["mcp_time"] += seconds
+
+
+def record_rows(count: int):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats["rows_fetched"] += count
+
+
+def merge_node_stats(left: Optional[Dict[str, Dict[str, float]]], right: Optional[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """State reducer: sums stats for nodes that run more than once (retries)."""
+    merged = {node: dict(stats) for node, stats in (left or {}).items()}
+    for node, stats in (right or {}).items():
+        target = merged.setdefault(node, _empty_stats())
+        for field in STAT_FIELDS:
+            target[field] = target.get(field, 0) + stats.get(field, 0)
+    return merged
+
+
+def summarize_node_stats(node_stats: Optional[Dict[str, Dict[str, float]]]) -> Dict[str, Any]:
+    """Rounded per-node breakdown plus request totals, for API responses."""
+    nodes = {
+        node: {field: round(value, 4) if isinstance(value, float) else value for field, value in stats.items()}
+        for node, stats in (node_stats or {}).items()
+    }
+    totals = _empty_stats()
+    for stats in (node_stats or {}).values():
+        for field in STAT_FIELDS:
+            totals[field] += stats.get(field, 0)
+    totals = {field: round(value, 4) if isinstance(value, float) else value for field, value in totals.items()}
+    return {"nodes": nodes, "totals": totals}
+
+
+def instrument_node(name: str, node: Callable) -> Callable:
+    """Wraps a graph node so its update carries `node_stats` for this run."""
+
+    def finish(stats: Dict[str, float], started: float, result: Any) -> Any:
+        stats["runs"] = 1
+        stats["wall_time"] = time.perf_counter() - started
+        if isinstance(result, dict):
+            # Keep stats of work the node ran on behalf of others (speculation)
+            result = {**result, "node_stats": merge_node_stats(result.get("node_stats"), {name: stats})}
+        return result
+
+    if inspect.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def async_wrapper(state, *args, **kwargs):
+            stats = _empty_stats()
+            token = _current_stats.set(stats)
+            started = time.perf_counter()
+            try:
+                result = await node(state, *args, **kwargs)
+            finally:
+                _current_stats.reset(token)
+            return finish(stats, started, result)
+        return async_wrapper
+
+    @functools.wraps(node)
+    def sync_wrapper(state, *args, **kwargs):
+        stats = _empty_stats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            result = node(state, *args, **kwargs)
+        finally:
+            _current_stats.reset(token)
+        return finish(stats, started, result)
+    return sync_wrapper
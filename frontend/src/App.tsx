@@ -32,6 +32,31 @@ function App() {
       });
     }
 
+    if (message.type === 'answer_delta') {
+      const { delta } = message.payload;
+      setMessages(prev => {
+        const last = prev[prev.length - 1];
+        if (last && last.role === 'assistant' && (last.status === 'thinking' || last.status === 'streaming')) {
+          // First token replaces the progress log, later tokens append
+          const content = last.status === 'streaming' ? last.content + delta : delta;
+          return [...prev.slice(0, -1), { ...last, content, status: 'streaming' }];
+        }
+        return prev;
+      });
+    }
+
+    if (message.type === 'visualization') {
+      // Chart can arrive before the summary finishes streaming
+      const { visualization } = message.payload;
+      setMessages(prev => {
+        const last = prev[prev.length - 1];
+        if (last && last.role === 'assistant') {
+          return [...prev.slice(0, -1), { ...last, visualization }];
+        }
+        return prev;
+      });
+    }
+
     if (message.type === 'final_response') {
       const { answer, visualization } = message.payload;
       setIsProcessing(false);
@@ -53,6 +78,19 @@ function App() {
       });
     }
 
+    if (message.type === 'cancelled' && message.payload.reason === 'cancelled') {
+      // 'replaced' needs no update: the new question already has its own placeholder
+      setIsProcessing(false);
+      setMessages(prev => {
+        const last = prev[prev.length - 1];
+        if (last && last.role === 'assistant' && (last.status === 'thinking' || last.status === 'streaming')) {
+          const content = last.status === 'streaming' ? `${last.content}\n\n_Stopped._` : 'Stopped.';
+          return [...prev.slice(0, -1), { ...last, content, status: 'completed' }];
+        }
+        return prev;
+      });
+    }
+
     if (message.type === 'error') {
       setIsProcessing(false);
       setMessages(prev => {
@@ -69,7 +107,7 @@ function App() {
     }
   }, []);
 
-  const { isConnected, sendMessage } = useWebSocket(wsUrl, handleMessage);
+  const { isConnected, sendMessage, cancel } = useWebSocket(wsUrl, handleMessage);
 
   const handleSendMessage = (text: string) => {
     console.log('[DEBUG] handleSendMessage called with:', text);
@@ -115,6 +153,7 @@ function App() {
           <ChatPanel
             messages={messages}
             onSendMessage={handleSendMessage}
+            onCancel={cancel}
             isProcessing={isProcessing}
           />
         ) : (
@@ -1,6 +1,6 @@
 
 import React, { useState, useRef, useEffect } from 'react';
-import { Send, Bot, User, Loader2 } from 'lucide-react';
+import { Send, Square, Bot, User, Loader2 } from 'lucide-react';
 import Plot from 'react-plotly.js';
 import type { Message } from '../types';
 import clsx from 'clsx';
@@ -8,10 +8,11 @@ import clsx from 'clsx';
 interface ChatPanelProps {
     messages: Message[];
     onSendMessage: (msg: string) => void;
+    onCancel?: () => void;
     isProcessing: boolean;
 }
 
-export const ChatPanel: React.FC<ChatPanelProps> = ({ messages, onSendMessage, isProcessing }) => {
+export const ChatPanel: React.FC<ChatPanelProps> = ({ messages, onSendMessage, onCancel, isProcessing }) => {
     const [input, setInput] = useState('');
     const scrollRef = useRef<HTMLDivElement>(null);
 
@@ -117,13 +118,24 @@ export const ChatPanel: React.FC<ChatPanelProps> = ({ messages, onSendMessage, i
                         placeholder="Ask a question about your database..."
                         className="w-full bg-slate-800 border border-slate-700 rounded-xl px-4 py-3 pr-12 text-slate-100 placeholder-slate-500 focus:outline-none focus:ring-2 focus:ring-indigo-500/50 transition-all disabled:opacity-50"
                     />
-                    <button
-                        type="submit"
-                        disabled={!input.trim() || isProcessing}
-                        className="absolute right-2 top-2 p-2 bg-indigo-600 hover:bg-indigo-500 text-white rounded-lg disabled:opacity-0 transition-all shadow-lg shadow-indigo-500/20"
-                    >
-                        <Send size={18} />
-                    </button>
+                    {isProcessing && onCancel ? (
+                        <button
+                            type="button"
+                            onClick={onCancel}
+                            title="Stop"
+                            className="absolute right-2 top-2 p-2 bg-slate-700 hover:bg-slate-600 text-white rounded-lg transition-all"
+                        >
+                            <Square size={18} />
+                        </button>
+                    ) : (
+                        <button
+                            type="submit"
+                            disabled={!input.trim() || isProcessing}
+                            className="absolute right-2 top-2 p-2 bg-indigo-600 hover:bg-indigo-500 text-white rounded-lg disabled:opacity-0 transition-all shadow-lg shadow-indigo-500/20"
+                        >
+                            <Send size={18} />
+                        </button>
+                    )}
                 </form>
             </div>
         </div>
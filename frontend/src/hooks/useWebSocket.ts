@@ -5,6 +5,7 @@ import type { WebSocketMessage } from '../types';
 interface UseWebSocketReturn {
     isConnected: boolean;
     sendMessage: (question: string) => void;
+    cancel: () => void;
     lastMessage: WebSocketMessage | null;
 }
 
@@ -96,5 +97,12 @@ export const useWebSocket = (url: string, onMessage?: (msg: WebSocketMessage) =>
         }
     }, []);
 
-    return { isConnected, sendMessage };
+    // Stops the question being answered; the server replies with 'cancelled'
+    const cancel = useCallback(() => {
+        if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+            wsRef.current.send(JSON.stringify({ type: 'cancel' }));
+        }
+    }, []);
+
+    return { isConnected, sendMessage, cancel };
 };
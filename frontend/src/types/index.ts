@@ -5,12 +5,12 @@ export interface Message {
     content: string;
     timestamp: number;
     visualization?: any; // Plotly JSON
-    status?: 'thinking' | 'completed' | 'error';
+    status?: 'thinking' | 'streaming' | 'completed' | 'error';
     agent?: string; // which agent is working
 }
 
 export interface WebSocketMessage {
-    type: 'agent_update' | 'final_response' | 'error';
+    type: 'agent_update' | 'answer_delta' | 'visualization' | 'final_response' | 'stats' | 'cancelled' | 'error';
     payload: any;
 }
 
@@ -20,6 +20,27 @@ export interface AgentUpdatePayload {
     message: string;
 }
 
+export interface AnswerDeltaPayload {
+    agent: string;
+    delta: string;
+}
+
+export interface VisualizationPayload {
+    visualization: any; // Plotly JSON
+}
+
+export interface StatsPayload {
+    nodes: Record<string, Record<string, number>>;
+    totals: Record<string, number>;
+    retry_count: number;
+    planning_mode?: 'single_call' | 'two_step' | null;
+    skipped_stages?: string[];
+}
+
+export interface CancelledPayload {
+    reason: 'cancelled' | 'replaced';
+}
+
 export interface FinalResponsePayload {
     answer: string;
     visualization?: any;
@@ -0,0 +1,120 @@
+"""
+Prompt Prefix Reuse Benchmark
+
+Measures time-to-first-token (dominated by prompt processing) for the
+architect -> coder -> critic sequence with the shared, stable prompt prefix,
+versus the same prompts with the prefix deliberately broken so the server
+has to re-process the schema on every call.
+
+Requires a running LLM backend (see LLM_BASE_URL) and a reachable database
+for the schema.
+
+Usage:
+    python scripts/benchmark_prompt_prefix.py [--rounds N]
+"""
+
+import uuid
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import Dict, List
+
+# Add project root to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.messages import BaseMessage, SystemMessage
+from backend.agents.llm import get_llm, close_llm_clients
+from backend.agents.prompts.architect_prompt import architect_prompt
+from backend.agents.prompts.coder_prompt import coder_prompt
+from backend.agents.prompts.critic_prompt import critic_prompt
+from backend.mcp.catalog import canonicalize_schema
+from backend.mcp.tools import handle_get_schema
+
+QUESTIONS = [
+    "How many orders were placed last month?",
+    "What are the top 5 products by revenue?",
+    "Show me total sales by customer city",
+    "What is the average order value per status?",
+]
+
+NODES = ("architect", "coder", "critic")
+
+
+def build_messages(node: str, schema: str, question: str) -> List[BaseMessage]:
+    if node == "architect":
+        return architect_prompt.format_messages(schema=schema, question=question)
+    if node == "coder":
+        return coder_prompt.format_messages(
+            schema=schema, tables="orders, customers", join_path="- orders.customer_id = customers.id",
+            profiles="Not available yet.", previous="None.", question=question
+        )
+    return critic_prompt.format_messages(
+        schema=schema, question=question, sql_query="SELECT * FROM order_items_missing",
+        error='relation "order_items_missing" does not exist'
+    )
+
+
+def bust_prefix(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """Prepends a unique marker so no cached prefix can match."""
+    first = messages[0]
+    return [SystemMessage(content=f"[run {uuid.uuid4().hex}]\n{first.content}")] + list(messages[1:])
+
+
+async def time_to_first_token(llm, messages: List[BaseMessage]) -> float:
+    start = time.perf_counter()
+    async for chunk in llm.astream(messages):
+        if chunk.content:
+            break
+    return time.perf_counter() - start
+
+
+async def run_benchmark(rounds: int) -> Dict[str, Dict[str, List[float]]]:
+    schema = canonicalize_schema((await handle_get_schema())[0].text)
+    # No node name: bypasses the response cache so every call hits the backend
+    llm = get_llm(temperature=0, max_tokens=8)
+    timings = {mode: {node: [] for node in NODES} for mode in ("cold", "shared")}
+
+    # Prime the shared prefix once so the first measured call isn't an outlier
+    await time_to_first_token(llm, build_messages("architect", schema, QUESTIONS[0]))
+
+    for _ in range(rounds):
+        for question in QUESTIONS:
+            for mode in ("cold", "shared"):
+                for node in NODES:
+                    messages = build_messages(node, schema, question)
+                    if mode == "cold":
+                        messages = bust_prefix(messages)
+                    timings[mode][node].append(await time_to_first_token(llm, messages))
+    return timings
+
+
+def print_report(timings: Dict[str, Dict[str, List[float]]]):
+    print(f"\n{'Node':<12}{'Cold TTFT':>12}{'Shared TTFT':>14}{'Saved':>10}")
+    print("-" * 48)
+    total_cold = total_shared = 0.0
+    for node in NODES:
+        cold = statistics.mean(timings["cold"][node])
+        shared = statistics.mean(timings["shared"][node])
+        total_cold += cold
+        total_shared += shared
+        print(f"{node:<12}{cold * 1000:>10.0f}ms{shared * 1000:>12.0f}ms{(1 - shared / cold) * 100:>9.0f}%")
+    print("-" * 48)
+    print(f"{'sequence':<12}{total_cold * 1000:>10.0f}ms{total_shared * 1000:>12.0f}ms{(1 - total_shared / total_cold) * 100:>9.0f}%")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark prompt prefix (KV cache) reuse")
+    parser.add_argument("--rounds", type=int, default=2, help="Passes over the question set")
+    args = parser.parse_args()
+
+    try:
+        print_report(await run_benchmark(args.rounds))
+    finally:
+        await close_llm_clients()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
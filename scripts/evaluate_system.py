@@ -24,6 +24,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from backend.agents.graph import graph
 from backend.agents.state import AgentState
+from backend.agents.scheduler import llm_request_context
 
 
 @dataclass
@@ -201,7 +202,9 @@ async def main():
     
     for i, case in enumerate(gold_set):
         print(f"[{i+1}/{len(gold_set)}] Evaluating: {case['id']} - {case['input'][:50]}...")
-        result = await evaluate_single_case(graph, case)
+        # Evaluation traffic yields to interactive users on a shared LLM backend
+        with llm_request_context("evaluation", session_id="evaluate_system"):
+            result = await evaluate_single_case(graph, case)
         results.append(result)
         
         # Status indicator
@@ -35,6 +35,7 @@ from opentelemetry import trace
 from backend.agents.graph import graph
 from backend.agents.state import AgentState
 from backend.agents.llm import get_llm
+from backend.agents.scheduler import llm_request_context
 from backend.observability.phoenix import init_phoenix
 
 # Initialize Phoenix tracing BEFORE running any agents
@@ -368,7 +369,9 @@ async def main():
     args = parser.parse_args()
     
     gold_set = load_gold_set(args.gold_set)
-    summary = await run_experiment(args.experiment_name, gold_set, args.limit)
+    # Evaluation traffic yields to interactive users on a shared LLM backend
+    with llm_request_context("evaluation", session_id=args.experiment_name):
+        summary = await run_experiment(args.experiment_name, gold_set, args.limit)
     
     return summary
 
@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from backend.api import answer_cache as cache_module
+from backend.api.answer_cache import AnswerCache, answer_cache, normalize_question
+from backend.agents.results import columnar_result
+from backend.agents.sessions import prepare_turn
+from backend.main import app
+
+
+class FakeManager:
+    def __init__(self, configs):
+        self.configs = configs
+        self.version = "v1"
+
+    def list_connections(self):
+        return list(self.configs.values())
+
+    def get_connection_config(self, conn_id):
+        return self.configs.get(conn_id)
+
+    def schema_version(self):
+        return self.version
+
+
+def final_state(**overrides):
+    return {"intent": "DATA_QUERY", "final_response": "42 orders", "sql_query": "SELECT count(*) FROM orders",
+            "query_result": columnar_result([{"count": 42}], max_rows=100), **overrides}
+
+
+def make_cache(max_entries=8, **configs):
+    return AnswerCache(FakeManager(configs or {"default": {"id": "default"}}), max_entries)
+
+
+def test_hit_and_miss():
+    cache = make_cache()
+    cache.put("How many orders?", final_state(), None)
+    assert normalize_question("  How many   ORDERS?! ") == "how many orders"
+    assert cache.get("how many orders")["answer"] == "42 orders"
+    assert cache.get("how many customers?") is None
+    assert cache.get("how many orders", context="SELECT 1") is None
+
+
+def test_errors_and_degraded_runs_are_not_cached():
+    cache = make_cache()
+    cache.put("q1", final_state(sql_error="Database Error: boom"), None)
+    cache.put("q2", final_state(skipped_stages=["critic"]), None)
+    cache.put("q3", final_state(intent="GENERAL_CHAT"), None)
+    assert all(cache.get(q) is None for q in ("q1", "q2", "q3"))
+
+
+def test_freshness_follows_the_queried_connection(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    cache = make_cache(default={"id": "default", "freshness_seconds": 60},
+                       live={"id": "live", "freshness_seconds": 1})
+    assert cache.freshness_window("default") == 60
+    cache.put("How many orders?", final_state(), None)
+    cache.put("What tables exist?", final_state(intent="SCHEMA_QUESTION"), None)
+
+    # The volatile side connection doesn't shrink the window of the queried one
+    now[0] += 30
+    assert cache.get("How many orders?") is not None
+    now[0] += 31
+    assert cache.get("How many orders?") is None
+    # Schema answers use the default window
+    assert cache.get("What tables exist?") is not None
+    now[0] += cache_module.settings.ANSWER_CACHE_FRESHNESS_SECONDS
+    assert cache.get("What tables exist?") is None
+
+
+def test_zero_window_disables_caching():
+    cache = make_cache(default={"id": "default", "freshness_seconds": 0})
+    cache.put("How many orders?", final_state(), None)
+    assert cache.get("How many orders?") is None
+
+
+def test_schema_change_invalidates():
+    cache = make_cache()
+    cache.put("How many orders?", final_state(), None)
+    cache.manager.version = "v2"
+    assert cache.get("How many orders?") is None
+    cache.manager.version = "v1"
+    assert cache.get("How many orders?") is not None
+    cache.clear()
+    assert cache.get("How many orders?") is None
+
+
+def test_max_entries_evicts_least_recently_used():
+    cache = make_cache(max_entries=2)
+    cache.put("q1", final_state(), None)
+    cache.put("q2", final_state(), None)
+    assert cache.get("q1")
+    cache.put("q3", final_state(), None)
+    assert cache.get("q2") is None and cache.get("q1") and cache.get("q3")
+
+
+@pytest.mark.parametrize("transport", ["rest", "ws"])
+def test_cache_hit_advances_the_session(transport):
+    session_id = f"cached-{transport}"
+    state = final_state(relevant_tables=["orders"])
+    answer_cache.put("How many orders?", state, None)
+    client = TestClient(app)
+    if transport == "rest":
+        response = client.post("/api/query", json={"question": "How many orders?", "session_id": session_id})
+        assert response.json()["metadata"] == {"cache": "hit"}
+    else:
+        with client.websocket_connect("/ws/chat") as websocket:
+            websocket.send_json({"question": "How many orders?", "session_id": session_id})
+            assert websocket.receive_json()["payload"]["cached"] is True
+
+    follow_up = asyncio.run(prepare_turn(session_id, "and by month?"))
+    assert follow_up["previous_question"] == "How many orders?"
+    assert follow_up["previous_sql"] == state["sql_query"] and follow_up["previous_tables"] == ["orders"]
+    assert [m.content for m in follow_up["messages"]] == ["How many orders?", "42 orders", "and by month?"]
+    answer_cache.clear()
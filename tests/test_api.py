@@ -56,7 +56,8 @@ def test_websocket():
                 data = websocket.receive_json()
                 responses.append(data)
                 print(f"Received: {data['type']}")
-                if data['type'] == 'final_response':
+                # The socket stays open after a failed run
+                if data['type'] in ('final_response', 'error'):
                     break
         except Exception as e:
             print(f"WS Loop ended: {e}")
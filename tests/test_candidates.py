@@ -0,0 +1,79 @@
+import json
+import time
+import asyncio
+from mcp.types import TextContent
+from backend.agents import candidates
+from backend.agents.candidates import generate_candidates, select_candidate, results_agree
+from backend.agents.nodes.coder import extract_sql
+from backend.agents.results import columnar_result
+
+
+def test_generation_is_parallel_and_budgeted():
+    async def generate(index):
+        await asyncio.sleep({0: 0.05, 1: 0.05, 2: 5}[index])
+        return f"SELECT {index}"
+
+    started = time.perf_counter()
+    sqls = asyncio.run(generate_candidates(generate, 3, budget_seconds=0.3))
+    assert sqls == ["SELECT 0", "SELECT 1"]
+    assert time.perf_counter() - started < 1
+
+
+def test_generation_waits_for_first_success_past_budget():
+    async def generate(index):
+        if index == 0:
+            raise RuntimeError("backend down")
+        await asyncio.sleep(0.1)
+        return "SELECT 1"
+
+    assert asyncio.run(generate_candidates(generate, 2, budget_seconds=0.01)) == ["SELECT 1"]
+
+
+def explain_by_length(costs=None):
+    """Fake EXPLAIN: errors on `missing`, otherwise costs[sql] or the length of the SQL."""
+    async def fake_explain(sql):
+        if "missing" in sql:
+            return [TextContent(type="text", text='Database Error: relation "missing" does not exist')]
+        return [TextContent(type="text", text=json.dumps({"total_cost": (costs or {}).get(sql, len(sql)), "plan_rows": 1}))]
+    return fake_explain
+
+
+def test_invalid_candidates_are_skipped(monkeypatch):
+    monkeypatch.setattr(candidates, "handle_explain_query", explain_by_length())
+    chosen, alternates = asyncio.run(select_candidate([
+        "SELECT * FROM missing",
+        "DELETE FROM orders",
+        "SELECT id FROM orders",
+        "select id  from orders;",
+        "SELECT id, status FROM orders",
+    ]))
+    assert chosen["sql"] == "SELECT id FROM orders" and chosen["cost"] == 21
+    assert alternates == ["SELECT id, status FROM orders"]
+
+    chosen, alternates = asyncio.run(select_candidate(["SELECT * FROM missing"]))
+    assert not chosen["valid"] and "does not exist" in chosen["error"] and alternates == []
+
+
+def test_cheapest_valid_candidate_wins_ties_by_order(monkeypatch):
+    costs = {"SELECT * FROM orders": 90, "SELECT id FROM orders": 10, "SELECT orders.id FROM orders": 10}
+    monkeypatch.setattr(candidates, "handle_explain_query", explain_by_length(costs))
+    chosen, alternates = asyncio.run(select_candidate(list(costs)))
+    assert chosen["sql"] == "SELECT id FROM orders" and chosen["cost"] == 10
+    assert alternates == ["SELECT orders.id FROM orders", "SELECT * FROM orders"]
+
+    # Unknown costs rank after known ones
+    costs = {"SELECT * FROM orders": None, "SELECT id FROM orders": 50}
+    monkeypatch.setattr(candidates, "handle_explain_query", explain_by_length(costs))
+    assert asyncio.run(select_candidate(list(costs)))[0]["sql"] == "SELECT id FROM orders"
+
+
+def test_results_agree_ignores_row_order_and_aliases():
+    first = columnar_result([{"city": "Paris", "n": 2}, {"city": "Rome", "n": 1}], max_rows=100)
+    second = columnar_result([{"city": "Rome", "orders": 1}, {"city": "Paris", "orders": 2}], max_rows=100)
+    assert results_agree(first, second)
+    assert not results_agree(first, columnar_result([{"city": "Paris", "n": 3}, {"city": "Rome", "n": 1}], max_rows=100))
+
+
+def test_extract_sql_from_reply():
+    assert extract_sql("Here you go:\n```sql\nSELECT 1\n```") == "SELECT 1"
+    assert extract_sql("The query is SELECT id FROM orders") == "SELECT id FROM orders"
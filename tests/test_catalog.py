@@ -0,0 +1,16 @@
+from backend.mcp.catalog import parse_schema, schema_fingerprint
+
+PG = "Table: orders\n- id (integer)\n- total (numeric)\n\nTable: customers\n- id (integer)\n"
+SQLITE = "Table: orders\nCREATE TABLE orders (\n  id INTEGER PRIMARY KEY,\n  customer_id INTEGER REFERENCES customers(id),\n  FOREIGN KEY (customer_id) REFERENCES customers(id)\n)\n"
+
+
+def test_parse_both_server_formats():
+    assert parse_schema(PG) == {"orders": [("id", "integer"), ("total", "numeric")], "customers": [("id", "integer")]}
+    assert parse_schema(SQLITE) == {"orders": [("id", "INTEGER"), ("customer_id", "INTEGER")]}
+
+
+def test_fingerprint_ignores_layout_but_not_columns():
+    reordered = "Table: customers\n  - id (integer)\nTable: orders\n- total (numeric)\n- id (integer)\n"
+    assert schema_fingerprint(PG) == schema_fingerprint(reordered)
+    assert schema_fingerprint(PG) != schema_fingerprint(PG.replace("total (numeric)", "total (text)"))
+    assert schema_fingerprint("Error fetching schema: x") != schema_fingerprint("Error fetching schema: y")
@@ -0,0 +1,60 @@
+from backend.agents.results import columnar_result, result_columns, NUMERIC, TEMPORAL, CATEGORICAL
+from backend.agents.charts import build_chart_spec
+
+
+def table(rows):
+    return result_columns(columnar_result(rows, max_rows=10000))
+
+
+MONTHLY = [
+    {"month": "2024-02", "revenue": 200.5},
+    {"month": "2024-01", "revenue": 100},
+]
+
+BY_STATUS = [
+    {"status": "shipped", "order_count": 10, "customer_id": 1},
+    {"status": "pending", "order_count": 4, "customer_id": 2},
+    {"status": "cancelled", "order_count": 1, "customer_id": 3},
+]
+
+
+def test_column_types():
+    types = {c["name"]: c["type"] for c in table(BY_STATUS)}
+    assert types == {"status": CATEGORICAL, "order_count": NUMERIC, "customer_id": CATEGORICAL}
+    assert [c["type"] for c in table(MONTHLY)] == [TEMPORAL, NUMERIC]
+
+
+def test_temporal_numeric_is_sorted_line():
+    figure = build_chart_spec("Revenue by month", table(MONTHLY))
+    trace = figure["data"][0]
+    assert trace["mode"] == "lines+markers"
+    assert trace["x"] == ["2024-01", "2024-02"] and trace["y"] == [100, 200.5]
+
+
+def test_numeric_x_is_sorted_by_value_with_nulls_last():
+    rows = [{"month": m, "revenue": 5} for m in (12, 2, None, 10, 1)]
+    assert build_chart_spec("Revenue by month", table(rows))["data"][0]["x"] == [1, 2, 10, 12, None]
+    text_months = [{"month": str(m), "revenue": m} for m in (11, 3, 1)]
+    assert build_chart_spec("Revenue by month", table(text_months))["data"][0]["x"] == ["1", "3", "11"]
+
+
+def test_categorical_numeric_pie_or_bar():
+    assert build_chart_spec("Orders by status", table(BY_STATUS))["data"][0]["type"] == "pie"
+    assert build_chart_spec("Bar chart of orders by status", table(BY_STATUS))["data"][0]["type"] == "bar"
+
+
+def test_chart_type_requests_match_whole_words():
+    for question in ("Online orders by status", "Pieces ordered by status", "Barcode scans by status"):
+        assert build_chart_spec(question, table(BY_STATUS))["data"][0]["type"] == "pie"
+    assert build_chart_spec("Orders by status (bar)", table(BY_STATUS))["data"][0]["type"] == "bar"
+
+
+def test_two_numerics_scatter_and_large_results():
+    rows = [{"quantity": i, "price": i * 2.5} for i in range(5000)]
+    figure = build_chart_spec("price vs quantity", table(rows))
+    assert figure["data"][0]["type"] == "scattergl"
+    assert len(figure["data"][0]["x"]) == 5000
+
+
+def test_unclassified_shape_falls_back():
+    assert build_chart_spec("list names", table([{"name": "Ann", "city": "Oslo"}])) is None
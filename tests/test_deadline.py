@@ -0,0 +1,61 @@
+import time
+import math
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from backend.agents.deadline import request_deadline, remaining, has_budget, within_deadline
+from backend.agents.graph import route_executor, route_sql_repair
+from backend.agents.nodes.viz_router import viz_router_node
+from backend.agents.nodes.visualizer import visualizer_node
+from backend.agents.nodes.final_responder import final_responder_node
+from backend.agents.results import columnar_result
+from backend.main import app
+
+RESULT = columnar_result([{"month": f"2024-{m:02d}", "revenue": m * 100} for m in range(1, 13)], max_rows=100)
+
+
+def test_deadline_default_and_override():
+    assert remaining({}) == math.inf and has_budget({}, "critic")
+    assert 0 < remaining({"deadline": request_deadline()}) <= 30
+    assert remaining({"deadline": request_deadline(2)}) <= 2
+    assert not has_budget({"deadline": request_deadline(2)}, "critic")
+    # Requests can shorten the deadline, not extend it
+    assert remaining({"deadline": request_deadline(10_000)}) <= 30
+
+
+def test_invalid_timeouts_are_rejected_at_the_api():
+    client = TestClient(app)
+    for timeout in (0, -5, "soon"):
+        response = client.post("/api/query", json={"question": "q", "options": {"timeout_seconds": timeout}})
+        assert response.status_code == 422
+    with client.websocket_connect("/ws/chat") as websocket:
+        websocket.send_json({"question": "q", "timeout_seconds": "soon"})
+        assert websocket.receive_json() == {"type": "error", "payload": {"message": "timeout_seconds must be a positive number"}}
+
+
+def test_within_deadline_times_out():
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(within_deadline({"deadline": time.time() + 0.05}, asyncio.sleep(1)))
+
+
+def test_routing_gives_up_when_out_of_time():
+    failed = {"sql_error": "Database Error: boom", "retry_count": 0}
+    assert route_executor(failed) == "sql_repair"
+    assert route_executor({**failed, "deadline": time.time() - 1}) == "error_handler"
+    assert route_sql_repair(failed) == "critic"
+    assert route_sql_repair({**failed, "skipped_stages": ["critic"]}) == "error_handler"
+
+
+def test_low_budget_keeps_rule_charts_and_skips_llm_stages():
+    state = {"user_question": "plot revenue over time", "query_result": RESULT, "deadline": time.time() + 1}
+    assert viz_router_node(state) == {"needs_visualization": True, "visualization_type": "plotly"}
+    # Rule-based charts need no LLM, only the fallback is skipped
+    assert asyncio.run(visualizer_node(state))["visualization_code"]
+    notes = columnar_result([{"city": "Oslo", "note": "a"}, {"city": "Rome", "note": "b"}], max_rows=100)
+    assert asyncio.run(visualizer_node({**state, "query_result": notes})) == {"visualization_code": None, "skipped_stages": ["visualizer"]}
+
+    update = asyncio.run(final_responder_node(state))
+    assert update["skipped_stages"] == ["final_responder"]
+    assert update["final_response"].startswith("Here are the results (12 rows):")
+    assert update["final_response"].rstrip().endswith("2024-12 | 1200")
+
@@ -0,0 +1,80 @@
+import asyncio
+from typing import Any, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from backend.config import settings
+from backend.agents.scheduler import ScheduledChatModel
+from backend.agents.hedging import HedgedChatModel, CircuitBreaker, get_breaker
+
+
+class SlowChatModel(BaseChatModel):
+    reply: str
+    delay: float = 0.0
+    fail: bool = False
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        raise NotImplementedError
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("backend down")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+
+def hedged(node: str, *models: SlowChatModel) -> HedgedChatModel:
+    backends = [ScheduledChatModel(inner=m, backend=f"{node}-{i}", node=node) for i, m in enumerate(models)]
+    return HedgedChatModel(backends=backends, node=node)
+
+
+def test_slow_primary_is_hedged(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGE_DELAY_SECONDS", 0.05)
+    llm = hedged("hedge_test", SlowChatModel(reply="primary", delay=1.0), SlowChatModel(reply="secondary"))
+    assert asyncio.run(llm.ainvoke("hi")).content == "secondary"
+
+
+def test_failed_primary_falls_back(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGE_DELAY_SECONDS", 5.0)
+    llm = hedged("fallback_test", SlowChatModel(reply="primary", fail=True), SlowChatModel(reply="secondary"))
+    assert asyncio.run(llm.ainvoke("hi")).content == "secondary"
+    assert get_breaker("fallback_test-0").failures == 1
+
+
+def test_circuit_breaker_trips_and_recovers():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=0)
+    breaker.cooldown_seconds = 60
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    breaker.cooldown_seconds = 0
+    assert breaker.state == "half_open" and breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_losing_a_hedge_race_is_not_a_failure(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGE_DELAY_SECONDS", 0.05)
+    llm = hedged("race_test", SlowChatModel(reply="primary", delay=0.2), SlowChatModel(reply="secondary", delay=0.5))
+    for _ in range(settings.LLM_BREAKER_FAILURES + 1):
+        assert asyncio.run(llm.ainvoke("hi")).content == "primary"
+    assert get_breaker("race_test-1").state == "closed" and get_breaker("race_test-1").failures == 0
+
+
+def test_half_open_breaker_admits_a_single_trial():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=0)
+    breaker.record_failure()
+    assert breaker.state == "half_open" and breaker.allow()
+    assert breaker.start_attempt()
+    assert not breaker.allow() and not breaker.start_attempt()
+    breaker.release_trial()
+    assert breaker.allow() and breaker.start_attempt()
+    breaker.record_failure()
+    assert breaker.allow() and breaker.start_attempt()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
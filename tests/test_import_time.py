@@ -0,0 +1,41 @@
+import os
+import sys
+import subprocess
+
+# Generous for slow CI machines; a cold import was ~1.4s before lazy loading and ~0.75s after
+IMPORT_BUDGET_SECONDS = 3.0
+
+# Loaded on first use (LLM call, graph build, app startup), never on import
+LAZY_MODULES = ("langchain_openai", "langchain_google_genai", "phoenix", "openinference", "langgraph.graph", "backend.agents.nodes")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module: str) -> dict:
+    """{module: cumulative microseconds} from `python -X importtime`."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env={**os.environ, "PYTHONPATH": ROOT}, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        # "import time: <self us> | <cumulative us> | <indented module name>"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_app_import_is_lazy_and_within_budget():
+    times = import_times("backend.main")
+    eager = sorted(name for name in times if name.startswith(LAZY_MODULES))
+    assert eager == []
+    assert times["backend.main"] / 1e6 < IMPORT_BUDGET_SECONDS
+
+
+def test_graph_builds_on_first_use():
+    from backend.agents.graph import get_graph
+    graph = get_graph()
+    assert get_graph() is graph
+    assert {"router", "coder", "output_join"} <= set(graph.nodes)
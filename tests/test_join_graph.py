@@ -0,0 +1,74 @@
+from backend.mcp.catalog import parse_schema
+from backend.mcp.join_graph import JoinGraph, JoinPlanner, infer_foreign_keys
+from backend.mcp.manager import MCPConnectionManager
+
+SCHEMA = """
+--- Connection: Default Database ---
+
+Table: customers
+- id (integer)
+- name (character varying)
+
+Table: orders
+- id (integer)
+- customer_id (integer)
+- status (character varying)
+
+Table: order_items
+- id (integer)
+- order_id (integer)
+- product_id (integer)
+
+Table: products
+- id (integer)
+- category (character varying)
+
+Table: page_views
+- id (integer)
+- session_id (character varying)
+"""
+
+def test_parse_sqlite_ddl():
+    tables = parse_schema("\nTable: products\nCREATE TABLE products (id INTEGER PRIMARY KEY, name TEXT, price REAL, FOREIGN KEY (id) REFERENCES x(id))\n")
+    assert tables == {"products": [("id", "INTEGER"), ("name", "TEXT"), ("price", "REAL")]}
+
+def test_infer_foreign_keys():
+    edges = infer_foreign_keys(parse_schema(SCHEMA))
+    assert ("orders", "customer_id", "customers", "id") in edges
+    assert ("order_items", "product_id", "products", "id") in edges
+    # No sessions table, so session_id stays unlinked
+    assert not any(edge[0] == "page_views" for edge in edges)
+
+def test_join_chain_bridges_through_orders():
+    graph = JoinGraph(infer_foreign_keys(parse_schema(SCHEMA)))
+    chain = graph.join_chain(["customers", "order_items"])
+    assert chain == [
+        ("orders", "customer_id", "customers", "id"),
+        ("order_items", "order_id", "orders", "id"),
+    ]
+    assert graph.join_chain(["customers"]) == []
+    assert graph.join_chain(["customers", "page_views"]) == []
+
+
+def test_late_listener_gets_schemas_already_seen():
+    # e.g. /api/schema runs before the graph (and the coder's imports) is built
+    manager = MCPConnectionManager()
+    manager.set_cached_schema("default", SCHEMA)
+    planner = JoinPlanner(manager)
+    manager.add_schema_listener(planner.on_schema_change)
+    assert planner.render(["customers", "order_items"])
+    manager.set_cached_schema("default", SCHEMA)
+    assert manager._schema_listeners == [planner.on_schema_change]
+
+
+def test_planner_keeps_connections_apart():
+    planner = JoinPlanner(MCPConnectionManager())
+    # A side database that happens to know more of the hinted tables
+    planner.on_schema_change("warehouse", SCHEMA)
+    planner.on_schema_change("default", "\nTable: customers\n- id (integer)\n\nTable: orders\n- id (integer)\n")
+    assert planner.join_chain(["customers", "orders", "order_items"]) == []
+    assert planner.join_chain(["customers", "order_items"], "warehouse") == [
+        ("orders", "customer_id", "customers", "id"),
+        ("order_items", "order_id", "orders", "id"),
+    ]
+    assert planner.render(["customers", "orders"], "missing") == ""
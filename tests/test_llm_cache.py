@@ -0,0 +1,83 @@
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+from backend.config import settings
+from backend.agents import llm_cache
+from backend.agents.llm_cache import ResponseStore, NodeResponseCache, get_node_cache, evict_rejected_sql
+
+
+def test_keys_ignore_formatting_but_not_model_or_schema(monkeypatch):
+    store = ResponseStore(max_entries=8, ttl_seconds=60)
+    key = store.make_key("SELECT\n  revenue", "model-a")
+    assert store.make_key("SELECT revenue", "model-a") == key
+    assert store.make_key("SELECT revenue", "model-b") != key
+    monkeypatch.setattr(llm_cache.manager, "schema_version", lambda: "other-schema")
+    assert store.make_key("SELECT revenue", "model-a") != key
+
+
+def test_ttl_expiry(monkeypatch, tmp_path):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    store = ResponseStore(max_entries=8, ttl_seconds=60, path=str(tmp_path / "cache.db"))
+    store.set("k", [{"content": "DATA_QUERY"}])
+    now[0] += 59
+    assert store.get("k") == [{"content": "DATA_QUERY"}]
+    now[0] += 2
+    assert store.get("k") is None
+    assert store._db.execute("SELECT count(*) FROM llm_cache").fetchone()[0] == 0
+
+
+def test_max_entries_evicts_least_recently_used():
+    store = ResponseStore(max_entries=2, ttl_seconds=60)
+    store.set("a", [{"content": "1"}])
+    store.set("b", [{"content": "2"}])
+    assert store.get("a")
+    store.set("c", [{"content": "3"}])
+    assert store.get("b") is None and store.get("a") and store.get("c")
+
+
+def test_schema_change_invalidates(monkeypatch, tmp_path):
+    store = ResponseStore(max_entries=8, ttl_seconds=60, path=str(tmp_path / "cache.db"))
+    cache = NodeResponseCache(store, "router")
+    cache.update("prompt", "model", [ChatGeneration(message=AIMessage(content="DATA_QUERY"))])
+    assert cache.lookup("prompt", "model")[0].message.content == "DATA_QUERY"
+
+    # The listener drops memory; the disk entry is keyed by the old version
+    store.invalidate()
+    assert not store._memory
+    monkeypatch.setattr(llm_cache.manager, "schema_version", lambda: "new-schema")
+    assert cache.lookup("prompt", "model") is None
+
+
+def test_only_deterministic_node_calls_are_cached(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", True)
+    assert get_node_cache("router", 0).node == "router"
+    assert get_node_cache("coder", 0).node == "coder" and get_node_cache("critic", 0).node == "critic"
+    assert get_node_cache("chat_responder", 0.7) is None
+    assert get_node_cache(None, 0) is None
+
+
+def reply(content):
+    return [ChatGeneration(message=AIMessage(content=content))]
+
+
+def test_rejected_sql_is_evicted_and_retries_get_their_own_entry(monkeypatch, tmp_path):
+    store = ResponseStore(max_entries=8, ttl_seconds=60, path=str(tmp_path / "cache.db"))
+    monkeypatch.setattr(llm_cache, "response_store", store)
+    coder, critic, router = (NodeResponseCache(store, node) for node in ("coder", "critic", "router"))
+    coder.update("question: revenue", "model", reply("```sql\nSELECT revenue\nFROM sales\n```"))
+    coder.update("question: orders", "model", reply("SELECT count(*) FROM orders"))
+    router.update("SELECT revenue FROM sales", "model", reply("SELECT revenue FROM sales"))
+    # The critic's prompt carries the error, so a retry never shares the failed attempt's key
+    critic.update("SELECT revenue FROM sales\nerror: no column revenue", "model", reply("SELECT amount FROM sales"))
+    assert critic.lookup("SELECT revenue FROM sales\nerror: timeout", "model") is None
+
+    assert evict_rejected_sql("SELECT revenue FROM sales;") == 1
+    assert coder.lookup("question: revenue", "model") is None
+    assert store._db.execute("SELECT count(*) FROM llm_cache").fetchone()[0] == 3
+    assert coder.lookup("question: orders", "model") and router.lookup("SELECT revenue FROM sales", "model")
+    assert critic.lookup("SELECT revenue FROM sales\nerror: no column revenue", "model")
+
+    # Entries only on disk (after a schema-driven memory drop) are found too
+    store.invalidate()
+    assert evict_rejected_sql("SELECT amount FROM sales") == 1
+    assert critic.lookup("SELECT revenue FROM sales\nerror: no column revenue", "model") is None
@@ -0,0 +1,54 @@
+import asyncio
+from backend.config import settings
+from backend.agents import llm
+from backend.agents.llm import resolve_llm_config
+
+
+def test_small_tier_and_node_overrides(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "ollama")
+    monkeypatch.setattr(settings, "LLM_MODEL_NAME", "big-model")
+    monkeypatch.setattr(settings, "LLM_SMALL_MODEL_NAME", "small-model")
+    monkeypatch.setattr(settings, "LLM_NODE_CONFIG", {"coder": {"model": "coder-model", "max_tokens": 300, "temperature": 0.1}})
+
+    router = resolve_llm_config("router")
+    assert router["model"] == "small-model"
+    assert router["temperature"] == 0 and router["max_tokens"] is None
+    # Only prose answers are capped by default, structured output never is
+    assert resolve_llm_config("final_responder")["max_tokens"] == 512
+    assert all(resolve_llm_config(node)["max_tokens"] is None for node in ("architect", "critic", "visualizer"))
+
+    assert resolve_llm_config("architect")["model"] == "big-model"
+    assert resolve_llm_config("chat_responder", 0.7)["temperature"] == 0.7
+
+    coder = resolve_llm_config("coder")
+    assert coder["model"] == "coder-model"
+    assert coder["max_tokens"] == 300 and coder["temperature"] == 0.1
+    # An explicit temperature beats the node override
+    assert resolve_llm_config("coder", 0)["temperature"] == 0
+    assert resolve_llm_config("coder", 0.8)["temperature"] == 0.8
+
+    # Unnamed callers (eval judges, scripts) keep the global model
+    assert resolve_llm_config()["model"] == "big-model"
+
+
+def test_clients_are_reused_per_config_and_closed(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "ollama")
+    monkeypatch.setattr(settings, "LLM_FALLBACK_BACKENDS", [])
+    asyncio.run(llm.close_llm_clients())
+
+    router = llm.get_llm(node="router")
+    assert llm.get_llm(node="router") is router
+    assert llm.get_llm(temperature=0.7, node="router") is not router
+    assert llm.get_llm(node="router", max_tokens=8) is not router
+    assert llm.get_llm(node="coder") is not router
+
+    # Every client shares the one pooled HTTP client
+    http_client = llm._http_async_client
+    assert router.inner.http_async_client is http_client
+    assert llm.get_llm(node="coder").inner.http_async_client is http_client
+
+    asyncio.run(llm.close_llm_clients())
+    assert not llm._clients and llm._http_client is None and llm._http_async_client is None
+    assert http_client.is_closed
+    assert llm.get_llm(node="router") is not router
+    asyncio.run(llm.close_llm_clients())
@@ -0,0 +1,34 @@
+import asyncio
+from backend.observability.node_stats import (
+    instrument_node, merge_node_stats, record_llm, record_mcp, record_rows, summarize_node_stats
+)
+
+
+def test_instrument_node_collects_stats():
+    async def node(state):
+        record_llm(100, 20, 0.5)
+        record_mcp(0.1)
+        record_rows(7)
+        return {"sql_query": "SELECT 1"}
+
+    result = asyncio.run(instrument_node("executor", node)({}))
+    stats = result["node_stats"]["executor"]
+    assert result["sql_query"] == "SELECT 1"
+    assert stats["runs"] == 1
+    assert stats["prompt_tokens"] == 100 and stats["completion_tokens"] == 20
+    assert stats["mcp_calls"] == 1 and stats["rows_fetched"] == 7
+    assert stats["wall_time"] >= 0
+
+    # Recording outside a node is a no-op
+    record_llm(1, 1, 1.0)
+
+
+def test_merge_sums_retries():
+    first = {"executor": {"runs": 1, "mcp_calls": 1, "wall_time": 0.2}}
+    second = {"executor": {"runs": 1, "mcp_calls": 1, "wall_time": 0.3}, "critic": {"runs": 1}}
+    merged = merge_node_stats(first, second)
+    assert merged["executor"]["runs"] == 2
+    assert merged["executor"]["mcp_calls"] == 2
+    summary = summarize_node_stats(merged)
+    assert summary["totals"]["runs"] == 3
+    assert summary["totals"]["wall_time"] == 0.5
@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from backend.agents.graph import build_workflow
+from backend.agents.results import columnar_result
+from backend.agents.nodes import (
+    router, schema_loader, coder, executor, viz_router, visualizer, final_responder, output_join
+)
+
+RESULT = columnar_result([{"city": "Oslo", "orders": 3}, {"city": "Rome", "orders": 5}], max_rows=100)
+
+
+def delayed(update, seconds):
+    async def node(state):
+        await asyncio.sleep(seconds)
+        return update
+    return node
+
+
+def run_output_layer(monkeypatch, needs_visualization, visualizer_delay=0.0, responder_delay=0.0):
+    """Runs the real graph wiring with stub nodes; returns what output_join saw and the final state."""
+    joins = []
+    real_join = output_join.output_join_node
+
+    def recording_join(state):
+        joins.append({key: state.get(key) for key in ("final_response", "visualization_code")})
+        return real_join(state)
+
+    monkeypatch.setattr(router, "router_node", delayed({"intent": "DATA_QUERY", "intent_confidence": 1.0}, 0))
+    monkeypatch.setattr(schema_loader, "schema_loader_node", delayed({"planning_mode": "single_call"}, 0))
+    monkeypatch.setattr(coder, "coder_node", delayed({"sql_query": "SELECT city, count(*) FROM orders GROUP BY city"}, 0))
+    monkeypatch.setattr(executor, "executor_node", delayed({"query_result": RESULT, "sql_error": None}, 0))
+    monkeypatch.setattr(viz_router, "viz_router_node", delayed({"needs_visualization": needs_visualization}, 0))
+    monkeypatch.setattr(visualizer, "visualizer_node", delayed({"visualization_code": '{"type": "bar"}'}, visualizer_delay))
+    monkeypatch.setattr(final_responder, "final_responder_node", delayed({"final_response": "Rome leads."}, responder_delay))
+    monkeypatch.setattr(output_join, "output_join_node", recording_join)
+
+    graph = build_workflow().compile()
+    final_state = asyncio.run(graph.ainvoke({"user_question": "orders by city"}))
+    return joins, final_state
+
+
+@pytest.mark.parametrize("visualizer_delay, responder_delay", [(0.2, 0.0), (0.0, 0.2)])
+def test_join_waits_for_both_branches(monkeypatch, visualizer_delay, responder_delay):
+    joins, final_state = run_output_layer(monkeypatch, True, visualizer_delay, responder_delay)
+    assert joins == [{"final_response": "Rome leads.", "visualization_code": '{"type": "bar"}'}]
+    assert final_state["final_response"] == "Rome leads."
+
+
+def test_join_runs_once_without_a_chart(monkeypatch):
+    joins, final_state = run_output_layer(monkeypatch, False)
+    assert joins == [{"final_response": "Rome leads.", "visualization_code": None}]
+    assert final_state.get("visualization_code") is None
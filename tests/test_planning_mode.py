@@ -0,0 +1,30 @@
+import asyncio
+from mcp.types import TextContent
+from backend.config import settings
+from backend.agents.nodes import schema_loader
+from backend.agents.graph import route_schema_loader
+
+SCHEMA = "Table: orders\n- id (integer)\n- customer_id (integer)\n\nTable: customers\n- id (integer)\n"
+
+
+def run_loader(monkeypatch, threshold):
+    async def fake_get_schema(table_names=None):
+        return [TextContent(type="text", text=SCHEMA)]
+    monkeypatch.setattr(schema_loader, "handle_get_schema", fake_get_schema)
+    monkeypatch.setattr(settings, "AGENT_SINGLE_CALL_SCHEMA_TOKENS", threshold)
+    return asyncio.run(schema_loader.schema_loader_node({"user_question": "How many orders?"}))
+
+
+def test_small_schema_skips_architect(monkeypatch):
+    result = run_loader(monkeypatch, 1500)
+    assert result["planning_mode"] == "single_call"
+    assert result["schema_context"].startswith("Table: customers")
+    assert route_schema_loader(result) == "coder"
+
+
+def test_large_schema_uses_two_step(monkeypatch):
+    result = run_loader(monkeypatch, 5)
+    assert result["planning_mode"] == "two_step"
+    assert route_schema_loader(result) == "architect"
+    # 0 disables single-call mode entirely
+    assert run_loader(monkeypatch, 0)["planning_mode"] == "two_step"
@@ -0,0 +1,72 @@
+import asyncio
+from backend.config import settings
+from backend.mcp.profiler import ColumnProfiler
+
+
+class FakeProfiler(ColumnProfiler):
+    """Answers profiling queries from canned rows instead of an MCP server."""
+
+    def __init__(self, estimate, rows):
+        super().__init__(connection_manager=None)
+        self.estimate = estimate
+        self.rows = rows
+        self.queries = []
+
+    async def _query(self, conn_id, sql):
+        self.queries.append(sql)
+        if "estimate" in sql:
+            return [{"estimate": self.estimate}]
+        return self.rows
+
+
+def profile(estimate, rows, table="orders"):
+    profiler = FakeProfiler(estimate, rows)
+    return profiler, asyncio.run(profiler._profile_table("default", "postgres", table))
+
+
+def profiler_render(profiler, stats):
+    profiler._profiles["default"] = {"orders": stats}
+    return profiler.render(["orders"])
+
+
+def test_short_plain_read_is_exact():
+    rows = [{"status": s} for s in ["shipped"] * 5 + ["pending"] * 3]
+    _, stats = profile(estimate=8, rows=rows)
+    assert "sampled" not in stats["status"]
+    assert stats["status"]["approx_distinct"] == 2 and stats["status"]["values"] == ["pending", "shipped"]
+
+
+def test_unknown_estimate_with_full_sample_is_not_exact(monkeypatch):
+    # Unanalyzed Postgres table: reltuples is -1, the LIMIT read is only a prefix
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_ROWS", 10)
+    rows = [{"status": "shipped" if i % 2 else "pending", "id": i} for i in range(10)]
+    profiler, stats = profile(estimate=-1, rows=rows)
+    assert stats["status"]["sampled"] and stats["id"]["sampled"]
+    assert "TABLESAMPLE" not in profiler.queries[-1]
+    assert "sampled values ['pending', 'shipped']" in profiler_render(profiler, stats)
+
+
+def test_large_table_is_sampled_and_scaled(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_ROWS", 10)
+    rows = [{"email": f"user{i}@example.com"} for i in range(10)]
+    profiler, stats = profile(estimate=100_000, rows=rows)
+    assert "TABLESAMPLE SYSTEM" in profiler.queries[-1]
+    assert stats["email"]["sampled"] and stats["email"]["approx_distinct"] == 1000
+    assert "values" not in stats["email"]
+
+
+def test_table_names_are_quoted():
+    profiler, _ = profile(estimate=1, rows=[{"a": 1}], table="odd'name\"")
+    assert "relname = 'odd''name\"'" in profiler.queries[0]
+    assert 'FROM "odd\'name"""' in profiler.queries[1]
+
+
+def test_profiles_are_kept_per_connection():
+    profiler = FakeProfiler(estimate=None, rows=[])
+    profiler._profiles = {
+        "default": {"customers": {"tier": {"values": ["gold"]}}},
+        "archive": {"customers": {"tier": {"values": ["legacy"]}}},
+    }
+    assert profiler.get_table_profile("Customers") == {"tier": {"values": ["gold"]}}
+    assert profiler.get_table_profile("customers", "archive") == {"tier": {"values": ["legacy"]}}
+    assert "legacy" not in profiler.render()
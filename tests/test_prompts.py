@@ -0,0 +1,45 @@
+from backend.mcp.catalog import canonicalize_schema
+from backend.agents.prompts.architect_prompt import architect_prompt
+from backend.agents.prompts.coder_prompt import coder_prompt
+from backend.agents.prompts.critic_prompt import critic_prompt
+
+SCHEMA_A = "Table: orders\n- id (integer)\n- total (numeric)\n\nTable: customers\n- id (integer)\n"
+SCHEMA_B = "\nTable: customers\n  - id (integer)\nTable: orders\n- id (integer)\n- total (numeric)\n"
+
+
+def test_canonical_schema_is_order_insensitive():
+    assert canonicalize_schema(SCHEMA_A) == canonicalize_schema(SCHEMA_B)
+    assert canonicalize_schema(SCHEMA_A).startswith("Table: customers")
+
+
+def test_canonical_schema_keeps_connections_and_constraints():
+    combined = (
+        "\n--- Connection: Default Database ---\n" + SCHEMA_A +
+        "\n--- Connection: Local SQLite ---\nTable: customers\nCREATE TABLE customers (\n"
+        "    id INTEGER PRIMARY KEY,\n    shop_id INTEGER REFERENCES shops(id)\n)\n"
+        "\n--- Connection: Files ---\n(Error fetching schema: timeout)\n"
+    )
+    canonical = canonicalize_schema(combined)
+    sections = canonical.split("\n\n--- ")
+    assert [s.splitlines()[0].strip("- ") for s in sections] == [
+        "Connection: Default Database", "Connection: Local SQLite", "Connection: Files"
+    ]
+    # Same-named tables stay in their own connection, each listing id once
+    assert sections[0].count("- id (integer)") == 2 and "Table: customers\n- id (integer)\n\nTable: orders" in sections[0]
+    assert "id INTEGER PRIMARY KEY," in sections[1] and "REFERENCES shops(id)" in sections[1]
+    assert sections[2].endswith("(Error fetching schema: timeout)")
+    assert canonicalize_schema(combined.replace("\n", "\n\n")) == canonical
+
+
+def test_sql_agents_share_schema_prefix():
+    schema = canonicalize_schema(SCHEMA_A)
+    systems = [
+        architect_prompt.format_messages(schema=schema, previous="None.", question="q1")[0].content,
+        coder_prompt.format_messages(schema=schema, tables="orders", join_path="", profiles="", previous="None.", question="q2")[0].content,
+        critic_prompt.format_messages(schema=schema, question="q3", sql_query="SELECT 1", error="e")[0].content,
+    ]
+    prefix = systems[0][:systems[0].index("YOUR ROLE")]
+    assert schema in prefix
+    assert all(system.startswith(prefix) for system in systems)
+    # Per-request content stays out of the system message
+    assert not any("q2" in system or "q3" in system for system in systems)
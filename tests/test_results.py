@@ -0,0 +1,31 @@
+from backend.agents.results import columnar_result, result_records, render_markdown, NUMERIC, TEMPORAL, CATEGORICAL
+
+ROWS = [
+    {"order_date": "2024-01-15T10:00:00", "city": "Paris", "total": "12.50", "customer_id": 7},
+    {"order_date": "2024-01-16T11:30:00", "city": None, "total": 3, "customer_id": 8},
+    {"order_date": "2024-01-17T09:15:00", "city": "Rome", "total": None, "customer_id": 9},
+]
+
+
+def test_columnar_result_is_typed():
+    result = columnar_result(ROWS, max_rows=100)
+    assert result["columns"] == ["order_date", "city", "total", "customer_id"]
+    assert result["dtypes"] == [TEMPORAL, CATEGORICAL, NUMERIC, CATEGORICAL]
+    # Numeric text from the driver becomes numbers, nulls stay None
+    assert result["data"][2] == [12.5, 3, None]
+    assert result["row_count"] == 3 and not result["truncated"]
+
+
+def test_truncation_keeps_full_row_count():
+    result = columnar_result(ROWS, max_rows=2)
+    assert len(result["data"][0]) == 2
+    assert result["row_count"] == 3 and result["truncated"]
+    assert result_records(result)[1] == {"order_date": "2024-01-16T11:30:00", "city": None, "total": 3, "customer_id": 8}
+
+
+def test_markdown_is_rendered_on_demand():
+    result = columnar_result(ROWS, max_rows=100)
+    lines = render_markdown(result, max_rows=2).splitlines()
+    assert lines[0].split(" | ")[1].strip() == "city"
+    assert lines[-1] == "... (1 more rows)"
+    assert render_markdown(columnar_result([], max_rows=100)) == "No results found."
@@ -0,0 +1,26 @@
+from backend.agents.router_rules import classify_fast
+
+def test_fast_path_intents():
+    assert classify_fast("Hello!")[0] == "GENERAL_CHAT"
+    assert classify_fast("Show schema")[0] == "SCHEMA_QUESTION"
+    assert classify_fast("What tables are in the database?")[0] == "SCHEMA_QUESTION"
+    assert classify_fast("How many customers are there?")[0] == "DATA_QUERY"
+    assert classify_fast("Show me revenue by category")[0] == "DATA_QUERY"
+
+def test_fast_path_defers_to_llm():
+    assert classify_fast("What types of products are there?") is None
+    assert classify_fast("") is None
+    # Long messages starting with a greeting are not treated as chat
+    assert classify_fast("hi can you tell me which region had the best quarter last year") is None
+
+def test_chat_and_data_rules_dont_claim_other_intents():
+    assert classify_fast("help")[0] == "GENERAL_CHAT"
+    assert classify_fast("What can you do?")[0] == "GENERAL_CHAT"
+    assert classify_fast("Thanks a lot!")[0] == "GENERAL_CHAT"
+    # Data requests that start like chat
+    assert classify_fast("help me find total revenue by region")[0] == "DATA_QUERY"
+    assert classify_fast("thanks, now show revenue by month")[0] == "DATA_QUERY"
+    assert classify_fast("what can you do with the sales data?") is None
+    # Schema questions that start like data questions
+    assert classify_fast("how many tables are there") is None
+    assert classify_fast("how many columns does the orders table have?") is None
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+from typing import Any, List, Optional
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from backend.config import settings
+from backend.agents.scheduler import BackendScheduler, ScheduledChatModel, LLMQueueTimeout, get_scheduler
+
+
+async def admit_in_order(scheduler: BackendScheduler, requests) -> List[str]:
+    """Fills the only slot, queues `requests` ((label, priority, session)) and records admission order."""
+    order: List[str] = []
+    await scheduler.acquire("interactive", "holder", 1)
+
+    async def request(label, priority, session_id):
+        await scheduler.acquire(priority, session_id, 1)
+        order.append(label)
+        scheduler.release(priority)
+
+    tasks = []
+    for label, priority, session_id in requests:
+        tasks.append(asyncio.create_task(request(label, priority, session_id)))
+        await asyncio.sleep(0)
+    scheduler.release("interactive")
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_waiters_are_served_by_priority():
+    scheduler = BackendScheduler("priority-test", max_in_flight=1)
+    order = asyncio.run(admit_in_order(scheduler, [
+        ("eval", "evaluation", "run"), ("user", "interactive", "s1")
+    ]))
+    assert order == ["user", "eval"]
+
+
+def test_sessions_are_served_round_robin():
+    scheduler = BackendScheduler("fairness-test", max_in_flight=1)
+    order = asyncio.run(admit_in_order(scheduler, [
+        ("a1", "interactive", "a"), ("a2", "interactive", "a"), ("a3", "interactive", "a"), ("b1", "interactive", "b")
+    ]))
+    assert order == ["a1", "b1", "a2", "a3"]
+
+
+def test_evaluation_cap_keeps_slots_for_users():
+    async def run():
+        scheduler = BackendScheduler("cap-test", max_in_flight=2, class_limits={"evaluation": 1})
+        await scheduler.acquire("evaluation", "run", 1)
+        with pytest.raises(LLMQueueTimeout):
+            await scheduler.acquire("evaluation", "run", 0.05)
+        await scheduler.acquire("interactive", "s1", 0.05)
+        return scheduler.stats()
+
+    assert asyncio.run(run()) == {"in_flight": {"interactive": 1, "evaluation": 1}, "queued": 0, "max_in_flight": 2}
+
+
+def test_queue_timeout_leaves_the_queue():
+    async def run():
+        scheduler = BackendScheduler("timeout-test", max_in_flight=1)
+        await scheduler.acquire("interactive", "s1", 1)
+        with pytest.raises(LLMQueueTimeout):
+            await scheduler.acquire("interactive", "s2", 0.05)
+        assert scheduler.queued() == 0
+        scheduler.release("interactive")
+        await scheduler.acquire("interactive", "s2", 0.05)
+        return scheduler.in_flight
+
+    assert asyncio.run(run()) == 1
+
+
+class RecordingChatModel(BaseChatModel):
+    backend: str
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording-fake"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        in_flight = get_scheduler(self.backend).in_flight
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=str(in_flight)))])
+
+
+def test_sync_generations_are_admitted(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_QUEUE_TIMEOUTS", {"interactive": 0.05, "evaluation": 0.05})
+    llm = ScheduledChatModel(inner=RecordingChatModel(backend="sync-test"), backend="sync-test", node="router")
+    scheduler = get_scheduler("sync-test")
+    assert llm.invoke("hi").content == "1"
+    assert scheduler.in_flight == 0
+
+    for _ in range(scheduler.max_in_flight):
+        scheduler.acquire_sync("interactive", None, 1)
+    with pytest.raises(LLMQueueTimeout):
+        llm.invoke("hi")
+    assert scheduler.queued() == 0
+
+
+def test_async_release_wakes_a_sync_waiter():
+    scheduler = BackendScheduler("thread-test", max_in_flight=1)
+    admitted = threading.Event()
+
+    async def run():
+        await scheduler.acquire("interactive", "s1", 1)
+        worker = threading.Thread(target=lambda: (scheduler.acquire_sync("evaluation", "run", 5), admitted.set()))
+        worker.start()
+        while not scheduler.queued():
+            await asyncio.sleep(0.01)
+        scheduler.release("interactive")
+        await asyncio.get_running_loop().run_in_executor(None, worker.join)
+
+    asyncio.run(run())
+    assert admitted.is_set() and scheduler.stats()["in_flight"] == {"interactive": 0, "evaluation": 1}
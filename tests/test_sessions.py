@@ -0,0 +1,167 @@
+import sys
+import asyncio
+import pytest
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage, HumanMessage
+from backend.config import settings
+from backend.agents.sessions import SessionStore, build_checkpointer, turn_input
+from backend.agents.nodes import router, schema_loader, architect, coder, executor, viz_router, final_responder
+from backend.api import routes
+from backend.main import app
+
+PREVIOUS = {
+    "user_question": "revenue by city",
+    "messages": [HumanMessage(content="revenue by city")],
+    "intent": "DATA_QUERY",
+    "schema_context": "Table: orders\n- id (integer)",
+    "relevant_tables": ["orders", "customers"],
+    "planning_mode": "two_step",
+    "sql_query": "SELECT city, SUM(total) FROM orders GROUP BY city",
+    "sql_error": None,
+    "retry_count": 2,
+    "final_response": "Paris leads.",
+    "node_stats": {"coder": {"runs": 1}},
+}
+
+
+def test_follow_up_carries_context_not_per_turn_fields():
+    turn = turn_input("now by month", PREVIOUS)
+    assert turn["previous_question"] == "revenue by city"
+    assert turn["previous_sql"].startswith("SELECT city")
+    # Last turn's tables are only a hint for the architect, never the selection
+    assert turn["previous_tables"] == ["orders", "customers"] and "relevant_tables" not in turn
+    assert turn["schema_context"] == PREVIOUS["schema_context"]
+    assert not {"retry_count", "node_stats", "final_response", "sql_query"} & set(turn)
+    assert [type(m) for m in turn["messages"]] == [HumanMessage, AIMessage, HumanMessage]
+
+    # Small talk in between keeps the last data question; history stays bounded
+    chat = {**turn, "intent": "GENERAL_CHAT", "user_question": "thanks", "final_response": "You're welcome"}
+    after_chat = turn_input("and by year?", chat, max_messages=3)
+    assert after_chat["previous_sql"] == PREVIOUS["sql_query"]
+    assert after_chat["previous_tables"] == ["orders", "customers"]
+    assert len(after_chat["messages"]) == 3 and after_chat["messages"][-1].content == "and by year?"
+
+
+def test_store_resumes_and_evicts_sessions():
+    async def run():
+        store = SessionStore("memory", "", ttl_seconds=3600, max_sessions=1, max_messages=10)
+        session_graph = await store.get_graph()
+        for session_id in ("old", "new"):
+            _, config = await store.begin_run(session_id)
+            await session_graph.aupdate_state(config, PREVIOUS, as_node="output_join")
+            await asyncio.sleep(0.01)
+
+        turn = await store.load_turn("new", "now by month")
+        assert turn["previous_sql"] == PREVIOUS["sql_query"]
+
+        await store.evict_expired(force=True)
+        assert (await session_graph.aget_state(store.config("old"))).values == {}
+        assert (await session_graph.aget_state(store.config("new"))).values
+
+        store.ttl_seconds = 0
+        await store.evict_expired(force=True)
+        return await store.load_turn("new", "hello")
+
+    fresh = asyncio.run(run())
+    assert "previous_sql" not in fresh and len(fresh["messages"]) == 1
+
+
+def test_cancelled_turn_rolls_back_to_previous_turn():
+    async def run():
+        store = SessionStore("memory", "", ttl_seconds=3600, max_sessions=10, max_messages=10)
+        session_graph, config = await store.begin_run("s")
+        await session_graph.aupdate_state(config, PREVIOUS, as_node="output_join")
+
+        cancelled = {**await store.load_turn("s", "now by month"), "deadline": 1.0}
+        await store.begin_run("s")
+        await store.restore("s", cancelled)
+        snapshot = await session_graph.aget_state(config)
+        return snapshot, await store.load_turn("s", "now by year")
+
+    snapshot, turn = asyncio.run(run())
+    assert snapshot.next == () and "deadline" not in snapshot.values
+    assert turn == turn_input("now by year", PREVIOUS, max_messages=10)
+
+
+def test_unrelated_questions_each_select_their_tables(monkeypatch):
+    tables_by_question = {"revenue by customer": ["customers", "orders"], "list products": ["products"]}
+    architect_hints, coder_tables = [], []
+
+    async def architect_node(state):
+        architect_hints.append(architect.render_previous_tables(state))
+        return {"relevant_tables": tables_by_question[state["user_question"]]}
+
+    async def coder_node(state):
+        coder_tables.append(state.get("relevant_tables"))
+        return {"sql_query": f"SELECT 1 -- {state['user_question']}"}
+
+    async def get_schema():
+        return [SimpleNamespace(text="Table: customers\n- id (integer)")]
+
+    monkeypatch.setattr(settings, "AGENT_SINGLE_CALL_SCHEMA_TOKENS", 0)
+    monkeypatch.setattr(schema_loader, "handle_get_schema", get_schema)
+    monkeypatch.setattr(router, "router_node", lambda state: {"intent": "DATA_QUERY", "intent_confidence": 1.0})
+    monkeypatch.setattr(architect, "architect_node", architect_node)
+    monkeypatch.setattr(coder, "coder_node", coder_node)
+    monkeypatch.setattr(executor, "executor_node", lambda state: {"query_result": {"columns": ["x"], "rows": [[1]]}})
+    monkeypatch.setattr(viz_router, "viz_router_node", lambda state: {"needs_visualization": False})
+    monkeypatch.setattr(final_responder, "final_responder_node", lambda state: {"final_response": "Done."})
+
+    async def run():
+        store = SessionStore("memory", "", ttl_seconds=3600, max_sessions=10, max_messages=10)
+        for question in tables_by_question:
+            turn = await store.load_turn("s", question)
+            session_graph, config = await store.begin_run("s")
+            await session_graph.ainvoke(turn, config=config)
+
+    asyncio.run(run())
+    assert coder_tables == [["customers", "orders"], ["products"]]
+    assert architect_hints == ["None.", "Question: revenue by customer\nTables: customers, orders"]
+
+
+def test_failed_rest_run_rolls_back_the_session(monkeypatch):
+    rolled_back = []
+
+    async def graph_for(session_id):
+        raise RuntimeError("graph unavailable")
+
+    async def rollback_turn(session_id, turn):
+        rolled_back.append((session_id, turn["user_question"]))
+
+    monkeypatch.setattr(routes, "graph_for", graph_for)
+    monkeypatch.setattr(routes, "rollback_turn", rollback_turn)
+    response = TestClient(app).post(
+        "/api/query", json={"question": "revenue by city", "session_id": "rest-s", "options": {"bypass_cache": True}}
+    )
+    assert response.status_code == 500
+    assert rolled_back == [("rest-s", "revenue by city")]
+
+
+def test_sqlite_sessions_survive_a_restart(tmp_path):
+    pytest.importorskip("langgraph.checkpoint.sqlite")
+    db_path = str(tmp_path / "sessions.db")
+
+    async def run():
+        store = SessionStore("sqlite", db_path, ttl_seconds=3600, max_sessions=10, max_messages=10)
+        try:
+            session_graph, config = await store.begin_run("s")
+            await session_graph.aupdate_state(config, PREVIOUS, as_node="output_join")
+        finally:
+            await store.close()
+
+        restarted = SessionStore("sqlite", db_path, ttl_seconds=3600, max_sessions=10, max_messages=10)
+        try:
+            await restarted.evict_expired(force=True)
+            return await restarted.load_turn("s", "now by month")
+        finally:
+            await restarted.close()
+
+    assert asyncio.run(run())["previous_sql"] == PREVIOUS["sql_query"]
+
+
+def test_sqlite_backend_requires_its_extra(monkeypatch):
+    monkeypatch.setitem(sys.modules, "langgraph.checkpoint.sqlite.aio", None)
+    with pytest.raises(RuntimeError, match="langgraph-checkpoint-sqlite"):
+        asyncio.run(build_checkpointer("sqlite", ":memory:"))
+
@@ -0,0 +1,28 @@
+import asyncio
+from backend.agents.speculation import resolve_speculative_plan, speculation_stats
+
+
+async def fake_plan(delay: float):
+    await asyncio.sleep(delay)
+    return {"schema_context": "Table: orders", "planning_mode": "single_call", "relevant_tables": []}
+
+
+def test_data_intent_reuses_plan():
+    async def run():
+        task = asyncio.create_task(fake_plan(0.01))
+        return await resolve_speculative_plan(task, "DATA_QUERY", 0.9)
+    update = asyncio.run(run())
+    assert update["speculative_plan"] is True
+    assert update["schema_context"] == "Table: orders"
+
+
+def test_other_intent_cancels_plan():
+    async def run():
+        task = asyncio.create_task(fake_plan(10))
+        update = await resolve_speculative_plan(task, "GENERAL_CHAT", 0.95)
+        return update, task
+    before = speculation_stats()["losses"]
+    update, task = asyncio.run(run())
+    assert update == {}
+    assert task.cancelled()
+    assert speculation_stats()["losses"] == before + 1
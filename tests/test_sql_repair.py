@@ -0,0 +1,44 @@
+from backend.agents.sql_repair import propose_repair
+
+CATALOG = {
+    "orders": [("id", "integer"), ("status", "USER-DEFINED"), ("order_date", "timestamp"), ("total_amount", "numeric")],
+    "customers": [("id", "integer"), ("city", "text")],
+}
+ENUMS = {"orders": {"status": ["cancelled", "pending", "shipped"]}}
+
+
+def repair(sql, error, dialect="postgres"):
+    return propose_repair(sql, error, CATALOG, ENUMS, dialect)
+
+
+def test_misspelled_identifiers():
+    kind, sql = repair("SELECT o.totl_amount FROM orders o", 'Database Error: column o.totl_amount does not exist')
+    assert kind == "identifier" and sql == "SELECT o.total_amount FROM orders o"
+    kind, sql = repair("SELECT city FROM customer WHERE city = 'customer'", "Database Error: no such table: customer", "sqlite")
+    assert sql == "SELECT city FROM customers WHERE city = 'customer'"
+
+
+def test_enum_literal_case():
+    kind, sql = repair("SELECT COUNT(*) FROM orders WHERE status = 'Shipped'",
+                       'Database Error: invalid input value for enum order_status: "Shipped"')
+    assert kind == "enum_case" and "'shipped'" in sql
+
+
+def test_dialect_rewrites():
+    kind, sql = repair("SELECT DATE_TRUNC('month', order_date) AS m, SUM(total_amount) FROM orders GROUP BY 1",
+                       "Database Error: no such function: DATE_TRUNC", "sqlite")
+    assert kind == "dialect" and "strftime('%Y-%m-01', order_date)" in sql
+    kind, sql = repair("SELECT strftime('%Y-%m', order_date) FROM orders",
+                       "Database Error: function strftime(unknown, timestamp without time zone) does not exist")
+    assert sql == "SELECT to_char(order_date, 'YYYY-MM') FROM orders"
+
+
+def test_missing_group_by_column():
+    error = 'Database Error: column "o.status" must appear in the GROUP BY clause or be used in an aggregate function'
+    kind, sql = repair("SELECT o.status, o.id, COUNT(*) FROM orders o GROUP BY o.id ORDER BY 3 DESC LIMIT 5", error)
+    assert kind == "group_by"
+    assert sql == "SELECT o.status, o.id, COUNT(*) FROM orders o GROUP BY o.id, o.status ORDER BY 3 DESC LIMIT 5"
+
+
+def test_unknown_error_escalates():
+    assert repair("SELECT 1/0", "Database Error: division by zero") is None
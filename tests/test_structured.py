@@ -0,0 +1,38 @@
+import asyncio
+import pytest
+from langchain_core.runnables import RunnableBinding
+from backend.config import settings
+from backend.agents.llm import close_llm_clients
+from backend.agents.structured import get_structured_llm, parse_json_output, parse_stats, ARCHITECT_SCHEMA
+
+
+def test_parse_clean_and_repaired_json():
+    assert parse_json_output("test_node", '{"intent": "DATA_QUERY", "confidence": 0.9}')["intent"] == "DATA_QUERY"
+    # Fenced, prose-prefixed and truncated answers are recovered
+    assert parse_json_output("test_node", '```json\n{"tables": ["orders"]}\n```') == {"tables": ["orders"]}
+    assert parse_json_output("test_node", 'Sure! {"tables": ["orders", "customers"]}')["tables"] == ["orders", "customers"]
+    assert parse_json_output("test_node", '{"tables": ["orders", "custom')["tables"][0] == "orders"
+
+
+def test_parse_failure_is_counted():
+    with pytest.raises(ValueError):
+        parse_json_output("test_fail_node", "I cannot answer that.")
+    stats = parse_stats()["test_fail_node"]
+    assert stats["failed"] == 1
+    assert stats["failure_rate"] == 1.0
+
+
+def test_structured_output_follows_the_node_provider(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_STRUCTURED_OUTPUT", True)
+    monkeypatch.setattr(settings, "GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "LLM_FALLBACK_BACKENDS", [])
+
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "ollama")
+    monkeypatch.setattr(settings, "LLM_NODE_CONFIG", {"architect": {"provider": "google"}})
+    assert not isinstance(get_structured_llm("architect", ARCHITECT_SCHEMA), RunnableBinding)
+    assert isinstance(get_structured_llm("router", ARCHITECT_SCHEMA), RunnableBinding)
+
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "google")
+    monkeypatch.setattr(settings, "LLM_NODE_CONFIG", {"architect": {"provider": "ollama"}})
+    assert isinstance(get_structured_llm("architect", ARCHITECT_SCHEMA), RunnableBinding)
+    asyncio.run(close_llm_clients())
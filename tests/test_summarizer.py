@@ -0,0 +1,48 @@
+from backend.agents.results import columnar_result
+from backend.agents.summarizer import summarize_result
+
+BUDGET = 3000
+
+
+def orders(count):
+    return [
+        {"city": ["Paris", "Rome", "Oslo"][i % 3], "order_date": f"2024-01-{i % 28 + 1:02d}", "total": i + 0.5}
+        for i in range(count)
+    ]
+
+
+def test_small_results_are_shown_in_full():
+    summary = summarize_result(columnar_result(orders(3), max_rows=100), BUDGET)
+    assert summary.splitlines()[0].startswith("city")
+    assert len(summary.splitlines()) == 5
+
+
+def test_digest_covers_all_rows_at_fixed_size():
+    summary = summarize_result(columnar_result(orders(9000), max_rows=10000), BUDGET)
+    assert "Rows: 9,000" in summary
+    # sum of i + 0.5 for i < 9000
+    assert "sum 40,500,000" in summary and "min 0.5," in summary and "max 8,999.50" in summary
+    assert "most frequent: Oslo (3,000), Paris (3,000), Rome (3,000)" in summary
+    assert "from 2024-01-01 to 2024-01-28" in summary
+    assert "Last 5 rows:" in summary and "8999.5" in summary
+
+    larger = summarize_result(columnar_result(orders(90000), max_rows=10000), BUDGET)
+    assert "Rows: 90,000 (statistics cover the first 10,000)" in larger
+    assert abs(len(larger) - len(summary)) < 100
+
+
+def test_budget_drops_sample_rows_first():
+    wide = [{f"col_{c}": f"value-{r}-{c}" * 3 for c in range(8)} for r in range(50)]
+    summary = summarize_result(columnar_result(wide, max_rows=100), 1500)
+    assert len(summary) <= 1500
+    assert "Column statistics:" in summary and "First" not in summary
+
+
+def test_numeric_periods_are_ranged_by_value():
+    months = [{"month": m, "region": f"r{m % 4}", "revenue": m * 10.0} for m in range(1, 13)] * 2
+    summary = summarize_result(columnar_result(months, max_rows=100), BUDGET)
+    assert "- month (temporal): from 1 to 12, 12 distinct" in summary
+
+    as_text = [{"month": str(m), "revenue": m} for m in (12, 9, 10, 1, 2)] * 3
+    summary = summarize_result(columnar_result(as_text, max_rows=100), BUDGET)
+    assert "- month (temporal): from 1 to 12, 5 distinct" in summary
@@ -0,0 +1,79 @@
+import asyncio
+from backend.api import websocket as ws
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+
+class SlowGraph:
+    """Finishes the router, then blocks in the next node like a slow LLM call."""
+    nodes = {"router": None, "coder": None}
+
+    def __init__(self):
+        self.stopped = asyncio.Event()
+
+    async def astream_events(self, turn, version, **kwargs):
+        yield {"event": "on_chain_end", "name": "router", "metadata": {"langgraph_node": "router"},
+               "data": {"output": {"intent": "DATA_QUERY"}}}
+        try:
+            await asyncio.sleep(60)
+        finally:
+            self.stopped.set()
+        yield {}
+
+
+def test_cancel_stops_the_run_and_rolls_back_the_session(monkeypatch):
+    graph = SlowGraph()
+    rolled_back = []
+
+    async def graph_for(session_id):
+        return graph, {}
+
+    async def rollback_turn(session_id, turn):
+        rolled_back.append((session_id, turn["user_question"]))
+
+    monkeypatch.setattr(ws, "graph_for", graph_for)
+    monkeypatch.setattr(ws, "rollback_turn", rollback_turn)
+    monkeypatch.setattr(ws.answer_cache, "put", lambda *args: rolled_back.append("cached"))
+
+    async def run():
+        socket = FakeSocket()
+        task = asyncio.create_task(ws.answer_question(socket, "revenue by city", "ws-test", bypass_cache=True))
+        while not socket.sent:
+            await asyncio.sleep(0.01)
+        assert await ws.cancel_run(task)
+        assert not await ws.cancel_run(task)
+        return socket, task
+
+    socket, task = asyncio.run(run())
+    assert task.cancelled() and graph.stopped.is_set()
+    assert rolled_back == [("ws-test", "revenue by city")]
+    assert [message["type"] for message in socket.sent] == ["agent_update"]
+
+
+def test_failed_run_rolls_back_and_keeps_the_socket(monkeypatch):
+    class BrokenGraph(SlowGraph):
+        async def astream_events(self, turn, version, **kwargs):
+            raise RuntimeError("checkpointer unavailable")
+            yield
+
+    rolled_back = []
+
+    async def graph_for(session_id):
+        return BrokenGraph(), {}
+
+    async def rollback_turn(session_id, turn):
+        rolled_back.append((session_id, turn["user_question"]))
+
+    monkeypatch.setattr(ws, "graph_for", graph_for)
+    monkeypatch.setattr(ws, "rollback_turn", rollback_turn)
+
+    socket = FakeSocket()
+    asyncio.run(ws.answer_question(socket, "revenue by city", "ws-test", bypass_cache=True))
+    assert rolled_back == [("ws-test", "revenue by city")]
+    assert socket.sent == [{"type": "error", "payload": {"message": "checkpointer unavailable"}}]
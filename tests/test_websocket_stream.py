@@ -0,0 +1,78 @@
+import json
+import asyncio
+from langchain_core.messages import AIMessageChunk
+from backend.api import websocket as ws
+
+CHART = {"type": "bar", "x": ["Oslo", "Rome"], "y": [3, 5]}
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+
+def node_end(node, output):
+    return {"event": "on_chain_end", "name": node, "metadata": {"langgraph_node": node}, "data": {"output": output}}
+
+
+def token(node, text):
+    return {"event": "on_chat_model_stream", "name": "ChatOpenAI", "metadata": {"langgraph_node": node},
+            "data": {"chunk": AIMessageChunk(content=text)}}
+
+
+class ScriptedGraph:
+    nodes = {"router": None, "visualizer": None, "final_responder": None, "schema_responder": None, "output_join": None}
+
+    def __init__(self, events):
+        self.events = events
+
+    async def astream_events(self, turn, version, **kwargs):
+        for event in self.events:
+            yield event
+
+
+def run(events):
+    socket = FakeSocket()
+    run_state, visualization = asyncio.run(ws.stream_graph_run(socket, {"user_question": "q"}, ScriptedGraph(events)))
+    return socket.sent, run_state, visualization
+
+
+def test_tokens_chart_then_a_single_final_response():
+    sent, run_state, visualization = run([
+        node_end("router", {"intent": "DATA_QUERY"}),
+        token("final_responder", "Rome leads "),
+        node_end("visualizer", {"visualization_code": json.dumps(CHART)}),
+        token("final_responder", "with 5."),
+        # Inner runnables of a node end too; only the node itself counts
+        {**node_end("RunnableSequence", {}), "metadata": {"langgraph_node": "final_responder"}},
+        node_end("final_responder", {"final_response": "Rome leads with 5."}),
+        node_end("output_join", {}),
+    ])
+    assert [(m["type"], m["payload"].get("agent")) for m in sent] == [
+        ("agent_update", "router"),
+        ("answer_delta", "final_responder"),
+        ("agent_update", "visualizer"),
+        ("visualization", None),
+        ("answer_delta", "final_responder"),
+        ("agent_update", "final_responder"),
+        ("agent_update", "output_join"),
+        ("final_response", None),
+        ("stats", None),
+    ]
+    assert "".join(m["payload"]["delta"] for m in sent if m["type"] == "answer_delta") == "Rome leads with 5."
+    assert sent[-2]["payload"] == {"answer": "Rome leads with 5.", "visualization": CHART}
+    assert run_state["final_response"] == "Rome leads with 5." and visualization == CHART
+
+
+def test_unstreamed_terminal_node_sends_its_text_as_one_delta():
+    sent, _, visualization = run([
+        node_end("router", {"intent": "SCHEMA_QUESTION"}),
+        node_end("schema_responder", {"final_response": "Tables: customers, orders"}),
+    ])
+    assert [m["type"] for m in sent] == ["agent_update", "agent_update", "answer_delta", "final_response", "stats"]
+    assert sent[2]["payload"] == {"agent": "schema_responder", "delta": "Tables: customers, orders"}
+    assert sent[3]["payload"] == {"answer": "Tables: customers, orders", "visualization": None}
+    assert visualization is None